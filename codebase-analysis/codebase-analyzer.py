@@ -9,15 +9,37 @@ import json
 import ast
 import hashlib
 import logging
+import sqlite3
+import stat
+import struct
+import sys
+import warnings
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass, asdict
-from collections import defaultdict, Counter
+from collections import defaultdict, deque, Counter
 import re
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+try:
+    from tree_sitter_languages import get_language, get_parser
+except ImportError:  # Optional: fall back to the regex token scanners
+    get_language = get_parser = None
 
 @dataclass
 class CodeFile:
     """Represents a code file with metadata"""
+    __slots__ = ('path', 'language', 'size', 'lines_of_code', 'complexity_score', 'dependencies',
+                 'exports', 'functions', 'classes', 'hash', 'signature', 'mtime_ns')
+    
     path: str
     language: str
     size: int
@@ -28,27 +50,38 @@ class CodeFile:
     functions: List[str]
     classes: List[str]
     hash: str
+    signature: List[int]  # MinHash of the file's token shingles
+    mtime_ns: int  # Modification time the analysis was made from
 
 @dataclass
 class CodeDuplication:
-    """Represents detected code duplication"""
+    """Represents a group of files sharing duplicated code"""
+    __slots__ = ('similarity_score', 'files', 'duplicate_lines', 'duplicate_content')
+    
     similarity_score: float
-    file1: str
-    file2: str
+    files: List[str]
     duplicate_lines: List[Tuple[int, int]]  # (line1, line2) pairs
     duplicate_content: str
 
 @dataclass
 class DependencyRelation:
     """Represents a dependency relationship between files/modules"""
+    __slots__ = ('source', 'target', 'relation_type', 'strength')
+    
     source: str
     target: str
-    relation_type: str  # 'import', 'require', 'include', 'inherit'
+    relation_type: str  # One of RELATION_TYPES
     strength: float  # 0.0 to 1.0
 
+# Relation types, stored by index in the analyzer's edge arrays
+RELATION_TYPES = ('import', 'require', 'include', 'inherit')
+
 @dataclass
 class CodebaseMetrics:
     """Overall codebase metrics"""
+    __slots__ = ('total_files', 'total_lines', 'languages', 'complexity_distribution',
+                 'dependency_depth', 'duplication_percentage', 'test_coverage_estimate')
+    
     total_files: int
     total_lines: int
     languages: Dict[str, int]
@@ -57,6 +90,295 @@ class CodebaseMetrics:
     duplication_percentage: float
     test_coverage_estimate: float
 
+# Single-pass token scanners for the JS/TS and Java analyzers. Alternatives are
+# tried in order at each position, so comments are consumed before any keyword
+# inside them can match; the named group that matched identifies the token.
+_JS_TOKEN_RE = re.compile(r"""
+    (?://[^\n]*|/\*[\s\S]*?\*/)
+  | ^[ \t]*import\b(?:[^'";]*?\bfrom)?\s*['"](?P<import_mod>[^'"\n]+)['"]
+  | \brequire\(\s*['"](?P<require_mod>[^'"\n]+)['"]
+  | ^[ \t]*export\s+(?:default\s+)?(?:async\s+)?function\b\s*\*?\s*(?P<export_fn>\w+)
+  | ^[ \t]*export\s+(?:default\s+)?class\s+(?P<export_cls>\w+)
+  | \bfunction\b\s*\*?\s*(?P<fn>\w+)
+  | (?P<anon_fn>\bfunction\b)
+  | ^[ \t]*class\s+(?P<cls>\w+)
+  | (?P<ctrl>\b(?:if|for|while|switch|try)\b)
+""", re.MULTILINE | re.VERBOSE)
+
+_JAVA_TOKEN_RE = re.compile(r"""
+    (?://[^\n]*|/\*[\s\S]*?\*/)
+  | ^[ \t]*import\s+(?:static\s+)?(?P<import>[\w.*]+)\s*;
+  | \bclass\s+(?P<cls>\w+)
+  | ^[ \t]*(?:\w+[ \t]+)*?(?:public|private|protected)[ \t]+[\w<>\[\],.? \t]*?\b(?P<method>\w+)[ \t]*\(
+  | (?P<ctrl>\b(?:if|for|while|switch|try)\b)
+""", re.MULTILINE | re.VERBOSE)
+
+# Tree-sitter grammars per suffix, and the node patterns queried for each
+# language. Patterns are validated one by one against the installed grammar so
+# node types renamed between grammar versions are skipped instead of failing.
+TREE_SITTER_GRAMMARS = {
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'tsx',
+    '.java': 'java',
+}
+
+_JS_TREE_SITTER_PATTERNS = [
+    '(import_statement source: (string) @import)',
+    '(call_expression function: (identifier) arguments: (arguments (string))) @call',
+    '(export_statement declaration: (function_declaration name: (_) @export_fn))',
+    '(export_statement declaration: (class_declaration name: (_) @export_cls))',
+    '(function_declaration name: (_) @fn)',
+    '(function) @anon_fn',
+    '(function_expression) @anon_fn',
+    '(class_declaration name: (_) @cls)',
+] + [f'({node_type}) @ctrl' for node_type in (
+    'if_statement', 'for_statement', 'for_in_statement', 'while_statement',
+    'switch_statement', 'try_statement',
+)]
+
+_JAVA_TREE_SITTER_PATTERNS = [
+    '(import_declaration) @import',
+    '(class_declaration name: (identifier) @cls)',
+    '(method_declaration name: (identifier) @method)',
+    '(constructor_declaration name: (identifier) @method)',
+] + [f'({node_type}) @ctrl' for node_type in (
+    'if_statement', 'for_statement', 'enhanced_for_statement', 'while_statement',
+    'switch_expression', 'switch_statement', 'try_statement',
+)]
+
+# Compiled (parser, query) per grammar, built lazily in each process
+_tree_sitter_cache: Dict[str, Any] = {}
+
+def _tree_sitter_query(grammar: str):
+    """Return the (parser, query) pair for a grammar, or None if tree-sitter is unusable"""
+    if grammar not in _tree_sitter_cache:
+        _tree_sitter_cache[grammar] = None
+        try:
+            with warnings.catch_warnings():
+                # tree_sitter_languages trips deprecation warnings in newer bindings
+                warnings.simplefilter('ignore')
+                language = get_language(grammar)
+                parser = get_parser(grammar)
+            patterns = _JAVA_TREE_SITTER_PATTERNS if grammar == 'java' else _JS_TREE_SITTER_PATTERNS
+            valid = []
+            for pattern in patterns:
+                try:
+                    language.query(pattern)
+                    valid.append(pattern)
+                except Exception:
+                    continue
+            _tree_sitter_cache[grammar] = (parser, language.query('\n'.join(valid)))
+        except Exception as e:
+            logging.getLogger("CodebaseAnalyzer").debug(f"Tree-sitter unavailable for {grammar}: {e}")
+    return _tree_sitter_cache[grammar]
+
+def _analyze_with_tree_sitter(content: str, grammar: str) -> Optional[Tuple[List[str], List[str], List[str], List[str], float]]:
+    """Analyze a JS/TS/Java file from its tree-sitter parse; None when tree-sitter is unavailable"""
+    if get_parser is None:
+        return None
+    
+    compiled = _tree_sitter_query(grammar)
+    if compiled is None:
+        return None
+    
+    parser, query = compiled
+    tree = parser.parse(content.encode('utf-8'))
+    captures = query.captures(tree.root_node)
+    if isinstance(captures, dict):
+        # Newer bindings group captures by name
+        captures = sorted(
+            ((node, name) for name, nodes in captures.items() for node in nodes),
+            key=lambda capture: capture[0].start_byte
+        )
+    
+    dependencies = []
+    exports = []
+    functions = []
+    classes = []
+    complexity_score = 0.0
+    
+    for node, kind in captures:
+        text = node.text.decode('utf-8', errors='ignore')
+        
+        if kind == 'ctrl':
+            complexity_score += 0.5
+        elif kind == 'import':
+            if grammar == 'java':
+                text = text.replace('import', '', 1).replace('static ', '', 1).rstrip(';').strip()
+                dependencies.append(re.sub(r'\s+', '', text))
+            else:
+                dependencies.append(text[1:-1])
+        elif kind == 'call':
+            function = node.child_by_field_name('function')
+            arguments = node.child_by_field_name('arguments')
+            if function is not None and function.text == b'require' and arguments.named_children:
+                dependencies.append(arguments.named_children[0].text.decode('utf-8', errors='ignore')[1:-1])
+        elif kind in ('export_fn', 'export_cls'):
+            exports.append(text)
+        elif kind == 'fn':
+            # Exported declarations are reported as exports only
+            declaration = node.parent
+            if declaration.parent is None or declaration.parent.type != 'export_statement':
+                functions.append(text)
+                complexity_score += 1
+        elif kind == 'anon_fn':
+            complexity_score += 1
+        elif kind == 'cls':
+            declaration = node.parent
+            if grammar == 'java':
+                classes.append(text)
+                exports.append(text)
+                complexity_score += 2
+            elif declaration.parent is None or declaration.parent.type != 'export_statement':
+                classes.append(text)
+                complexity_score += 2
+        elif kind == 'method':
+            functions.append(text)
+            complexity_score += 1
+    
+    return dependencies, exports, functions, classes, complexity_score
+
+# Near-duplicate detection: Rabin-Karp shingles over word tokens, summarised by
+# one-permutation MinHash and bucketed with LSH bands
+SHINGLE_SIZE = 32
+SHINGLE_BASE = 60013
+SHINGLE_MOD = 10**18 + 3
+MINHASH_BINS = 128
+LSH_BANDS = 32
+LSH_ROWS = MINHASH_BINS // LSH_BANDS
+MINHASH_EMPTY = 0xFFFFFFFF
+
+_WORD_RE = re.compile(r'\w+')
+
+def _shingle_hashes(content: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    """Rolling polynomial hashes of every k-token window in the content"""
+    tokens = [zlib.crc32(token.encode()) for token in _WORD_RE.findall(content)]
+    if len(tokens) < k:
+        return set()
+    
+    high = pow(SHINGLE_BASE, k - 1, SHINGLE_MOD)
+    value = 0
+    for token in tokens[:k]:
+        value = (value * SHINGLE_BASE + token) % SHINGLE_MOD
+    
+    shingles = {value}
+    for index in range(k, len(tokens)):
+        value = ((value - tokens[index - k] * high) * SHINGLE_BASE + tokens[index]) % SHINGLE_MOD
+        shingles.add(value)
+    return shingles
+
+def _minhash_signature(shingles: Set[int]) -> List[int]:
+    """One-permutation MinHash: the low bits pick a bin, the next 32 bits compete for its minimum"""
+    if not shingles:
+        return []
+    
+    signature = [MINHASH_EMPTY] * MINHASH_BINS
+    for shingle in shingles:
+        bucket = shingle % MINHASH_BINS
+        value = (shingle // MINHASH_BINS) & 0xFFFFFFFF
+        if value < signature[bucket]:
+            signature[bucket] = value
+    return signature
+
+def _lsh_buckets(signature: List[int]) -> Iterator[Tuple[int, bytes]]:
+    """Yield (band, bucket) keys for a signature, skipping bands with no shingles"""
+    for band in range(len(signature) // LSH_ROWS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        if all(row == MINHASH_EMPTY for row in rows):
+            continue
+        yield band, struct.pack(f'>{LSH_ROWS}I', *rows)
+
+def _estimate_jaccard(sig1: List[int], sig2: List[int]) -> float:
+    """Estimate the Jaccard similarity of two shingle sets from their signatures"""
+    shared = occupied = 0
+    for a, b in zip(sig1, sig2):
+        if a == MINHASH_EMPTY and b == MINHASH_EMPTY:
+            continue
+        occupied += 1
+        if a == b:
+            shared += 1
+    return shared / occupied if occupied else 0.0
+
+class _PythonAnalysisVisitor(ast.NodeVisitor):
+    """Single-pass collector of imports, definitions, and complexity for a Python AST"""
+    
+    def __init__(self):
+        self.dependencies: List[str] = []
+        self.functions: List[str] = []
+        self.classes: List[str] = []
+        self.complexity_score = 0.0
+        # Lines on which a statement starts: the Python lines-of-code count
+        self.statement_lines: Set[int] = set()
+        # Complexity counters for the functions currently being visited
+        self._fn_stack: List[int] = []
+    
+    def visit(self, node):
+        if isinstance(node, ast.stmt):
+            self.statement_lines.add(node.lineno)
+        return super().visit(node)
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.dependencies.append(alias.name)
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        # Keep the leading dots of relative imports so they can be resolved later
+        module = '.' * node.level + (node.module or '')
+        if module:
+            self.dependencies.append(module)
+    
+    def visit_FunctionDef(self, node):
+        self.functions.append(node.name)
+        # Simple complexity: 1 plus the nested control-flow structures
+        self._fn_stack.append(1)
+        self.generic_visit(node)
+        self.complexity_score += self._fn_stack.pop()
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes.append(node.name)
+        self.complexity_score += 2  # Classes add to complexity
+        self.generic_visit(node)
+    
+    def _visit_control_flow(self, node):
+        if self._fn_stack:
+            self._fn_stack[-1] += 1
+        self.generic_visit(node)
+    
+    visit_If = visit_For = visit_While = visit_Try = _visit_control_flow
+
+def _exclude_pattern_regex(pattern: str) -> str:
+    """Regex for an exclude pattern: a substring, or a '*' glob matching a path's final component"""
+    if '*' not in pattern:
+        return re.escape(pattern)
+    return '[^/\\\\]*'.join(re.escape(part) for part in pattern.split('*')) + '$'
+
+def _write_json(path: Path, data: Any):
+    """Write data (dataclasses included) as indented JSON, using orjson when available"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=asdict)
+
+def _read_json(path: Path) -> Any:
+    """Read a JSON file, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# Below this many files, serial analysis beats process pool start-up
+PARALLEL_MIN_FILES = 50
+
+# Serial analysis reads files ahead on threads; READ_AHEAD bounds the file
+# contents held in memory at once
+READ_WORKERS = 16
+READ_AHEAD = 32
+
 class CodebaseAnalyzer:
     """Analyzes codebases for structure, quality, and patterns"""
     
@@ -74,7 +396,14 @@ class CodebaseAnalyzer:
         # Analysis data
         self.code_files: Dict[str, CodeFile] = {}
         self.duplications: List[CodeDuplication] = []
-        self.dependencies: List[DependencyRelation] = []
+        # Dependency edges stored column-wise; DependencyRelation objects are
+        # only built on demand through the `dependencies` property
+        self.file_ids: Dict[str, int] = {}
+        self.file_names: List[str] = []
+        self.dep_source_idx = array('i')
+        self.dep_target_idx = array('i')
+        self.dep_type = array('B')
+        self.dep_strength = array('d')
         self.metrics: Optional[CodebaseMetrics] = None
         
         # Configuration
@@ -105,6 +434,12 @@ class CodebaseAnalyzer:
             '.venv', 'venv', '.env', 'vendor', 'target', '.next',
             'coverage', '.nyc_output', 'logs', '*.log'
         ]
+        
+        # Built-in and config patterns compiled once: directory names pruned during
+        # the walk, and a single alternation searched against each file path
+        patterns = self.exclude_patterns + self.config.get('exclude_patterns', [])
+        self._excluded_dirs = {pattern.rstrip('/') for pattern in patterns if '*' not in pattern}
+        self._exclude_re = re.compile('|'.join(_exclude_pattern_regex(pattern) for pattern in patterns))
     
     def _setup_logging(self):
         """Setup logging for codebase analyzer"""
@@ -133,19 +468,7 @@ class CodebaseAnalyzer:
     
     def _should_exclude_path(self, path: Path) -> bool:
         """Check if a path should be excluded from analysis"""
-        path_str = str(path)
-        
-        for pattern in self.exclude_patterns:
-            if pattern in path_str:
-                return True
-        
-        # Check custom exclude patterns from config
-        custom_patterns = self.config.get('exclude_patterns', [])
-        for pattern in custom_patterns:
-            if pattern in path_str:
-                return True
-        
-        return False
+        return self._exclude_re.search(str(path)) is not None
     
     def analyze_codebase(self) -> CodebaseMetrics:
         """Perform comprehensive codebase analysis"""
@@ -174,109 +497,152 @@ class CodebaseAnalyzer:
         self.logger.info("Scanning code files...")
         
         max_files = self.config.get('max_analysis_files', 10000)
-        file_count = 0
         
-        for file_path in self.project_root.rglob('*'):
-            if file_count >= max_files:
-                self.logger.warning(f"Reached maximum file limit ({max_files})")
-                break
-            
-            if not file_path.is_file():
-                continue
-            
-            if self._should_exclude_path(file_path):
-                continue
-            
-            if file_path.suffix not in self.language_patterns:
+        # Results from the previous run are reused for files that have not changed
+        cache = self._load_cached_code_files()
+        
+        # Collect candidate paths first so analysis can be fanned out
+        candidates = list(self._iter_code_files())
+        
+        if len(candidates) > max_files:
+            self.logger.warning(f"Reached maximum file limit ({max_files})")
+            candidates = candidates[:max_files]
+        
+        dirty = []
+        for file_path, file_stat in candidates:
+            cached = cache.get(str(file_path.relative_to(self.project_root)))
+            if (cached and cached.mtime_ns == file_stat.st_mtime_ns
+                    and cached.size == file_stat.st_size):
+                self.code_files[str(file_path)] = _intern_code_file(cached)
+            else:
+                dirty.append(file_path)
+        
+        self.logger.info(f"Reusing {len(candidates) - len(dirty)} unchanged files, analyzing {len(dirty)}")
+        
+        for file_path, code_file in zip(dirty, self._map_analyze(dirty)):
+            if code_file:
+                self.code_files[str(file_path)] = _intern_code_file(code_file)
+        
+        self.logger.info(f"Scanned {len(self.code_files)} code files")
+    
+    def _iter_code_files(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        """Walk the project with os.scandir, pruning excluded directories before descending"""
+        stack = [str(self.project_root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    entries = list(entries)
+            except OSError as e:
+                self.logger.debug(f"Could not scan {directory}: {e}")
                 continue
             
-            try:
-                code_file = self._analyze_code_file(file_path)
-                if code_file:
-                    self.code_files[str(file_path)] = code_file
-                    file_count += 1
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self._excluded_dirs:
+                            stack.append(entry.path)
+                        continue
                     
-                    if file_count % 100 == 0:
-                        self.logger.info(f"Analyzed {file_count} files...")
-                        
-            except Exception as e:
-                self.logger.error(f"Error analyzing {file_path}: {e}")
-        
-        self.logger.info(f"Scanned {len(self.code_files)} code files")
+                    if os.path.splitext(entry.name)[1] not in self.language_patterns:
+                        continue
+                    
+                    file_path = Path(entry.path)
+                    if self._should_exclude_path(file_path.relative_to(self.project_root)):
+                        continue
+                    
+                    file_stat = entry.stat()
+                except OSError:
+                    continue
+                
+                if stat.S_ISREG(file_stat.st_mode):
+                    yield file_path, file_stat
     
-    def _analyze_code_file(self, file_path: Path) -> Optional[CodeFile]:
-        """Analyze a single code file"""
+    def _load_cached_code_files(self) -> Dict[str, CodeFile]:
+        """Load the previous run's per-file analysis, keyed by project-relative path"""
+        cache_file = self.analysis_dir / "code-files.json"
+        if not cache_file.exists():
+            return {}
+        
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            files_data = _read_json(cache_file)
+            cached_files = (CodeFile(**data) for data in files_data.values())
+            return {code_file.path: code_file for code_file in cached_files}
         except Exception as e:
-            self.logger.debug(f"Could not read {file_path}: {e}")
-            return None
-        
-        language = self.language_patterns.get(file_path.suffix, 'unknown')
-        
-        # Basic metrics
-        lines = content.split('\n')
-        lines_of_code = len([line for line in lines if line.strip() and not line.strip().startswith('#')])
-        
-        # Language-specific analysis
-        dependencies = []
-        exports = []
-        functions = []
-        classes = []
-        complexity_score = 0.0
+            # Unreadable or written by an older version: analyze everything
+            self.logger.debug(f"Ignoring analysis cache: {e}")
+            return {}
+    
+    def _map_analyze(self, paths: List[Path]) -> List[Optional[CodeFile]]:
+        """Analyze files across worker processes, falling back to serial analysis"""
+        workers = self.config.get('analysis_workers') or os.cpu_count() or 1
         
-        if language == 'python':
-            dependencies, exports, functions, classes, complexity_score = self._analyze_python_file(content)
-        elif language in ['javascript', 'typescript']:
-            dependencies, exports, functions, classes, complexity_score = self._analyze_js_file(content)
-        elif language == 'java':
-            dependencies, exports, functions, classes, complexity_score = self._analyze_java_file(content)
-        # Add more language-specific analyzers as needed
-        
-        file_hash = hashlib.md5(content.encode()).hexdigest()
-        
-        return CodeFile(
-            path=str(file_path.relative_to(self.project_root)),
-            language=language,
-            size=len(content),
-            lines_of_code=lines_of_code,
-            complexity_score=complexity_score,
-            dependencies=dependencies,
-            exports=exports,
-            functions=functions,
-            classes=classes,
-            hash=file_hash
-        )
+        # Process start-up costs more than it saves on small projects
+        if workers > 1 and len(paths) >= PARALLEL_MIN_FILES:
+            chunksize = max(1, min(64, len(paths) // (workers * 4)))
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_analysis_worker) as executor:
+                    return list(executor.map(
+                        _analyze_code_file_worker,
+                        paths,
+                        repeat(self.project_root),
+                        repeat(self.language_patterns),
+                        chunksize=chunksize
+                    ))
+            except Exception as e:
+                self.logger.warning(f"Parallel analysis unavailable, analyzing serially: {e}")
+        
+        # Serially analyzed files still have their reads overlapped on threads
+        results = []
+        for index, (file_path, file_read) in enumerate(self._read_ahead(paths), 1):
+            results.append(self._analyze_code_file(file_path, file_read))
+            if index % 100 == 0:
+                self.logger.info(f"Analyzed {index} files...")
+        return results
+    
+    @staticmethod
+    def _read_ahead(paths: List[Path]) -> Iterator[Tuple[Path, Optional[Tuple[os.stat_result, bytes]]]]:
+        """Read files on a thread pool in order, keeping a bounded number of reads in flight"""
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+            pending = deque()
+            for file_path in paths:
+                pending.append((file_path, executor.submit(_read_code_file, file_path)))
+                if len(pending) >= READ_AHEAD:
+                    file_path, future = pending.popleft()
+                    yield file_path, future.result()
+            
+            while pending:
+                file_path, future = pending.popleft()
+                yield file_path, future.result()
+    
+    def _analyze_code_file(self, file_path: Path,
+                           file_read: Optional[Tuple[os.stat_result, bytes]] = None) -> Optional[CodeFile]:
+        """Analyze a single code file"""
+        return _analyze_code_file_worker(file_path, self.project_root, self.language_patterns, file_read)
     
-    def _analyze_python_file(self, content: str) -> Tuple[List[str], List[str], List[str], List[str], float]:
-        """Analyze Python file for dependencies, exports, functions, classes, and complexity"""
+    @staticmethod
+    def _analyze_python_file(content: str, filename: str = '<unknown>'
+                             ) -> Tuple[List[str], List[str], List[str], List[str], float, Optional[int]]:
+        """Analyze Python file for dependencies, exports, functions, classes, complexity,
+        and lines of code (statement lines, or None when the file does not parse)"""
         dependencies = []
         exports = []
         functions = []
         classes = []
         complexity_score = 0.0
+        lines_of_code = None
         
         try:
-            tree = ast.parse(content)
+            # compile() directly: ast.parse adds a wrapper call per file
+            tree = compile(content, filename, 'exec', flags=ast.PyCF_ONLY_AST, dont_inherit=True)
             
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        dependencies.append(alias.name)
-                
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        dependencies.append(node.module)
-                
-                elif isinstance(node, ast.FunctionDef):
-                    functions.append(node.name)
-                    # Simple complexity: count nested structures
-                    complexity_score += 1 + len([n for n in ast.walk(node) if isinstance(n, (ast.If, ast.For, ast.While, ast.Try))])
-                
-                elif isinstance(node, ast.ClassDef):
-                    classes.append(node.name)
-                    complexity_score += 2  # Classes add to complexity
+            visitor = _PythonAnalysisVisitor()
+            visitor.visit(tree)
+            dependencies = visitor.dependencies
+            functions = visitor.functions
+            classes = visitor.classes
+            complexity_score = visitor.complexity_score
+            lines_of_code = len(visitor.statement_lines)
             
             # Exports are typically functions and classes at module level
             exports = functions + classes
@@ -285,9 +651,10 @@ class CodebaseAnalyzer:
             # File has syntax errors, skip detailed analysis
             pass
         
-        return dependencies, exports, functions, classes, complexity_score
+        return dependencies, exports, functions, classes, complexity_score, lines_of_code
     
-    def _analyze_js_file(self, content: str) -> Tuple[List[str], List[str], List[str], List[str], float]:
+    @staticmethod
+    def _analyze_js_file(content: str) -> Tuple[List[str], List[str], List[str], List[str], float]:
         """Analyze JavaScript/TypeScript file (simplified analysis)"""
         dependencies = []
         exports = []
@@ -295,54 +662,28 @@ class CodebaseAnalyzer:
         classes = []
         complexity_score = 0.0
         
-        lines = content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
+        for match in _JS_TOKEN_RE.finditer(content):
+            kind = match.lastgroup
             
-            # Import statements
-            if line.startswith('import ') or line.startswith('const ') and 'require(' in line:
-                # Extract module name (simplified)
-                if 'from ' in line:
-                    module = line.split('from ')[-1].strip().strip('\'"')
-                    dependencies.append(module)
-                elif 'require(' in line:
-                    match = re.search(r'require\([\'"]([^\'"]+)[\'"]', line)
-                    if match:
-                        dependencies.append(match.group(1))
-            
-            # Export statements
-            elif line.startswith('export '):
-                if 'function ' in line:
-                    match = re.search(r'function\s+(\w+)', line)
-                    if match:
-                        exports.append(match.group(1))
-                elif 'class ' in line:
-                    match = re.search(r'class\s+(\w+)', line)
-                    if match:
-                        exports.append(match.group(1))
-            
-            # Function declarations
-            elif 'function ' in line:
-                match = re.search(r'function\s+(\w+)', line)
-                if match:
-                    functions.append(match.group(1))
+            if kind == 'ctrl':
+                complexity_score += 0.5
+            elif kind in ('import_mod', 'require_mod'):
+                dependencies.append(match.group(kind))
+            elif kind in ('export_fn', 'export_cls'):
+                exports.append(match.group(kind))
+            elif kind == 'fn':
+                functions.append(match.group(kind))
                 complexity_score += 1
-            
-            # Class declarations
-            elif line.startswith('class '):
-                match = re.search(r'class\s+(\w+)', line)
-                if match:
-                    classes.append(match.group(1))
+            elif kind == 'anon_fn':
+                complexity_score += 1
+            elif kind == 'cls':
+                classes.append(match.group(kind))
                 complexity_score += 2
-            
-            # Complexity indicators
-            elif any(keyword in line for keyword in ['if ', 'for ', 'while ', 'switch ', 'try ']):
-                complexity_score += 0.5
         
         return dependencies, exports, functions, classes, complexity_score
     
-    def _analyze_java_file(self, content: str) -> Tuple[List[str], List[str], List[str], List[str], float]:
+    @staticmethod
+    def _analyze_java_file(content: str) -> Tuple[List[str], List[str], List[str], List[str], float]:
         """Analyze Java file (simplified analysis)"""
         dependencies = []
         exports = []
@@ -350,35 +691,21 @@ class CodebaseAnalyzer:
         classes = []
         complexity_score = 0.0
         
-        lines = content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
+        for match in _JAVA_TOKEN_RE.finditer(content):
+            kind = match.lastgroup
             
-            # Import statements
-            if line.startswith('import '):
-                import_name = line.replace('import ', '').replace(';', '').strip()
-                dependencies.append(import_name)
-            
-            # Class declarations
-            elif 'class ' in line and not line.startswith('//'):
-                match = re.search(r'class\s+(\w+)', line)
-                if match:
-                    class_name = match.group(1)
-                    classes.append(class_name)
-                    exports.append(class_name)
+            if kind == 'ctrl':
+                complexity_score += 0.5
+            elif kind == 'import':
+                dependencies.append(match.group(kind))
+            elif kind == 'cls':
+                class_name = match.group(kind)
+                classes.append(class_name)
+                exports.append(class_name)
                 complexity_score += 2
-            
-            # Method declarations
-            elif re.search(r'(public|private|protected).*\w+\s*\(', line):
-                match = re.search(r'\s+(\w+)\s*\(', line)
-                if match:
-                    functions.append(match.group(1))
+            elif kind == 'method':
+                functions.append(match.group(kind))
                 complexity_score += 1
-            
-            # Complexity indicators
-            elif any(keyword in line for keyword in ['if ', 'for ', 'while ', 'switch ', 'try ']):
-                complexity_score += 0.5
         
         return dependencies, exports, functions, classes, complexity_score
     
@@ -386,81 +713,228 @@ class CodebaseAnalyzer:
         """Analyze dependencies between files"""
         self.logger.info("Analyzing dependencies...")
         
-        # Create a mapping of exports to files
-        exports_map = defaultdict(list)
+        # Index files by project-relative path without suffix (packages by their
+        # directory), and by every dotted suffix of that path as a module name
+        path_index: Dict[str, str] = {}
+        module_index: Dict[str, List[str]] = defaultdict(list)
         for file_path, code_file in self.code_files.items():
-            for export in code_file.exports:
-                exports_map[export].append(file_path)
+            stem = os.path.splitext(code_file.path)[0].replace(os.sep, '/')
+            parent, name = os.path.split(stem) if '/' in stem else ('', stem)
+            if name in ('__init__', 'index'):
+                stem = parent
+            if not stem:
+                continue
+            
+            path_index.setdefault(stem, file_path)
+            parts = stem.split('/')
+            for i in range(len(parts)):
+                module_index['.'.join(parts[i:])].append(file_path)
         
         # Find dependency relationships
         for file_path, code_file in self.code_files.items():
             for dependency in code_file.dependencies:
-                # Look for internal dependencies
-                if dependency in exports_map:
-                    for target_file in exports_map[dependency]:
-                        if target_file != file_path:
-                            relation = DependencyRelation(
-                                source=file_path,
-                                target=target_file,
-                                relation_type='import',
-                                strength=1.0
-                            )
-                            self.dependencies.append(relation)
+                if dependency.startswith('.'):
+                    # Relative imports resolve against the importing file's directory
+                    target = self._resolve_relative_import(code_file, dependency, path_index)
+                    targets = [target] if target else []
+                    strength = 0.8
+                elif code_file.language in ('python', 'java'):
+                    # Dotted module names resolve by longest-prefix match
+                    targets = self._resolve_module_import(dependency, module_index)
+                    strength = 1.0 / len(targets) if targets else 0.0
+                else:
+                    # Bare package specifiers (npm packages etc.) are external
+                    continue
                 
-                # Check for relative imports
-                elif dependency.startswith('.'):
-                    # Handle relative imports (simplified)
-                    base_path = Path(file_path).parent
-                    target_path = (base_path / dependency).with_suffix('.py')  # Assume Python for now
-                    
-                    if str(target_path) in self.code_files:
-                        relation = DependencyRelation(
-                            source=file_path,
-                            target=str(target_path),
-                            relation_type='import',
-                            strength=0.8
-                        )
-                        self.dependencies.append(relation)
+                for target_file in targets:
+                    if target_file != file_path:
+                        self._add_dependency(file_path, target_file, 'import', strength)
+    
+    def _file_id(self, file_path: str) -> int:
+        """Return the integer id for a file path, assigning one on first use"""
+        file_id = self.file_ids.get(file_path)
+        if file_id is None:
+            file_id = self.file_ids[file_path] = len(self.file_names)
+            self.file_names.append(file_path)
+        return file_id
+    
+    def _add_dependency(self, source: str, target: str, relation_type: str, strength: float):
+        """Append a dependency edge to the columnar edge arrays"""
+        self.dep_source_idx.append(self._file_id(source))
+        self.dep_target_idx.append(self._file_id(target))
+        self.dep_type.append(RELATION_TYPES.index(relation_type))
+        self.dep_strength.append(strength)
+    
+    @property
+    def dependencies(self) -> List[DependencyRelation]:
+        """Dependency edges as DependencyRelation objects"""
+        names = self.file_names
+        return [
+            DependencyRelation(
+                source=names[source],
+                target=names[target],
+                relation_type=RELATION_TYPES[relation_type],
+                strength=strength
+            )
+            for source, target, relation_type, strength in zip(
+                self.dep_source_idx, self.dep_target_idx, self.dep_type, self.dep_strength
+            )
+        ]
+    
+    @staticmethod
+    def _resolve_module_import(dependency: str, module_index: Dict[str, List[str]]) -> List[str]:
+        """Resolve a dotted import to files via the longest matching module prefix"""
+        parts = dependency.rstrip('.*').split('.')
+        for end in range(len(parts), 0, -1):
+            targets = module_index.get('.'.join(parts[:end]))
+            if targets:
+                return targets
+        return []
+    
+    def _resolve_relative_import(self, code_file: CodeFile, dependency: str,
+                                 path_index: Dict[str, str]) -> Optional[str]:
+        """Resolve a relative import ('.mod', '..pkg.mod', './file') to a file"""
+        base = os.path.dirname(code_file.path).replace(os.sep, '/')
+        
+        if code_file.language == 'python':
+            module = dependency.lstrip('.')
+            for _ in range(len(dependency) - len(module) - 1):
+                base = os.path.dirname(base)
+            target = '/'.join(filter(None, [base] + module.split('.')))
+        else:
+            target = os.path.normpath(os.path.join(base, dependency)).replace(os.sep, '/')
+            suffix = os.path.splitext(target)[1]
+            if suffix in self.language_patterns:
+                target = target[:-len(suffix)]
+        
+        return path_index.get(target)
     
     def _detect_duplications(self):
         """Detect code duplications across files"""
         self.logger.info("Detecting code duplications...")
         
-        # Simple hash-based duplication detection
-        file_hashes = {}
-        for file_path, code_file in self.code_files.items():
-            if code_file.hash in file_hashes:
-                # Exact duplicate
+        # Hashes and LSH band buckets live in an on-disk index that is only
+        # updated for changed files; groupings are computed by SQL
+        by_relative_path = {code_file.path: file_path for file_path, code_file in self.code_files.items()}
+        con = sqlite3.connect(str(self.analysis_dir / "index.db"))
+        try:
+            self._sync_duplication_index(con)
+            
+            # Exact duplicates, one record per hash group
+            hash_groups = con.execute(
+                "SELECT GROUP_CONCAT(path, char(0)) FROM files GROUP BY hash HAVING COUNT(*) > 1"
+            ).fetchall()
+            
+            # Near-duplicate detection over one representative per exact-hash group;
+            # files sharing any LSH band bucket become candidate pairs
+            representatives = {
+                row[0] for row in con.execute("SELECT MIN(path) FROM files GROUP BY hash")
+            }
+            candidate_rows = con.execute(
+                "SELECT DISTINCT a.path, b.path FROM bands a JOIN bands b "
+                "ON a.band = b.band AND a.bucket = b.bucket AND a.path < b.path"
+            ).fetchall()
+        finally:
+            con.close()
+        
+        for (paths,) in hash_groups:
+            files = sorted(by_relative_path[path] for path in paths.split('\0'))
+            # Exact duplicate
+            duplication = CodeDuplication(
+                similarity_score=1.0,
+                files=files,
+                duplicate_lines=[],
+                duplicate_content="Exact file duplicate"
+            )
+            self.duplications.append(duplication)
+        
+        threshold = self.config.get('duplication_threshold', 0.5)
+        signatures = {
+            by_relative_path[path]: self.code_files[by_relative_path[path]].signature
+            for path in representatives
+        }
+        candidates = [
+            (by_relative_path[path1], by_relative_path[path2])
+            for path1, path2 in candidate_rows
+            if path1 in representatives and path2 in representatives
+        ]
+        
+        # Cluster similar files with union-find so each group is reported once
+        parent = {}
+        
+        def find(node):
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+        
+        edge_scores = []
+        for file1, file2 in candidates:
+            similarity = _estimate_jaccard(signatures[file1], signatures[file2])
+            if similarity >= threshold:
+                parent[find(file1)] = find(file2)
+                edge_scores.append((file1, similarity))
+        
+        clusters = defaultdict(list)
+        for file_path in parent:
+            clusters[find(file_path)].append(file_path)
+        
+        cluster_scores = defaultdict(list)
+        for file_path, similarity in edge_scores:
+            cluster_scores[find(file_path)].append(similarity)
+        
+        for root, files in clusters.items():
+            if len(files) > 1:
+                scores = cluster_scores[root]
+                similarity = sum(scores) / len(scores)
                 duplication = CodeDuplication(
-                    similarity_score=1.0,
-                    file1=file_hashes[code_file.hash],
-                    file2=file_path,
+                    similarity_score=similarity,
+                    files=sorted(files),
                     duplicate_lines=[],
-                    duplicate_content="Exact file duplicate"
+                    duplicate_content=f"Near-duplicate content (~{similarity:.0%} of shingles shared)"
                 )
                 self.duplications.append(duplication)
-            else:
-                file_hashes[code_file.hash] = file_path
-        
-        # Function-level duplication detection
-        function_signatures = defaultdict(list)
-        for file_path, code_file in self.code_files.items():
-            for function in code_file.functions:
-                function_signatures[function].append(file_path)
+    
+    def _sync_duplication_index(self, con: sqlite3.Connection):
+        """Bring the duplication index in line with code_files, rewriting only changed files"""
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, hash TEXT NOT NULL, mtime_ns INTEGER, size INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS files_hash ON files (hash);
+            CREATE TABLE IF NOT EXISTS bands (path TEXT NOT NULL, band INTEGER, bucket BLOB);
+            CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+            CREATE INDEX IF NOT EXISTS bands_path ON bands (path);
+        """)
+        
+        indexed = {
+            path: (file_hash, mtime_ns, size)
+            for path, file_hash, mtime_ns, size in con.execute("SELECT path, hash, mtime_ns, size FROM files")
+        }
+        current = {code_file.path: code_file for code_file in self.code_files.values()}
         
-        for function_name, files in function_signatures.items():
-            if len(files) > 1:
-                # Potential function duplication
-                for i in range(len(files)):
-                    for j in range(i + 1, len(files)):
-                        duplication = CodeDuplication(
-                            similarity_score=0.7,  # Estimated
-                            file1=files[i],
-                            file2=files[j],
-                            duplicate_lines=[],
-                            duplicate_content=f"Function '{function_name}' appears in multiple files"
-                        )
-                        self.duplications.append(duplication)
+        stale = [
+            path for path, state in indexed.items()
+            if path not in current
+            or state != (current[path].hash, current[path].mtime_ns, current[path].size)
+        ]
+        fresh = [code_file for path, code_file in current.items() if path not in indexed or path in stale]
+        
+        with con:
+            con.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in stale))
+            con.executemany("DELETE FROM bands WHERE path = ?", ((path,) for path in stale))
+            con.executemany(
+                "INSERT INTO files (path, hash, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                ((cf.path, cf.hash, cf.mtime_ns, cf.size) for cf in fresh)
+            )
+            con.executemany(
+                "INSERT INTO bands (path, band, bucket) VALUES (?, ?, ?)",
+                ((cf.path, band, bucket) for cf in fresh for band, bucket in _lsh_buckets(cf.signature))
+            )
+        
+        if stale or fresh:
+            self.logger.info(f"Duplication index: {len(stale)} stale, {len(fresh)} updated files")
     
     def _calculate_metrics(self) -> CodebaseMetrics:
         """Calculate overall codebase metrics"""
@@ -486,10 +960,10 @@ class CodebaseAnalyzer:
                 complexity_ranges['very_high'] += 1
         
         # Dependency depth (simplified)
-        dependency_depth = len(set(dep.target for dep in self.dependencies))
+        dependency_depth = len(set(self.dep_target_idx))
         
         # Duplication percentage
-        duplicated_files = len(set(d.file1 for d in self.duplications) | set(d.file2 for d in self.duplications))
+        duplicated_files = len({file for d in self.duplications for file in d.files})
         duplication_percentage = (duplicated_files / total_files) * 100 if total_files > 0 else 0
         
         # Test coverage estimate (based on test file presence)
@@ -509,24 +983,17 @@ class CodebaseAnalyzer:
     def _save_analysis_results(self):
         """Save analysis results to files"""
         # Save code files analysis
-        files_data = {path: asdict(code_file) for path, code_file in self.code_files.items()}
-        with open(self.analysis_dir / "code-files.json", 'w') as f:
-            json.dump(files_data, f, indent=2)
+        _write_json(self.analysis_dir / "code-files.json", self.code_files)
         
         # Save dependencies
-        deps_data = [asdict(dep) for dep in self.dependencies]
-        with open(self.analysis_dir / "dependencies.json", 'w') as f:
-            json.dump(deps_data, f, indent=2)
+        _write_json(self.analysis_dir / "dependencies.json", self.dependencies)
         
         # Save duplications
-        dups_data = [asdict(dup) for dup in self.duplications]
-        with open(self.analysis_dir / "duplications.json", 'w') as f:
-            json.dump(dups_data, f, indent=2)
+        _write_json(self.analysis_dir / "duplications.json", self.duplications)
         
         # Save metrics
         if self.metrics:
-            with open(self.analysis_dir / "metrics.json", 'w') as f:
-                json.dump(asdict(self.metrics), f, indent=2)
+            _write_json(self.analysis_dir / "metrics.json", self.metrics)
         
         self.logger.info(f"Analysis results saved to {self.analysis_dir}")
     
@@ -536,48 +1003,78 @@ class CodebaseAnalyzer:
     
     def get_dependency_graph(self) -> Dict[str, List[str]]:
         """Get dependency graph as adjacency list"""
+        names = self.file_names
         graph = defaultdict(list)
-        for dep in self.dependencies:
-            graph[dep.source].append(dep.target)
+        for source, target in zip(self.dep_source_idx, self.dep_target_idx):
+            graph[names[source]].append(names[target])
         return dict(graph)
     
     def find_circular_dependencies(self) -> List[List[str]]:
-        """Find circular dependencies in the codebase"""
+        """Find circular dependencies in the codebase (strongly connected components)"""
         graph = self.get_dependency_graph()
-        cycles = []
-        
-        def dfs(node, path, visited):
-            if node in path:
-                # Found a cycle
-                cycle_start = path.index(node)
-                cycle = path[cycle_start:] + [node]
-                cycles.append(cycle)
-                return
-            
-            if node in visited:
-                return
-            
-            visited.add(node)
-            path.append(node)
+        
+        return [
+            scc for scc in self._tarjan_scc(graph)
+            if len(scc) > 1 or scc[0] in graph.get(scc[0], [])
+        ]
+    
+    @staticmethod
+    def _tarjan_scc(graph: Dict[str, List[str]]) -> List[List[str]]:
+        """Iterative Tarjan's algorithm returning every strongly connected component"""
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        sccs: List[List[str]] = []
+        
+        for root in graph:
+            if root in index_of:
+                continue
             
-            for neighbor in graph.get(node, []):
-                dfs(neighbor, path, visited)
+            index_of[root] = lowlink[root] = len(index_of)
+            stack.append(root)
+            on_stack.add(root)
+            work_stack = [(root, iter(graph.get(root, [])))]
             
-            path.pop()
-        
-        visited = set()
-        for node in graph:
-            if node not in visited:
-                dfs(node, [], visited)
-        
-        return cycles
+            while work_stack:
+                node, neighbors = work_stack[-1]
+                
+                for neighbor in neighbors:
+                    if neighbor not in index_of:
+                        index_of[neighbor] = lowlink[neighbor] = len(index_of)
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work_stack.append((neighbor, iter(graph.get(neighbor, []))))
+                        break
+                    if neighbor in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[neighbor])
+                else:
+                    # All neighbors done: pop the frame and propagate the lowlink
+                    work_stack.pop()
+                    if work_stack:
+                        parent = work_stack[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    
+                    if lowlink[node] == index_of[node]:
+                        scc = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            scc.append(member)
+                            if member == node:
+                                break
+                        sccs.append(scc[::-1])
+        
+        return sccs
     
     def generate_analysis_report(self) -> str:
         """Generate a comprehensive analysis report"""
         if not self.metrics:
             return "No analysis data available. Run analyze_codebase() first."
         
-        report = f"""# Codebase Analysis Report
+        report = []
+        append = report.append
+        append(f"""# Codebase Analysis Report
 
 ## Overview
 - **Total Files**: {self.metrics.total_files:,}
@@ -587,38 +1084,39 @@ class CodebaseAnalyzer:
 - **Estimated Test Coverage**: {self.metrics.test_coverage_estimate:.1f}%
 
 ## Language Distribution
-"""
+""")
         
         for language, count in self.metrics.languages.items():
             percentage = (count / self.metrics.total_files) * 100
-            report += f"- **{language.title()}**: {count} files ({percentage:.1f}%)\n"
+            append(f"- **{language.title()}**: {count} files ({percentage:.1f}%)\n")
         
-        report += "\n## Complexity Distribution\n"
+        append("\n## Complexity Distribution\n")
         for level, count in self.metrics.complexity_distribution.items():
             percentage = (count / self.metrics.total_files) * 100
-            report += f"- **{level.replace('_', ' ').title()}**: {count} files ({percentage:.1f}%)\n"
+            append(f"- **{level.replace('_', ' ').title()}**: {count} files ({percentage:.1f}%)\n")
         
         # High complexity files
         high_complexity_files = self.get_files_by_complexity(25.0)
         if high_complexity_files:
-            report += f"\n## High Complexity Files ({len(high_complexity_files)} files)\n"
+            append(f"\n## High Complexity Files ({len(high_complexity_files)} files)\n")
             for cf in sorted(high_complexity_files, key=lambda x: x.complexity_score, reverse=True)[:10]:
-                report += f"- **{cf.path}**: {cf.complexity_score:.1f} complexity, {cf.lines_of_code} LOC\n"
+                append(f"- **{cf.path}**: {cf.complexity_score:.1f} complexity, {cf.lines_of_code} LOC\n")
         
         # Duplications
         if self.duplications:
-            report += f"\n## Code Duplications ({len(self.duplications)} detected)\n"
+            append(f"\n## Code Duplications ({len(self.duplications)} detected)\n")
             for dup in self.duplications[:10]:
-                report += f"- **{dup.file1}** ↔ **{dup.file2}** (similarity: {dup.similarity_score:.1%})\n"
+                files = ' ↔ '.join(f"**{file}**" for file in dup.files)
+                append(f"- {files} (similarity: {dup.similarity_score:.1%})\n")
         
         # Circular dependencies
         cycles = self.find_circular_dependencies()
         if cycles:
-            report += f"\n## Circular Dependencies ({len(cycles)} detected)\n"
+            append(f"\n## Circular Dependencies ({len(cycles)} detected)\n")
             for cycle in cycles[:5]:
-                report += f"- {' → '.join(cycle)}\n"
+                append(f"- {' → '.join(cycle)}\n")
         
-        return report
+        return ''.join(report)
     
     def suggest_refactoring_opportunities(self) -> List[Dict[str, Any]]:
         """Suggest refactoring opportunities based on analysis"""
@@ -639,7 +1137,7 @@ class CodebaseAnalyzer:
             if dup.similarity_score > 0.8:
                 suggestions.append({
                     'type': 'code_duplication',
-                    'files': [dup.file1, dup.file2],
+                    'files': dup.files,
                     'description': f'High similarity detected. Consider extracting common functionality.',
                     'priority': 'medium'
                 })
@@ -666,6 +1164,104 @@ class CodebaseAnalyzer:
         
         return suggestions
 
+def _intern_code_file(code_file: CodeFile) -> CodeFile:
+    """Intern the strings repeated across files (languages, module and symbol names).
+
+    Done in the main process: strings unpickled from workers or loaded from the
+    cache are fresh objects, so interning inside the analyzers would not stick.
+    """
+    code_file.language = sys.intern(code_file.language)
+    code_file.dependencies = [sys.intern(name) for name in code_file.dependencies]
+    code_file.exports = [sys.intern(name) for name in code_file.exports]
+    code_file.functions = [sys.intern(name) for name in code_file.functions]
+    code_file.classes = [sys.intern(name) for name in code_file.classes]
+    return code_file
+
+def _init_analysis_worker():
+    """Worker process start-up: analysis only compiles to AST, never to bytecode files"""
+    sys.dont_write_bytecode = True
+
+def _read_code_file(file_path: Path) -> Optional[Tuple[os.stat_result, bytes]]:
+    """Read a file's bytes along with the stat of the opened file"""
+    try:
+        with open(file_path, 'rb') as f:
+            return os.fstat(f.fileno()), f.read()
+    except Exception as e:
+        logging.getLogger("CodebaseAnalyzer").debug(f"Could not read {file_path}: {e}")
+        return None
+
+def _analyze_code_file_worker(file_path: Path, project_root: Path, language_patterns: Dict[str, str],
+                              file_read: Optional[Tuple[os.stat_result, bytes]] = None) -> Optional[CodeFile]:
+    """Analyze a single code file (module-level so it can run in worker processes)"""
+    try:
+        if file_read is None:
+            file_read = _read_code_file(file_path)
+        if file_read is None:
+            return None
+        
+        file_stat, data = file_read
+        return _analyze_code_file_contents(file_path, project_root, language_patterns, file_stat, data)
+    except Exception as e:
+        logging.getLogger("CodebaseAnalyzer").error(f"Error analyzing {file_path}: {e}")
+        return None
+
+def _analyze_code_file_contents(file_path: Path, project_root: Path, language_patterns: Dict[str, str],
+                                file_stat: os.stat_result, data: bytes) -> CodeFile:
+    """Analyze the contents of a single code file"""
+    # Hash the raw bytes once rather than re-encoding the decoded text
+    file_hash = hashlib.md5(data).hexdigest()
+    # utf-8-sig drops a leading BOM, which the Python compiler would reject
+    content = data.decode('utf-8-sig', errors='ignore')
+    
+    language = language_patterns.get(file_path.suffix, 'unknown')
+    
+    # Language-specific analysis
+    dependencies = []
+    exports = []
+    functions = []
+    classes = []
+    complexity_score = 0.0
+    lines_of_code = None
+    
+    # A real parse is preferred where tree-sitter and a grammar are available
+    grammar = TREE_SITTER_GRAMMARS.get(file_path.suffix)
+    tree_sitter_analysis = _analyze_with_tree_sitter(content, grammar) if grammar else None
+    
+    if tree_sitter_analysis is not None:
+        dependencies, exports, functions, classes, complexity_score = tree_sitter_analysis
+    elif language == 'python':
+        # The AST pass also yields the lines of code, saving a scan of the text
+        (dependencies, exports, functions, classes, complexity_score,
+         lines_of_code) = CodebaseAnalyzer._analyze_python_file(content, file_path.name)
+    elif language in ['javascript', 'typescript']:
+        dependencies, exports, functions, classes, complexity_score = CodebaseAnalyzer._analyze_js_file(content)
+    elif language == 'java':
+        dependencies, exports, functions, classes, complexity_score = CodebaseAnalyzer._analyze_java_file(content)
+    # Add more language-specific analyzers as needed
+    
+    if lines_of_code is None:
+        # Basic metrics: non-blank lines that are not '#' comments
+        lines_of_code = 0
+        for line in content.splitlines():
+            stripped = line.lstrip()
+            if stripped and stripped[0] != '#':
+                lines_of_code += 1
+    
+    return CodeFile(
+        path=str(file_path.relative_to(project_root)),
+        language=language,
+        size=len(data),
+        lines_of_code=lines_of_code,
+        complexity_score=complexity_score,
+        dependencies=dependencies,
+        exports=exports,
+        functions=functions,
+        classes=classes,
+        hash=file_hash,
+        signature=_minhash_signature(_shingle_hashes(content)),
+        mtime_ns=file_stat.st_mtime_ns
+    )
+
 def main():
     """CLI interface for codebase analyzer"""
     import argparse
@@ -690,18 +1286,20 @@ def main():
     
     if args.suggestions:
         suggestions = analyzer.suggest_refactoring_opportunities()
-        print(f"\n## Refactoring Suggestions ({len(suggestions)} found)\n")
+        output = [f"\n## Refactoring Suggestions ({len(suggestions)} found)\n\n"]
         
         for suggestion in suggestions:
             priority_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(suggestion['priority'], "⚪")
-            print(f"{priority_emoji} **{suggestion['type'].replace('_', ' ').title()}**")
-            print(f"   {suggestion['description']}")
+            output.append(f"{priority_emoji} **{suggestion['type'].replace('_', ' ').title()}**\n")
+            output.append(f"   {suggestion['description']}\n")
             
             if 'file' in suggestion:
-                print(f"   File: {suggestion['file']}")
+                output.append(f"   File: {suggestion['file']}\n")
             elif 'files' in suggestion:
-                print(f"   Files: {', '.join(suggestion['files'])}")
-            print()
+                output.append(f"   Files: {', '.join(suggestion['files'])}\n")
+            output.append("\n")
+        
+        print(''.join(output), end='')
 
 if __name__ == "__main__":
     main()
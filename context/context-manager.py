@@ -8,22 +8,106 @@ import os
 import json
 import time
 import hashlib
+import heapq
 import logging
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 import yaml
 
+try:
+    import blake3
+except ImportError:  # Optional: hashlib.blake2b is used instead
+    blake3 = None
+
+try:
+    import msgspec
+except ImportError:  # Optional: the cache is written as compact JSON instead
+    msgspec = None
+
+# Read size for streaming hashes of files that are not held in memory
+HASH_CHUNK_SIZE = 1 << 20
+
+# Files at least this large are hashed in a stream and their content is not kept in memory
+INLINE_CONTENT_LIMIT = 64 * 1024
+
+# Batches at least this large are validated or read on a thread pool
+PARALLEL_MIN_FILES = 16
+IO_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# stat, inline content (None for large files), size and hash of a file read for context
+FileRead = Tuple[os.stat_result, Optional[bytes], int, str]
+
+# Source file suffixes that get the code relevance bonus
+CODE_SUFFIXES = frozenset(['.py', '.js', '.ts', '.rb', '.java'])
+
+def _path_base_score(file_path: str) -> float:
+    """Task-independent part of a file's relevance score, from its path"""
+    score = 0.5  # Base score
+    
+    # Category-based scoring
+    if "standards" in file_path:
+        score += 0.3
+    elif "product" in file_path:
+        score += 0.2
+    elif "specs" in file_path:
+        score += 0.4
+    elif os.path.splitext(file_path)[1] in CODE_SUFFIXES:
+        score += 0.1
+    
+    return score
+
 @dataclass
 class ContextItem:
     """Represents a single context item with metadata"""
+    # base_score and basename_lower are derived from the path once so scoring never re-parses it
+    __slots__ = ('path', 'size', 'relevance_score', 'last_accessed', 'hash', 'category', 'mtime',
+                 'base_score', 'basename_lower')
+    
     path: str
-    content: str
-    size: int
+    size: int  # Content size in bytes, as on disk when the content was hashed
     relevance_score: float
     last_accessed: float
-    hash: str
+    hash: str  # Also keys the content in the manager's blob store
     category: str  # 'standards', 'product', 'specs', 'code'
+    mtime: float  # File modification time when the content was hashed
+    
+    def __post_init__(self):
+        self.base_score = _path_base_score(self.path)
+        self.basename_lower = os.path.basename(self.path).lower()
+
+@lru_cache(maxsize=64)
+def _task_scorer(task: str) -> Callable[[float, str, Optional[float], float], float]:
+    """Build a relevance scorer specialized to one task's keywords"""
+    # Distinct keywords keep their counts; one regex rules out names matching none of them
+    counts = Counter(task.lower().split())
+    keywords = tuple(counts.items())
+    pattern = re.compile('|'.join(map(re.escape, counts))) if counts else None
+    
+    def score_relevance(base_score: float, name_lower: str, mtime: Optional[float], now: float) -> float:
+        score = base_score
+        
+        # Task-based scoring
+        if pattern is not None and pattern.search(name_lower):
+            for keyword, count in keywords:
+                if keyword in name_lower:
+                    score += 0.2 * count
+        
+        # Recency scoring
+        if mtime is not None:
+            age_days = (now - mtime) / 86400
+            if age_days < 1:
+                score += 0.1
+            elif age_days < 7:
+                score += 0.05
+        
+        return min(score, 1.0)
+    
+    return score_relevance
 
 class ContextManager:
     """Smart context manager for Agent OS"""
@@ -48,7 +132,18 @@ class ContextManager:
         
         # Context storage
         self.context_items: Dict[str, ContextItem] = {}
-        self.current_context_size = 0
+        self.current_context_size = 0  # Bytes of distinct content
+        # Content shared by identical files, keyed by hash, with one reference per item
+        self._blob_store: Dict[str, bytes] = {}
+        self._blob_refs: Counter = Counter()
+        # Per-category item counts and sizes, kept in step with context_items
+        self._category_counts: Counter = Counter()
+        self._category_sizes: Counter = Counter()
+        # Min-heap of (relevance_score, last_accessed, path); entries whose values
+        # no longer match the item are stale and skipped when popped
+        self._eviction_heap: List[Tuple[float, float, str]] = []
+        # Set when the in-memory context differs from the saved cache
+        self._dirty = False
         self.max_context_size = self.config.get('context_management', {}).get('max_context_size', 180000)
         self.warning_threshold = self.config.get('context_management', {}).get('warning_threshold', 150000)
         
@@ -78,134 +173,215 @@ class ContextManager:
         )
         self.logger = logging.getLogger("ContextManager")
     
-    def _calculate_file_hash(self, content: str) -> str:
+    def _calculate_file_hash(self, content: bytes) -> str:
         """Calculate hash for content to detect changes"""
-        return hashlib.md5(content.encode()).hexdigest()
+        if blake3 is not None:
+            return blake3.blake3(content).hexdigest()
+        return hashlib.blake2b(content, digest_size=32).hexdigest()
+    
+    def _hash_file(self, path: Path) -> str:
+        """Hash a file's contents without holding the whole file in memory"""
+        if blake3 is not None:
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            if hasattr(hasher, 'update_mmap'):
+                hasher.update_mmap(path)
+                return hasher.hexdigest()
+        else:
+            hasher = hashlib.blake2b(digest_size=32)
+        
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _cache_file(self) -> Path:
+        """Path of the context cache for the available serializer"""
+        if msgspec is not None:
+            return self.cache_dir / "context_cache.msgpack"
+        return self.cache_dir / "context_cache.json"
     
     def _load_cache(self):
         """Load cached context items"""
-        cache_file = self.cache_dir / "context_cache.json"
+        cache_file = self._cache_file()
         if cache_file.exists():
             try:
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
+                with open(cache_file, 'rb') as f:
+                    if msgspec is not None:
+                        cache_data = msgspec.msgpack.decode(f.read())
+                    else:
+                        cache_data = json.load(f)
                     
-                for item_data in cache_data.get('items', []):
-                    context_item = ContextItem(**item_data)
-                    # Verify file still exists and hasn't changed
-                    if Path(context_item.path).exists():
-                        with open(context_item.path, 'r') as f:
-                            current_content = f.read()
-                            current_hash = self._calculate_file_hash(current_content)
-                            
-                        if current_hash == context_item.hash:
-                            self.context_items[context_item.path] = context_item
-                            self.current_context_size += context_item.size
-                        else:
-                            self.logger.info(f"File changed, invalidating cache: {context_item.path}")
+                items = cache_data.get('items', [])
+                if len(items) >= PARALLEL_MIN_FILES:
+                    with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+                        validated = list(executor.map(self._validate_one, items))
+                else:
+                    validated = [self._validate_one(item_data) for item_data in items]
+                
+                for context_item in validated:
+                    if context_item is not None:
+                        self.context_items[context_item.path] = context_item
+                        self._retain(context_item)
                             
             except Exception as e:
                 self.logger.error(f"Error loading cache: {e}")
+            
+            self._rebuild_eviction_heap()
+    
+    def _validate_one(self, item_data: Dict) -> Optional[ContextItem]:
+        """Rebuild a cached item, or return None if its file is gone or changed"""
+        # Content is read lazily from disk rather than cached
+        item_data.pop('content', None)
+        item_data.pop('file_size', None)
+        try:
+            context_item = ContextItem(**item_data)
+        except TypeError:
+            # Written by an older version without stat metadata
+            self._dirty = True
+            return None
+        
+        # Verify file still exists and hasn't changed
+        try:
+            stat = os.stat(context_item.path)
+        except OSError:
+            self._dirty = True
+            return None
+        
+        # Unchanged mtime and size: trust the cached hash without reading the file
+        if stat.st_mtime == context_item.mtime and stat.st_size == context_item.size:
+            return context_item
+        
+        self._dirty = True
+        try:
+            unchanged = self._hash_file(Path(context_item.path)) == context_item.hash
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            self.logger.info(f"File changed, invalidating cache: {context_item.path}")
+            return None
+        
+        context_item.mtime = stat.st_mtime
+        context_item.size = stat.st_size
+        return context_item
     
     def _save_cache(self):
-        """Save context items to cache"""
-        cache_file = self.cache_dir / "context_cache.json"
+        """Save context items to cache if they changed since the last save"""
+        if not self._dirty:
+            return
+        
+        cache_file = self._cache_file()
         cache_data = {
             'timestamp': time.time(),
             'items': [
                 {
                     'path': item.path,
-                    'content': item.content,
                     'size': item.size,
                     'relevance_score': item.relevance_score,
                     'last_accessed': item.last_accessed,
                     'hash': item.hash,
-                    'category': item.category
+                    'category': item.category,
+                    'mtime': item.mtime
                 }
                 for item in self.context_items.values()
             ]
         }
         
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+        if msgspec is not None:
+            payload = msgspec.msgpack.encode(cache_data)
+        else:
+            payload = json.dumps(cache_data, separators=(',', ':')).encode('utf-8')
+        
+        # Write beside the cache and rename so a crash never leaves it truncated
+        tmp_file = cache_file.with_suffix('.tmp')
+        tmp_file.write_bytes(payload)
+        os.replace(tmp_file, cache_file)
+        self._dirty = False
     
-    def _calculate_relevance_score(self, file_path: str, current_task: str = "") -> float:
+    def _calculate_relevance_score(self, file_path: str, current_task: str = "", mtime: Optional[float] = None) -> float:
         """Calculate relevance score for a file based on current task and file type"""
-        path = Path(file_path)
-        score = 0.5  # Base score
-        
-        # Category-based scoring
-        if "standards" in str(path):
-            score += 0.3
-        elif "product" in str(path):
-            score += 0.2
-        elif "specs" in str(path):
-            score += 0.4
-        elif path.suffix in ['.py', '.js', '.ts', '.rb', '.java']:
-            score += 0.1
-        
-        # Task-based scoring
-        if current_task:
-            task_lower = current_task.lower()
-            file_content_lower = path.name.lower()
-            
-            # Check for keyword matches
-            keywords = task_lower.split()
-            for keyword in keywords:
-                if keyword in file_content_lower:
-                    score += 0.2
+        if mtime is None:
+            try:
+                mtime = os.stat(file_path).st_mtime
+            except OSError:
+                pass
+        score = _task_scorer(current_task)
+        return score(_path_base_score(file_path), os.path.basename(file_path).lower(), mtime, time.time())
+    
+    def _update_relevance_scores(self, current_task: str, touch: bool = False):
+        """Rescore every context item for a task, optionally marking them accessed"""
+        # Specialize the scorer to the task and read the clock once for the whole batch
+        score = _task_scorer(current_task)
+        now = time.time()
+        for item in self.context_items.values():
+            item.relevance_score = score(item.base_score, item.basename_lower, item.mtime, now)
+            if touch:
+                item.last_accessed = now
         
-        # Recency scoring
+        if self.context_items:
+            self._dirty = True
+        self._rebuild_eviction_heap()
+    
+    def _read_file(self, file_path: str) -> Optional[FileRead]:
+        """Stat, read and hash a file for context; safe to run on worker threads"""
         try:
-            mtime = path.stat().st_mtime
-            age_days = (time.time() - mtime) / 86400
-            if age_days < 1:
-                score += 0.1
-            elif age_days < 7:
-                score += 0.05
-        except:
-            pass
-        
-        return min(score, 1.0)
+            stat = os.stat(file_path)
+            if stat.st_size < INLINE_CONTENT_LIMIT:
+                with open(file_path, 'rb') as f:
+                    content = f.read()
+                return stat, content, len(content), self._calculate_file_hash(content)
+            return stat, None, stat.st_size, self._hash_file(Path(file_path))
+        except FileNotFoundError:
+            self.logger.warning(f"File not found: {file_path}")
+        except Exception as e:
+            self.logger.error(f"Error reading file {file_path}: {e}")
+        return None
     
-    def add_context_file(self, file_path: str, category: str = "unknown", current_task: str = "") -> bool:
+    def add_context_file(self, file_path: str, category: str = "unknown", current_task: str = "",
+                         file_read: Optional[FileRead] = None) -> bool:
         """Add a file to context with smart loading"""
         path = Path(file_path)
         
-        if not path.exists():
-            self.logger.warning(f"File not found: {file_path}")
-            return False
+        if file_read is None:
+            file_read = self._read_file(file_path)
+            if file_read is None:
+                return False
+        stat, content, file_size, file_hash = file_read
         
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            self.logger.error(f"Error reading file {file_path}: {e}")
-            return False
+        relevance_score = self._calculate_relevance_score(file_path, current_task, stat.st_mtime)
         
-        file_size = len(content)
-        file_hash = self._calculate_file_hash(content)
-        relevance_score = self._calculate_relevance_score(file_path, current_task)
+        # Content already held for another file takes no extra room
+        added_size = 0 if file_hash in self._blob_refs else file_size
         
         # Check if adding this file would exceed context limit
-        if self.current_context_size + file_size > self.max_context_size:
+        if self.current_context_size + added_size > self.max_context_size:
             self.logger.warning(f"Adding {file_path} would exceed context limit")
             # Try to make room by removing least relevant items
-            if not self._make_room_for_file(file_size):
+            if not self._make_room_for_file(added_size):
                 return False
         
         context_item = ContextItem(
             path=str(path),
-            content=content,
             size=file_size,
             relevance_score=relevance_score,
             last_accessed=time.time(),
             hash=file_hash,
-            category=category
+            category=category,
+            mtime=stat.st_mtime
         )
         
-        self.context_items[str(path)] = context_item
-        self.current_context_size += file_size
+        # Re-adding a file replaces its previous entry
+        previous = self.context_items.pop(context_item.path, None)
+        if previous is not None:
+            self._release(previous)
+        
+        self.context_items[context_item.path] = context_item
+        self._retain(context_item)
+        if content is not None:
+            self._blob_store.setdefault(file_hash, content)
+        self._dirty = True
+        heapq.heappush(self._eviction_heap, (relevance_score, context_item.last_accessed, context_item.path))
+        if len(self._eviction_heap) > 2 * len(self.context_items) + 64:
+            self._rebuild_eviction_heap()
         
         self.logger.info(f"Added to context: {file_path} (size: {file_size}, relevance: {relevance_score:.2f})")
         
@@ -215,50 +391,153 @@ class ContextManager:
         
         return True
     
+    def _iter_files(self, root: str) -> Iterator[os.DirEntry]:
+        """Walk a directory with os.scandir, skipping hidden directories"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith('.') and entry.name != '__pycache__':
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+            except OSError as e:
+                self.logger.warning(f"Cannot scan directory {directory}: {e}")
+    
+    def add_context_files(self, paths: List[str], category: str = "unknown", current_task: str = "") -> int:
+        """Add files and directory trees to context, returning the number added"""
+        file_paths = []
+        for file_path in paths:
+            if not os.path.isdir(file_path):
+                file_paths.append(file_path)
+                continue
+            
+            for entry in self._iter_files(file_path):
+                # DirEntry stats are cached, so unchanged files cost no extra syscall
+                item = self.context_items.get(entry.path)
+                stat = entry.stat(follow_symlinks=False)
+                if item is not None and item.mtime == stat.st_mtime and item.size == stat.st_size:
+                    continue
+                file_paths.append(entry.path)
+        
+        # Read and hash on worker threads; insertion stays serial and in order
+        if len(file_paths) >= PARALLEL_MIN_FILES:
+            with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+                file_reads = list(executor.map(self._read_file, file_paths))
+        else:
+            file_reads = [self._read_file(file_path) for file_path in file_paths]
+        
+        added = 0
+        for file_path, file_read in zip(file_paths, file_reads):
+            if file_read is not None:
+                added += self.add_context_file(file_path, category, current_task, file_read)
+        
+        return added
+    
+    def _rebuild_eviction_heap(self):
+        """Rebuild the eviction heap from current item scores, dropping stale entries"""
+        self._eviction_heap = [
+            (item.relevance_score, item.last_accessed, item.path)
+            for item in self.context_items.values()
+        ]
+        heapq.heapify(self._eviction_heap)
+    
     def _make_room_for_file(self, required_size: int) -> bool:
         """Remove least relevant items to make room for new file"""
         if not self.context_items:
             return False
         
-        # Sort by relevance score (ascending) and last accessed (ascending)
-        sorted_items = sorted(
-            self.context_items.values(),
-            key=lambda x: (x.relevance_score, x.last_accessed)
-        )
-        
+        # Pop by relevance score (ascending) and last accessed (ascending)
+        heap = self._eviction_heap
         freed_space = 0
-        items_to_remove = []
-        
-        for item in sorted_items:
-            if freed_space >= required_size:
-                break
-            items_to_remove.append(item.path)
-            freed_space += item.size
+        victims: Dict[str, Tuple[float, float, str]] = {}
+        victim_refs: Counter = Counter()
+        
+        while heap and freed_space < required_size:
+            entry = heapq.heappop(heap)
+            relevance_score, last_accessed, path = entry
+            item = self.context_items.get(path)
+            if (item is None or path in victims or item.relevance_score != relevance_score
+                    or item.last_accessed != last_accessed):
+                continue
+            victims[path] = entry
+            # Shared content is only freed once every file holding it is evicted
+            victim_refs[item.hash] += 1
+            if victim_refs[item.hash] == self._blob_refs[item.hash]:
+                freed_space += item.size
         
         if freed_space >= required_size:
-            for path in items_to_remove:
+            for path in victims:
                 self.remove_context_file(path)
                 self.logger.info(f"Removed from context to make room: {path}")
             return True
         
+        # Not enough space can be freed: keep every item
+        for entry in victims.values():
+            heapq.heappush(heap, entry)
         return False
     
+    def _retain(self, item: ContextItem):
+        """Account for an item entering context, charging its content size on first use"""
+        if not self._blob_refs[item.hash]:
+            self.current_context_size += item.size
+        self._blob_refs[item.hash] += 1
+        self._category_counts[item.category] += 1
+        self._category_sizes[item.category] += item.size
+    
+    def _release(self, item: ContextItem):
+        """Account for an item leaving context, freeing its content with the last reference"""
+        self._category_counts[item.category] -= 1
+        self._category_sizes[item.category] -= item.size
+        if self._category_counts[item.category] <= 0:
+            del self._category_counts[item.category]
+            del self._category_sizes[item.category]
+        
+        self._blob_refs[item.hash] -= 1
+        if self._blob_refs[item.hash] <= 0:
+            del self._blob_refs[item.hash]
+            self._blob_store.pop(item.hash, None)
+            self.current_context_size -= item.size
+    
+    def get_content(self, file_path: str) -> Optional[bytes]:
+        """Raw content of a context file, read from disk unless held in memory
+        
+        None if the file is not in context, or was deleted or made unreadable since.
+        """
+        item = self.context_items.get(file_path)
+        if item is None:
+            return None
+        
+        content = self._blob_store.get(item.hash)
+        if content is None:
+            try:
+                with open(item.path, 'rb') as f:
+                    content = f.read()
+            except OSError as e:
+                self.logger.debug(f"Cannot read context file {item.path}: {e}")
+                return None
+            # Only keep small content that still matches what was added
+            if len(content) < INLINE_CONTENT_LIMIT and self._calculate_file_hash(content) == item.hash:
+                self._blob_store[item.hash] = content
+        return content
+    
     def remove_context_file(self, file_path: str):
         """Remove a file from context"""
         if file_path in self.context_items:
-            item = self.context_items[file_path]
-            self.current_context_size -= item.size
-            del self.context_items[file_path]
+            item = self.context_items.pop(file_path)
+            self._release(item)
+            self._dirty = True
             self.logger.info(f"Removed from context: {file_path}")
     
     def get_context_summary(self) -> Dict:
         """Get summary of current context"""
-        categories = {}
-        for item in self.context_items.values():
-            if item.category not in categories:
-                categories[item.category] = {'count': 0, 'size': 0}
-            categories[item.category]['count'] += 1
-            categories[item.category]['size'] += item.size
+        categories = {
+            category: {'count': count, 'size': self._category_sizes[category]}
+            for category, count in self._category_counts.items()
+        }
         
         return {
             'total_items': len(self.context_items),
@@ -275,8 +554,7 @@ class ContextManager:
         self.logger.info("Optimizing context...")
         
         # Update relevance scores
-        for item in self.context_items.values():
-            item.relevance_score = self._calculate_relevance_score(item.path, current_task)
+        self._update_relevance_scores(current_task)
         
         # Remove items with very low relevance if we're over the warning threshold
         if self.current_context_size > self.warning_threshold:
@@ -295,51 +573,41 @@ class ContextManager:
     def get_relevant_context(self, task: str, max_items: int = 20) -> List[ContextItem]:
         """Get most relevant context items for a specific task"""
         # Update relevance scores for current task
-        for item in self.context_items.values():
-            item.relevance_score = self._calculate_relevance_score(item.path, task)
-            item.last_accessed = time.time()
-        
-        # Sort by relevance score (descending)
-        sorted_items = sorted(
-            self.context_items.values(),
-            key=lambda x: x.relevance_score,
-            reverse=True
-        )
+        self._update_relevance_scores(task, touch=True)
         
-        return sorted_items[:max_items]
+        # Select the top items by relevance score (descending) without a full sort
+        return heapq.nlargest(max_items, self.context_items.values(), key=lambda x: x.relevance_score)
     
     def generate_context_report(self) -> str:
         """Generate a detailed context usage report"""
         summary = self.get_context_summary()
         
-        report = f"""
+        report = []
+        append = report.append
+        append(f"""
 # Context Usage Report
 
 ## Summary
 - Total Items: {summary['total_items']}
-- Total Size: {summary['total_size']:,} characters
-- Max Size: {summary['max_size']:,} characters
+- Total Size: {summary['total_size']:,} bytes
+- Max Size: {summary['max_size']:,} bytes
 - Usage: {summary['usage_percentage']:.1f}%
 - Status: {'⚠️ Approaching Limit' if summary['approaching_limit'] else '✅ Normal'}
 
 ## Categories
-"""
+""")
         
         for category, data in summary['categories'].items():
-            report += f"- {category.title()}: {data['count']} items, {data['size']:,} characters\n"
+            append(f"- {category.title()}: {data['count']} items, {data['size']:,} bytes\n")
         
-        report += "\n## Top 10 Most Relevant Items\n"
+        append("\n## Top 10 Most Relevant Items\n")
         
-        sorted_items = sorted(
-            self.context_items.values(),
-            key=lambda x: x.relevance_score,
-            reverse=True
-        )
+        top_items = heapq.nlargest(10, self.context_items.values(), key=lambda x: x.relevance_score)
         
-        for i, item in enumerate(sorted_items[:10], 1):
-            report += f"{i}. {item.path} (relevance: {item.relevance_score:.2f}, size: {item.size:,})\n"
+        for i, item in enumerate(top_items, 1):
+            append(f"{i}. {item.path} (relevance: {item.relevance_score:.2f}, size: {item.size:,})\n")
         
-        return report
+        return ''.join(report)
 
 def main():
     """CLI interface for context manager"""
@@ -348,6 +616,7 @@ def main():
     parser = argparse.ArgumentParser(description="Enhanced Agent OS Context Manager")
     parser.add_argument("--project-root", default=".", help="Project root directory")
     parser.add_argument("--add-file", help="Add file to context")
+    parser.add_argument("--add-dir", help="Add all files under a directory to context")
     parser.add_argument("--remove-file", help="Remove file from context")
     parser.add_argument("--optimize", action="store_true", help="Optimize context")
     parser.add_argument("--report", action="store_true", help="Generate context report")
@@ -361,6 +630,10 @@ def main():
         success = manager.add_context_file(args.add_file, current_task=args.task)
         print(f"{'✅' if success else '❌'} Add file: {args.add_file}")
     
+    if args.add_dir:
+        added = manager.add_context_files([args.add_dir], current_task=args.task)
+        print(f"✅ Added {added} files from: {args.add_dir}")
+    
     if args.remove_file:
         manager.remove_context_file(args.remove_file)
         print(f"✅ Removed file: {args.remove_file}")
@@ -372,6 +645,9 @@ def main():
     if args.report:
         print(manager.generate_context_report())
     
+    # Persist added or removed files; a no-op when nothing changed
+    manager._save_cache()
+    
     # Always show summary
     summary = manager.get_context_summary()
     print(f"\nContext: {summary['total_items']} items, {summary['usage_percentage']:.1f}% usage")
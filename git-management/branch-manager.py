@@ -8,12 +8,106 @@ import os
 import json
 import yaml
 import logging
+import logging.handlers
+import shutil
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, asdict
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import re
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import pygit2
+except ImportError:  # Optional: read-only queries run git commands instead
+    pygit2 = None
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# Absolute git path and cwd passed as `git -C` let subprocess use the posix_spawn fast path
+GIT_EXECUTABLE = shutil.which("git") or "git"
+
+# Rotated log file size and number of backups kept
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUP_COUNT = 3
+
+# Concurrent git processes for per-branch queries; each thread mostly waits on its child
+GIT_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+@lru_cache(maxsize=1)
+def _git_version() -> Tuple[int, ...]:
+    """Installed git version as a tuple of ints, or (0,) if it cannot be determined"""
+    try:
+        output = subprocess.run([GIT_EXECUTABLE, "--version"], capture_output=True, text=True, check=True).stdout
+        return tuple(int(part) for part in re.findall(r'\d+', output)[:3])
+    except (OSError, subprocess.CalledProcessError):
+        return (0,)
+
+# Commit named by git when a cherry-pick sequence stops, e.g. "error: could not apply 1a2b3c4... msg"
+_CHERRY_PICK_FAILED_RE = re.compile(r'could not apply ([0-9a-f]+)')
+
+# A run of whitespace and characters not allowed in branch names
+_BRANCH_NAME_JUNK_RE = re.compile(r'(?:\s|[^a-zA-Z0-9\s-])+')
+_CAPITALIZED_RE = re.compile(r'[A-Z]')
+
+def _clean_branch_run(match: re.Match) -> str:
+    """Drop disallowed characters; inner runs containing whitespace become one dash"""
+    run = match.group(0)
+    if match.start() == 0 or match.end() == len(match.string) or not any(c.isspace() for c in run):
+        return ''
+    return '-'
+
+@lru_cache(maxsize=32)
+def _find_git_repo(start: str) -> Optional[Path]:
+    """Walk up from an absolute directory to the nearest one containing .git"""
+    current = start
+    parent = os.path.dirname(current)
+    
+    while current != parent:
+        # .git is a file in worktrees and submodules
+        if os.path.exists(os.path.join(current, ".git")):
+            return Path(current)
+        current, parent = parent, os.path.dirname(parent)
+    
+    return None
+
+# Bump when the sidecar layout changes so stale caches are ignored
+YAML_CACHE_VERSION = 1
+
+@lru_cache(maxsize=8)
+def _load_yaml_cached(path: str, mtime_ns: int) -> Any:
+    """Parse a YAML file; the mtime in the key invalidates the entry when the file changes"""
+    # A JSON sidecar at least as new as the YAML skips the parse across processes
+    cache_path = Path(path).with_suffix(".yml.cache.json")
+    try:
+        if os.stat(cache_path).st_mtime_ns >= mtime_ns:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached.get("v") == YAML_CACHE_VERSION:
+                return cached["data"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=SafeLoader)
+    
+    try:
+        payload = json.dumps({"v": YAML_CACHE_VERSION, "data": data})
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        # Unwritable directory or values JSON cannot represent; parse again next time
+        pass
+    
+    return data
 
 @dataclass
 class BranchInfo:
@@ -36,6 +130,9 @@ class CommitInfo:
     branch: str
     files_changed: List[str]
 
+# (is_current, name, short hash, last commit date, (ahead, behind)) for one local branch
+BranchRecord = Tuple[bool, str, str, datetime, Tuple[int, int]]
+
 @dataclass
 class BranchStrategy:
     """Git branching strategy configuration"""
@@ -50,7 +147,7 @@ class BranchStrategy:
 class GitBranchManager:
     """Manages git branches and provides recovery tools"""
     
-    def __init__(self, project_root: str = "."):
+    def __init__(self, project_root: str = ".", log_to_file: bool = True):
         self.project_root = Path(project_root)
         self.agent_os_dir = self.project_root / ".agent-os"
         self.git_dir = self.agent_os_dir / "git-management"
@@ -62,48 +159,84 @@ class GitBranchManager:
         (self.git_dir / "recovery").mkdir(exist_ok=True)
         
         # Setup logging
-        self._setup_logging()
+        self._setup_logging(log_to_file)
         
         # Load configuration
         self.config = self._load_config()
         self.branch_strategy = self._load_branch_strategy()
         
+        # Strategy names flattened for _determine_branch_purpose; main wins if it equals develop
+        strategy = self.branch_strategy
+        self._exact_map = {strategy.develop_branch: "develop", strategy.main_branch: "main"}
+        self._prefix_map = (
+            (strategy.feature_prefix, "feature"),
+            (strategy.hotfix_prefix, "hotfix"),
+            (strategy.release_prefix, "release")
+        )
+        
         # Git repository check
         self.git_repo_path = self._find_git_repo()
         if not self.git_repo_path:
             self.logger.warning("No git repository found")
         
-        # Branch tracking
-        self.branches: Dict[str, BranchInfo] = {}
+        # Branch tracking, stored column-wise; BranchInfo objects are only
+        # built on demand through `branches` and `branch_info`
         self.current_branch: Optional[str] = None
+        self._clear_branches()
+        
+        # Inherited environment, but read-only queries skip optional index locks
+        self._git_env = dict(os.environ, GIT_OPTIONAL_LOCKS="0")
+        
+        # pygit2 repository for in-process reads; False once opening it has failed
+        self._repo = None
+        
+        # Long-running `git cat-file --batch-check`, started on first object lookup
+        self._cat_file: Optional[subprocess.Popen] = None
+        
+        # Spec name tokens -> specs containing them, rebuilt on each branch refresh
+        self._spec_token_index: Dict[str, List[str]] = {}
         
         # Initialize
         if self.git_repo_path:
             self._refresh_branch_info()
     
-    def _setup_logging(self):
+    def _setup_logging(self, log_to_file: bool = True):
         """Setup logging for git branch manager"""
-        log_dir = self.agent_os_dir / "logs"
-        log_dir.mkdir(exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_dir / "git-branch-manager.log"),
-                logging.StreamHandler()
-            ]
-        )
         self.logger = logging.getLogger("GitBranchManager")
+        
+        # Handlers go on our own logger, once per process, instead of configuring the root logger
+        if self.logger.handlers:
+            return
+        
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers: List[logging.Handler] = [logging.StreamHandler()]
+        if log_to_file:
+            log_dir = self.agent_os_dir / "logs"
+            log_dir.mkdir(exist_ok=True)
+            # delay=True: the log file is not opened until the first record is written
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_dir / "git-branch-manager.log",
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                delay=True
+            ))
+        
+        for handler in handlers:
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
     
     def _load_config(self) -> Dict:
         """Load git management configuration"""
         config_path = self.agent_os_dir / "config" / "enhanced-config.yml"
-        if config_path.exists():
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                return config.get('git_management', {})
-        return {}
+        try:
+            mtime_ns = os.stat(config_path).st_mtime_ns
+        except OSError:
+            return {}
+        
+        config = _load_yaml_cached(str(config_path), mtime_ns)
+        return config.get('git_management', {})
     
     def _load_branch_strategy(self) -> BranchStrategy:
         """Load or create branch strategy"""
@@ -137,95 +270,261 @@ class GitBranchManager:
     
     def _find_git_repo(self) -> Optional[Path]:
         """Find the git repository root"""
-        current = self.project_root
-        
-        while current != current.parent:
-            if (current / ".git").exists():
-                return current
-            current = current.parent
-        
-        return None
+        return _find_git_repo(str(self.project_root.resolve()))
     
-    def _run_git_command(self, command: List[str], cwd: Optional[Path] = None) -> Tuple[bool, str]:
-        """Run a git command and return success status and output"""
+    def _run_git_command(self, command: List[str], cwd: Optional[Path] = None,
+                         raw: bool = False) -> Tuple[bool, Union[str, bytes]]:
+        """Run a git command and return success status and output (undecoded stdout if raw)"""
         if not cwd:
             cwd = self.git_repo_path
         
         try:
+            # Our descriptors are non-inheritable (PEP 446), so close_fds can be skipped
             result = subprocess.run(
-                ["git"] + command,
-                cwd=cwd,
+                [GIT_EXECUTABLE, "-C", str(cwd)] + command,
+                env=self._git_env,
+                close_fds=False,
                 capture_output=True,
-                text=True,
                 check=False
             )
             
+            # Output is captured as bytes and decoded once, not chunk by chunk through a text wrapper
             if result.returncode == 0:
-                return True, result.stdout.strip()
+                return True, result.stdout if raw else result.stdout.decode('utf-8', 'replace').strip()
             else:
-                return False, result.stderr.strip()
+                return False, result.stderr.decode('utf-8', 'replace').strip()
                 
         except Exception as e:
             return False, str(e)
     
+    def _object_info(self, revision: str) -> Optional[Tuple[str, str, int]]:
+        """Look up (hash, type, size) of a revision through a persistent cat-file process"""
+        if not self.git_repo_path or '\n' in revision:
+            return None
+        
+        try:
+            if self._cat_file is None or self._cat_file.poll() is not None:
+                self._cat_file = subprocess.Popen(
+                    [GIT_EXECUTABLE, "-C", str(self.git_repo_path), "cat-file", "--batch-check"],
+                    env=self._git_env,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True
+                )
+            
+            self._cat_file.stdin.write(revision + '\n')
+            self._cat_file.stdin.flush()
+            line = self._cat_file.stdout.readline()
+        except (OSError, ValueError) as e:
+            self.logger.error(f"cat-file lookup failed for {revision}: {e}")
+            self.close()
+            return None
+        
+        # Unknown revisions come back as "<revision> missing" (or "ambiguous")
+        parts = line.split()
+        if len(parts) != 3:
+            return None
+        return parts[0], parts[1], int(parts[2])
+    
+    def _commit_exists(self, revision: str) -> bool:
+        """Check that a revision names a commit with one object lookup, without walking history"""
+        info = self._object_info(f"{revision}^{{commit}}")
+        return info is not None and info[1] == "commit"
+    
+    def close(self):
+        """Stop the persistent cat-file process"""
+        if self._cat_file is not None:
+            try:
+                self._cat_file.stdin.close()
+                self._cat_file.wait(timeout=5)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                self._cat_file.kill()
+            self._cat_file = None
+    
+    def __del__(self):
+        # getattr: __init__ may have failed before the attribute was set
+        if getattr(self, '_cat_file', None) is not None:
+            self.close()
+    
     def _refresh_branch_info(self):
         """Refresh information about all branches"""
         if not self.git_repo_path:
             return
         
-        # Get current branch
-        success, current_branch = self._run_git_command(["branch", "--show-current"])
-        if success:
-            self.current_branch = current_branch
+        records = None
+        if self._open_repo() is not None:
+            records = self._list_branches_pygit2()
+        if records is None:
+            records = self._list_branches_git()
+        if records is None:
+            return
+        
+        self._clear_branches()
+        self._build_spec_token_index()
+        
+        current_found = False
+        for record in records:
+            self._store_branch(record)
+            current_found = current_found or record[0]
         
-        # Get all branches
-        success, branch_output = self._run_git_command(["branch", "-v"])
+        # No branch is marked current on a detached or unborn HEAD
+        if not current_found:
+            success, current_branch = self._run_git_command(["branch", "--show-current"])
+            if success:
+                self.current_branch = current_branch
+    
+    def _clear_branches(self):
+        """Reset the branch columns"""
+        self.branch_ids: Dict[str, int] = {}
+        self.branch_names: List[str] = []
+        self.branch_commits: List[str] = []
+        self.branch_dates: List[datetime] = []
+        self.branch_ahead = array('i')
+        self.branch_behind = array('i')
+        self.branch_purposes: List[str] = []
+        self.branch_specs: List[List[str]] = []
+    
+    def _store_branch(self, record: BranchRecord):
+        """Store one branch record, appending a row or overwriting the existing one"""
+        is_current, branch_name, commit_hash, last_commit_date, (ahead, behind) = record
+        if is_current:
+            self.current_branch = branch_name
+        
+        # Determine branch purpose
+        purpose = self._determine_branch_purpose(branch_name)
+        specs = self._get_associated_specs(branch_name)
+        
+        index = self.branch_ids.get(branch_name)
+        if index is None:
+            self.branch_ids[branch_name] = len(self.branch_names)
+            self.branch_names.append(branch_name)
+            self.branch_commits.append(commit_hash)
+            self.branch_dates.append(last_commit_date)
+            self.branch_ahead.append(ahead)
+            self.branch_behind.append(behind)
+            self.branch_purposes.append(purpose)
+            self.branch_specs.append(specs)
+        else:
+            self.branch_commits[index] = commit_hash
+            self.branch_dates[index] = last_commit_date
+            self.branch_ahead[index] = ahead
+            self.branch_behind[index] = behind
+            self.branch_purposes[index] = purpose
+            self.branch_specs[index] = specs
+    
+    def branch_info(self, branch_name: str) -> Optional[BranchInfo]:
+        """Build the BranchInfo for one branch, or None if it is unknown"""
+        index = self.branch_ids.get(branch_name)
+        if index is None:
+            return None
+        return BranchInfo(
+            name=branch_name,
+            is_current=branch_name == self.current_branch,
+            last_commit=self.branch_commits[index],
+            last_commit_date=self.branch_dates[index],
+            ahead_behind=(self.branch_ahead[index], self.branch_behind[index]),
+            purpose=self.branch_purposes[index],
+            associated_specs=self.branch_specs[index]
+        )
+    
+    @property
+    def branches(self) -> Dict[str, BranchInfo]:
+        """All branches as BranchInfo objects, keyed by name"""
+        return {name: self.branch_info(name) for name in self.branch_names}
+    
+    def _update_branch(self, branch_name: str):
+        """Re-read a single branch after it was created or moved, without a full refresh"""
+        records = None
+        if self._open_repo() is not None:
+            records = self._list_branches_pygit2(branch_name)
+        if records is None:
+            records = self._list_branches_git(branch_name)
+        
+        for record in records or []:
+            if record[1] == branch_name:
+                self._store_branch(record)
+    
+    def _set_current_branch(self, branch_name: str):
+        """Move the current-branch marker after a checkout"""
+        self.current_branch = branch_name
+    
+    def _open_repo(self):
+        """Open the repository with pygit2 for in-process reads, or None if unavailable"""
+        if self._repo is None and pygit2 is not None and self.git_repo_path:
+            try:
+                self._repo = pygit2.Repository(str(self.git_repo_path))
+            except (pygit2.GitError, KeyError) as e:
+                self.logger.warning(f"pygit2 cannot open repository, using git commands: {e}")
+                self._repo = False
+        return self._repo or None
+    
+    def _list_branches_pygit2(self, branch_name: Optional[str] = None) -> Optional[List[BranchRecord]]:
+        """Read local branches (or just one) in-process with libgit2"""
+        repo = self._repo
+        try:
+            main = repo.branches.local.get(self.branch_strategy.main_branch)
+            main_id = main.peel(pygit2.Commit).id if main is not None else None
+            
+            records = []
+            for name in [branch_name] if branch_name else sorted(repo.branches.local):
+                branch = repo.branches.local[name]
+                commit = branch.peel(pygit2.Commit)
+                tz = timezone(timedelta(minutes=commit.commit_time_offset))
+                ahead_behind = repo.ahead_behind(commit.id, main_id) if main_id is not None else (0, 0)
+                records.append((
+                    branch.is_head(),
+                    name,
+                    commit.short_id,
+                    datetime.fromtimestamp(commit.commit_time, tz),
+                    tuple(ahead_behind)
+                ))
+            return records
+        except (pygit2.GitError, KeyError, ValueError) as e:
+            self.logger.warning(f"pygit2 branch listing failed, using git commands: {e}")
+            return None
+    
+    def _list_branches_git(self, branch_name: Optional[str] = None) -> Optional[List[BranchRecord]]:
+        """List branches (or just one) with one git for-each-ref call"""
+        # Git 2.41+ also reports ahead/behind counts
+        main_branch = self.branch_strategy.main_branch
+        fields = ["%(HEAD)", "%(refname:short)", "%(objectname:short)", "%(committerdate:iso-strict)"]
+        with_counts = _git_version() >= (2, 41)
+        if with_counts:
+            fields.append(f"%(ahead-behind:{main_branch})")
+        
+        pattern = f"refs/heads/{branch_name}" if branch_name else "refs/heads/"
+        success, branch_output = self._run_git_command(["for-each-ref", f"--format={'%00'.join(fields)}", pattern])
+        if not success and with_counts:
+            # ahead-behind fails when the main branch does not exist
+            with_counts = False
+            success, branch_output = self._run_git_command(["for-each-ref", f"--format={'%00'.join(fields[:4])}", pattern])
         if not success:
             self.logger.error(f"Failed to get branch info: {branch_output}")
-            return
+            return None
         
-        self.branches = {}
+        # Parse branch records: "*\0main\01234567\02024-01-01T10:00:00+00:00[\03 1]"
+        records = [record for record in (line.split('\0') for line in branch_output.split('\n')) if len(record) >= 4]
         
-        for line in branch_output.split('\n'):
-            if not line.strip():
-                continue
-            
-            # Parse branch line: "* main 1234567 Last commit message"
-            parts = line.strip().split()
-            if len(parts) < 3:
-                continue
-            
-            is_current = line.startswith('*')
-            branch_name = parts[1] if is_current else parts[0]
-            commit_hash = parts[2] if is_current else parts[1]
-            
-            # Get ahead/behind info
-            ahead_behind = self._get_ahead_behind(branch_name)
-            
-            # Get last commit date
-            success, date_str = self._run_git_command([
-                "log", "-1", "--format=%ci", branch_name
-            ])
-            
+        # Without the ahead-behind atom, run the per-branch rev-list calls concurrently
+        if with_counts:
+            counts = [tuple(int(n) for n in record[4].split()) if len(record) > 4 else (0, 0) for record in records]
+        elif len(records) > 1:
+            with ThreadPoolExecutor(max_workers=min(GIT_WORKERS, len(records))) as executor:
+                counts = list(executor.map(self._get_ahead_behind, [record[1] for record in records]))
+        else:
+            counts = [self._get_ahead_behind(record[1]) for record in records]
+        
+        branches = []
+        for record, ahead_behind in zip(records, counts):
+            head, name, commit_hash, date_str = record[:4]
             try:
-                last_commit_date = datetime.fromisoformat(date_str.replace(' ', 'T', 1)) if success else datetime.now()
+                last_commit_date = datetime.fromisoformat(date_str)
             except:
                 last_commit_date = datetime.now()
-            
-            # Determine branch purpose
-            purpose = self._determine_branch_purpose(branch_name)
-            
-            branch_info = BranchInfo(
-                name=branch_name,
-                is_current=is_current,
-                last_commit=commit_hash,
-                last_commit_date=last_commit_date,
-                ahead_behind=ahead_behind,
-                purpose=purpose,
-                associated_specs=self._get_associated_specs(branch_name)
-            )
-            
-            self.branches[branch_name] = branch_info
+            branches.append((head == '*', name, commit_hash, last_commit_date, ahead_behind))
+        
+        return branches
     
     def _get_ahead_behind(self, branch_name: str) -> Tuple[int, int]:
         """Get how many commits ahead/behind a branch is relative to main"""
@@ -245,32 +544,39 @@ class GitBranchManager:
     
     def _determine_branch_purpose(self, branch_name: str) -> str:
         """Determine the purpose of a branch based on its name"""
-        if branch_name == self.branch_strategy.main_branch:
-            return "main"
-        elif branch_name == self.branch_strategy.develop_branch:
-            return "develop"
-        elif branch_name.startswith(self.branch_strategy.feature_prefix):
-            return "feature"
-        elif branch_name.startswith(self.branch_strategy.hotfix_prefix):
-            return "hotfix"
-        elif branch_name.startswith(self.branch_strategy.release_prefix):
-            return "release"
-        else:
-            return "custom"
+        purpose = self._exact_map.get(branch_name)
+        if purpose:
+            return purpose
+        
+        for prefix, label in self._prefix_map:
+            if branch_name.startswith(prefix):
+                return label
+        
+        return "custom"
+    
+    def _build_spec_token_index(self):
+        """Scan the specs directory once and index specs by their name tokens"""
+        self._spec_token_index = {}
+        
+        specs_dir = self.agent_os_dir / "specs"
+        try:
+            with os.scandir(specs_dir) as entries:
+                for entry in entries:
+                    # The entry's cached d_type answers is_dir without a stat for plain directories
+                    if entry.is_dir():
+                        # Spec names look like "2024-01-15-user-auth"; skip the date prefix
+                        for token in dict.fromkeys(entry.name.split('-')[2:]):
+                            self._spec_token_index.setdefault(token, []).append(entry.name)
+        except OSError:
+            return
     
     def _get_associated_specs(self, branch_name: str) -> List[str]:
         """Get specs associated with a branch"""
+        # Simple heuristic: if branch name contains part of spec name
         specs = []
-        
-        # Look for specs that might be related to this branch
-        specs_dir = self.agent_os_dir / "specs"
-        if specs_dir.exists():
-            for spec_dir in specs_dir.iterdir():
-                if spec_dir.is_dir():
-                    spec_name = spec_dir.name
-                    # Simple heuristic: if branch name contains part of spec name
-                    if any(part in branch_name for part in spec_name.split('-')[2:]):
-                        specs.append(spec_name)
+        for token, token_specs in self._spec_token_index.items():
+            if token in branch_name:
+                specs.extend(spec for spec in token_specs if spec not in specs)
         
         return specs
     
@@ -303,7 +609,7 @@ class GitBranchManager:
             validation["warnings"].append("No changes to commit")
         
         # Validate branch purpose vs changes
-        branch_info = self.branches.get(current_branch)
+        branch_info = self.branch_info(current_branch)
         if branch_info:
             if branch_info.purpose == "main" and status_output:
                 validation["warnings"].append("Committing directly to main branch")
@@ -320,16 +626,15 @@ class GitBranchManager:
             if len(commit_message) < 10:
                 validation["warnings"].append("Commit message is very short")
             
-            if not re.match(r'^[A-Z]', commit_message):
+            if not _CAPITALIZED_RE.match(commit_message):
                 validation["suggestions"].append("Consider starting commit message with capital letter")
         
         return validation
     
     def suggest_branch_for_task(self, task_description: str, spec_name: str = "") -> str:
         """Suggest an appropriate branch name for a task"""
-        # Clean task description for branch name
-        clean_task = re.sub(r'[^a-zA-Z0-9\s-]', '', task_description.lower())
-        clean_task = re.sub(r'\s+', '-', clean_task.strip())
+        # Clean task description for branch name in one pass
+        clean_task = _BRANCH_NAME_JUNK_RE.sub(_clean_branch_run, task_description.lower())
         clean_task = clean_task[:50]  # Limit length
         
         # Determine branch type
@@ -354,7 +659,7 @@ class GitBranchManager:
         branch_name = self.suggest_branch_for_task(task_description, spec_name)
         
         # Check if branch already exists
-        if branch_name in self.branches:
+        if branch_name in self.branch_ids:
             return False, f"Branch '{branch_name}' already exists"
         
         # Create branch from appropriate base
@@ -363,7 +668,9 @@ class GitBranchManager:
         success, output = self._run_git_command(["checkout", "-b", branch_name, base_branch])
         
         if success:
-            self._refresh_branch_info()
+            # Only the new branch and HEAD changed
+            self._update_branch(branch_name)
+            self._set_current_branch(branch_name)
             self.logger.info(f"Created branch: {branch_name}")
             
             # Save branch context
@@ -385,17 +692,19 @@ class GitBranchManager:
             "base_branch": self.branch_strategy.develop_branch or self.branch_strategy.main_branch
         }
         
+        # Prefixed branch names ("feature/x") map to subdirectories
+        context_file.parent.mkdir(parents=True, exist_ok=True)
         with open(context_file, 'w') as f:
             json.dump(context, f, indent=2)
     
     def switch_to_appropriate_branch(self, task_description: str, spec_name: str = "") -> Tuple[bool, str]:
         """Switch to the most appropriate branch for a task"""
         # Look for existing branch related to the task/spec
-        for branch_name, branch_info in self.branches.items():
-            if spec_name and spec_name in (branch_info.associated_specs or []):
+        for branch_name, specs in zip(self.branch_names, self.branch_specs):
+            if spec_name and spec_name in specs:
                 success, output = self._run_git_command(["checkout", branch_name])
                 if success:
-                    self.current_branch = branch_name
+                    self._set_current_branch(branch_name)
                     return True, f"Switched to existing branch: {branch_name}"
                 else:
                     return False, f"Failed to switch to branch: {output}"
@@ -409,20 +718,28 @@ class GitBranchManager:
             return False, "No commit hashes provided"
         
         # Verify target branch exists
-        if target_branch not in self.branches:
+        if target_branch not in self.branch_ids:
             return False, f"Target branch '{target_branch}' does not exist"
         
+        # Verify every commit exists before touching the working tree
+        for commit_hash in commit_hashes:
+            if not self._commit_exists(commit_hash):
+                return False, f"Commit '{commit_hash}' does not exist"
+        
         # Switch to target branch
         success, output = self._run_git_command(["checkout", target_branch])
         if not success:
             return False, f"Failed to switch to target branch: {output}"
         
-        # Cherry-pick commits
-        for commit_hash in commit_hashes:
-            success, output = self._run_git_command(["cherry-pick", commit_hash])
-            if not success:
-                self.logger.error(f"Failed to cherry-pick {commit_hash}: {output}")
-                return False, f"Failed to cherry-pick {commit_hash}: {output}"
+        # Cherry-pick all commits in one invocation; on a conflict git stops at the
+        # failing commit and leaves the sequence for --continue or --abort
+        success, output = self._run_git_command(["cherry-pick"] + commit_hashes)
+        if not success:
+            failed = _CHERRY_PICK_FAILED_RE.search(output)
+            commit_hash = failed.group(1) if failed else ' '.join(commit_hashes)
+            self.logger.error(f"Failed to cherry-pick {commit_hash}: {output}")
+            return False, (f"Failed to cherry-pick {commit_hash}: {output}\n"
+                           "Resolve and run 'git cherry-pick --continue', or 'git cherry-pick --abort'")
         
         self.logger.info(f"Successfully recovered {len(commit_hashes)} commits to {target_branch}")
         return True, f"Successfully recovered {len(commit_hashes)} commits to {target_branch}"
@@ -432,30 +749,39 @@ class GitBranchManager:
         if not branch:
             branch = self.current_branch or self.branch_strategy.main_branch
         
+        if self._open_repo() is not None:
+            commits = self._recent_commits_pygit2(branch, limit)
+            if commits is not None:
+                return commits
+        
+        # One NUL-delimited log call lists each commit's files too: a \x1e-prefixed
+        # header with \x1f-separated fields, then one entry per changed file
         success, output = self._run_git_command([
-            "log", f"-{limit}", "--format=%H|%s|%an|%ci", branch
-        ])
+            "log", "-z", f"-{limit}", "--name-only", "--format=%x1e%H%x1f%s%x1f%an%x1f%cI", branch
+        ], raw=True)
         
         if not success:
             return []
         
         commits = []
-        for line in output.split('\n'):
-            if not line.strip():
+        commit = None
+        for entry in output.split(b'\0'):
+            if entry.startswith(b'\n'):
+                entry = entry[1:]
+            if not entry:
+                continue
+            
+            if not entry.startswith(b'\x1e'):
+                if commit is not None:
+                    commit.files_changed.append(entry.decode('utf-8', 'replace'))
                 continue
             
-            parts = line.split('|')
+            commit = None
+            parts = entry[1:].decode('utf-8', 'replace').split('\x1f')
             if len(parts) >= 4:
-                # Get files changed in this commit
-                success, files_output = self._run_git_command([
-                    "diff-tree", "--no-commit-id", "--name-only", "-r", parts[0]
-                ])
-                
-                files_changed = files_output.split('\n') if success else []
-                
                 try:
-                    commit_date = datetime.fromisoformat(parts[3].replace(' ', 'T', 1))
-                except:
+                    commit_date = datetime.fromisoformat(parts[3])
+                except ValueError:
                     commit_date = datetime.now()
                 
                 commit = CommitInfo(
@@ -464,15 +790,48 @@ class GitBranchManager:
                     author=parts[2],
                     date=commit_date,
                     branch=branch,
-                    files_changed=files_changed
+                    files_changed=[]
                 )
                 commits.append(commit)
         
         return commits
     
+    def _recent_commits_pygit2(self, branch: str, limit: int) -> Optional[List[CommitInfo]]:
+        """Walk recent commits in-process with libgit2, listing files like git log --name-only"""
+        repo = self._repo
+        try:
+            tip = repo.revparse_single(branch).peel(pygit2.Commit)
+            commits = []
+            for commit in islice(repo.walk(tip.id, pygit2.GIT_SORT_TIME), limit):
+                # Merges list no files, as git log shows none for them by default
+                if len(commit.parents) == 1:
+                    diff = repo.diff(commit.parents[0], commit)
+                elif not commit.parents:
+                    diff = commit.tree.diff_to_tree(swap=True)
+                else:
+                    diff = None
+                
+                # %s: the first paragraph of the message, joined onto one line
+                subject = ' '.join(commit.message.strip().split('\n\n', 1)[0].split())
+                tz = timezone(timedelta(minutes=commit.commit_time_offset))
+                commits.append(CommitInfo(
+                    hash=str(commit.id),
+                    message=subject,
+                    author=commit.author.name,
+                    date=datetime.fromtimestamp(commit.commit_time, tz),
+                    branch=branch,
+                    files_changed=[delta.new_file.path for delta in diff.deltas] if diff is not None else []
+                ))
+            return commits
+        except (pygit2.GitError, KeyError, ValueError) as e:
+            self.logger.warning(f"pygit2 log failed, using git commands: {e}")
+            return None
+    
     def generate_branch_report(self) -> str:
         """Generate a comprehensive branch status report"""
-        report = f"""# Git Branch Status Report
+        report = []
+        append = report.append
+        append(f"""# Git Branch Status Report
 
 ## Current Branch: {self.current_branch or 'Unknown'}
 
@@ -483,31 +842,33 @@ class GitBranchManager:
 - Hotfix Prefix: {self.branch_strategy.hotfix_prefix}
 
 ## All Branches
-"""
+""")
         
-        for branch_name, branch_info in self.branches.items():
-            current_marker = "👉 " if branch_info.is_current else "   "
-            ahead, behind = branch_info.ahead_behind
+        for branch_name, purpose, commit_hash, commit_date, ahead, behind, specs in zip(
+            self.branch_names, self.branch_purposes, self.branch_commits, self.branch_dates,
+            self.branch_ahead, self.branch_behind, self.branch_specs
+        ):
+            current_marker = "👉 " if branch_name == self.current_branch else "   "
             
-            report += f"{current_marker}**{branch_name}** ({branch_info.purpose})\n"
-            report += f"   Last Commit: {branch_info.last_commit[:8]} - {branch_info.last_commit_date.strftime('%Y-%m-%d %H:%M')}\n"
+            append(f"{current_marker}**{branch_name}** ({purpose})\n"
+                   f"   Last Commit: {commit_hash[:8]} - {commit_date:%Y-%m-%d %H:%M}\n")
             
             if ahead > 0 or behind > 0:
-                report += f"   Status: {ahead} ahead, {behind} behind main\n"
+                append(f"   Status: {ahead} ahead, {behind} behind main\n")
             
-            if branch_info.associated_specs:
-                report += f"   Associated Specs: {', '.join(branch_info.associated_specs)}\n"
+            if specs:
+                append(f"   Associated Specs: {', '.join(specs)}\n")
             
-            report += "\n"
+            append("\n")
         
         # Add recent commits
         recent_commits = self.get_recent_commits(limit=5)
         if recent_commits:
-            report += "## Recent Commits\n"
+            append("## Recent Commits\n")
             for commit in recent_commits:
-                report += f"- {commit.hash[:8]} - {commit.message} ({commit.author})\n"
+                append(f"- {commit.hash[:8]} - {commit.message} ({commit.author})\n")
         
-        return report
+        return ''.join(report)
     
     def setup_pre_commit_hooks(self) -> bool:
         """Setup pre-commit hooks for validation"""
@@ -521,7 +882,7 @@ class GitBranchManager:
 # Agent OS Enhanced Pre-commit Hook
 
 # Run branch validation
-python3 "{self.git_dir / 'branch-manager.py'}" --validate-commit
+python3 "{self.git_dir / 'branch-manager.py'}" --validate-commit --quiet
 
 if [ $? -ne 0 ]; then
     echo "❌ Pre-commit validation failed"
@@ -559,10 +920,11 @@ def main():
     parser.add_argument("--report", action="store_true", help="Generate branch status report")
     parser.add_argument("--setup-hooks", action="store_true", help="Setup pre-commit hooks")
     parser.add_argument("--recover-commits", nargs="+", help="Recover commits to current branch")
+    parser.add_argument("--quiet", action="store_true", help="Do not write the log file (e.g. in hooks)")
     
     args = parser.parse_args()
     
-    manager = GitBranchManager(args.project_root)
+    manager = GitBranchManager(args.project_root, log_to_file=not args.quiet)
     
     if args.create_branch:
         success, message = manager.create_branch_for_task(args.create_branch, args.spec_name or "")
@@ -6,16 +6,381 @@ Automatically discovers, configures, and integrates all existing MCP tools durin
 
 import os
 import json
-import yaml
 import logging
-import subprocess
-import platform
+import shutil
+import re
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Sequence, Set, Tuple
+from dataclasses import dataclass
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 
-@dataclass
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+# Capability vocabulary, interned so every tool shares the same string objects
+CAP_FILE = sys.intern('file_operations')
+CAP_GIT = sys.intern('git_operations')
+CAP_DATABASE = sys.intern('database_operations')
+CAP_WEB = sys.intern('web_operations')
+CAP_CODE_ANALYSIS = sys.intern('code_analysis')
+CAP_TESTING = sys.intern('testing')
+CAP_GENERAL = sys.intern('general')
+
+def _intern_capabilities(capabilities: Any) -> List[str]:
+    """Capability names read back from JSON, interned to share the module's strings"""
+    return [sys.intern(capability) for capability in capabilities if isinstance(capability, str)]
+
+# Threads for blocking file reads during discovery
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Tools probed concurrently during auto-configuration, and the timeout of each probe
+PROBE_WORKERS = 16
+PROBE_TIMEOUT = 3
+
+# Timeout for npm/pip package listings; missing binaries are detected up front
+PACKAGE_LIST_TIMEOUT = 10
+
+# Sources whose tools come from an application's own config rather than a bare executable
+CONFIG_DECLARED_SOURCES = frozenset(('claude-desktop', 'vscode'))
+
+# Bump when the sidecar layout changes so stale caches are ignored
+YAML_CACHE_VERSION = 1
+
+def _load_yaml_cached(path: Path) -> Any:
+    """Parse a YAML file, reusing a JSON sidecar that is at least as new as the YAML"""
+    cache_path = path.with_suffix(".yml.cache.json")
+    yaml_mtime_ns = os.stat(path).st_mtime_ns
+    try:
+        if os.stat(cache_path).st_mtime_ns >= yaml_mtime_ns:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached.get("v") == YAML_CACHE_VERSION:
+                return cached["data"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    
+    # Imported here: PyYAML is slow to import and a fresh sidecar never needs it
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader
+    
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=SafeLoader)
+    
+    try:
+        payload = json.dumps({"v": YAML_CACHE_VERSION, "data": data})
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        # Unwritable directory or values JSON cannot represent; parse again next time
+        pass
+    
+    return data
+
+@lru_cache(maxsize=512)
+def _read_json_cached(path: str, mtime_ns: int) -> Any:
+    """Parse a JSON file; the mtime in the key invalidates the entry when the file changes"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# Script types picked up from MCP tool directories
+SCRIPT_SUFFIXES = ('.py', '.js', '.ts', '.sh')
+
+# Interpreter used to run a discovered script, by suffix
+_SUFFIX_RUNNER = {
+    '.py': ('python3',),
+    '.js': ('node',),
+    '.ts': ('node',),
+    '.sh': ('bash',),
+}
+
+# Usage example per capability, formatted with the tool name
+_EXAMPLE_TEMPLATES = {
+    CAP_FILE: "Use {name} to read, write, or manipulate files",
+    CAP_GIT: "Use {name} for git operations like commit, push, branch",
+    CAP_DATABASE: "Use {name} for database queries and operations",
+    CAP_WEB: "Use {name} for web requests and API calls",
+}
+_DEFAULT_EXAMPLE_TEMPLATE = "Use {name} for {capability}"
+
+# Symlinked directories followed in a row before a branch of the walk is abandoned
+MAX_SYMLINK_DEPTH = 40
+
+def _scandir_mcp(root: Path, pattern_re: re.Pattern, suffixes: Tuple[str, ...],
+                 visited: Optional[Set[Tuple[int, int]]] = None, follow_symlinks: bool = False):
+    """Yield files under root whose names end with a suffix and match pattern_re
+    
+    Walks depth-first like rglob('*'), a directory's files before its subdirectories.
+    By default symlinked directories are not descended into, while symlinked tool files
+    are still reported (bin directories commonly link to the actual scripts); entry
+    types come from the directory listing. With follow_symlinks, (st_dev, st_ino) pairs in `visited` stop loops and
+    keep a directory or file reached twice from being reported twice.
+    """
+    if visited is None:
+        visited = set()
+    # Search roots are checked either way: they may be symlinks to one another
+    try:
+        st = os.stat(root)
+    except OSError:
+        return
+    if (st.st_dev, st.st_ino) in visited:
+        return
+    visited.add((st.st_dev, st.st_ino))
+    
+    stack = [(str(root), 0)]
+    while stack:
+        directory, symlink_depth = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not follow_symlinks:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append((entry.path, 0))
+                        elif (entry.name.endswith(suffixes) and pattern_re.search(entry.name) and
+                              entry.is_file()):
+                            yield Path(entry.path)
+                        continue
+                    
+                    # Following symlinks: directories and candidate files cost a stat for their identity
+                    if entry.is_dir():
+                        depth = symlink_depth + 1 if entry.is_symlink() else symlink_depth
+                        if depth > MAX_SYMLINK_DEPTH:
+                            continue
+                        st = entry.stat()
+                        if (st.st_dev, st.st_ino) not in visited:
+                            visited.add((st.st_dev, st.st_ino))
+                            subdirs.append((entry.path, depth))
+                    elif entry.name.endswith(suffixes) and pattern_re.search(entry.name) and entry.is_file():
+                        st = entry.stat()
+                        if (st.st_dev, st.st_ino) not in visited:
+                            visited.add((st.st_dev, st.st_ino))
+                            yield Path(entry.path)
+        except OSError:
+            continue
+        
+        stack.extend(reversed(subdirs))
+
+def _json_default(obj: Any) -> Any:
+    """Serialize MCP dataclasses through to_dict and anything else unknown as a string"""
+    to_dict = getattr(obj, 'to_dict', None)
+    return to_dict() if to_dict is not None else str(obj)
+
+def _write_json(path: Path, data: Any):
+    """Write data (dataclasses included) as indented JSON, using orjson when available"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=_json_default)
+
+def _mtime_signature(paths: List[Path]) -> List[List[Any]]:
+    """[path, st_mtime_ns] pairs for the given paths, None for missing ones, in order"""
+    signature = []
+    for path in paths:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        signature.append([str(path), mtime_ns])
+    return signature
+
+# Bump when the scan manifest layout changes so stale manifests are ignored
+SCAN_MANIFEST_VERSION = 2
+
+# Bump when file-content capability detection changes so cached results are discarded
+CAPABILITY_CACHE_VERSION = 1
+
+@lru_cache(maxsize=256)
+def _config_capabilities(command: str, args: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Capabilities implied by a server command and its arguments"""
+    command = command.lower()
+    args = [arg.lower() for arg in args]
+    capabilities = []
+    
+    if 'file' in command or any('file' in arg for arg in args):
+        capabilities.append(CAP_FILE)
+    if 'git' in command or any('git' in arg for arg in args):
+        capabilities.append(CAP_GIT)
+    if 'database' in command or any('db' in arg for arg in args):
+        capabilities.append(CAP_DATABASE)
+    if 'web' in command or any('http' in arg for arg in args):
+        capabilities.append(CAP_WEB)
+    
+    return tuple(capabilities) or (CAP_GENERAL,)
+
+@lru_cache(maxsize=256)
+def _help_capabilities(real_path: str, name: str, size: int, mtime_ns: int) -> Tuple[str, ...]:
+    """Capabilities mentioned in a binary's --help output
+    
+    Keyed by the resolved binary and its size and mtime, so a rebuilt binary is probed
+    again. The name is passed as argv[0] and is part of the key, since multi-call
+    binaries (busybox and the like) answer differently per name.
+    """
+    import subprocess
+    
+    try:
+        # Keyword tests are ASCII, so the output is lowercased as bytes and never decoded
+        result = subprocess.run([name, '--help'], executable=real_path,
+                              capture_output=True, timeout=5)
+        if result.returncode == 0:
+            return tuple(_match_capabilities(HELP_TEXT_CAPABILITIES, result.stdout.lower()))
+                
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    
+    return (CAP_GENERAL,)
+
+# Order capabilities are reported in by the keyword detectors
+CAPABILITY_ORDER = (CAP_FILE, CAP_GIT, CAP_DATABASE, CAP_WEB)
+
+CapabilityScanner = Tuple[re.Pattern, Dict[Any, str]]
+
+# Bytes read per chunk when scanning file contents for capability keywords
+CONTENT_CHUNK_SIZE = 64 * 1024
+
+def _compile_capability_keywords(keyword_capabilities: Tuple[Tuple[str, str], ...],
+                                 binary: bool = False) -> CapabilityScanner:
+    """Compile (keyword, capability) pairs into one scanner for all keywords
+    
+    The alternation sits in a lookahead, so a match is tried at every position and
+    overlapping keywords ("posql" holds both "os" and "sql") are all seen. Keywords
+    that are prefixes of one another must share a capability. A binary scanner
+    matches bytes instead of str.
+    """
+    keywords = dict(keyword_capabilities)
+    alternation = '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    if binary:
+        keywords = {keyword.encode(): capability for keyword, capability in keywords.items()}
+        return re.compile(f'(?=({alternation}))'.encode()), keywords
+    return re.compile(f'(?=({alternation}))'), keywords
+
+def _match_capabilities(scanner: CapabilityScanner, text: str) -> List[str]:
+    """Capabilities whose keywords occur in already-lowercased text or bytes, in CAPABILITY_ORDER"""
+    pattern, keywords = scanner
+    found = set()
+    for match in pattern.finditer(text):
+        found.add(keywords[match.group(1)])
+        if len(found) == len(CAPABILITY_ORDER):
+            break
+    
+    return [capability for capability in CAPABILITY_ORDER if capability in found] or [CAP_GENERAL]
+
+def _match_capabilities_stream(scanner: CapabilityScanner, stream) -> List[str]:
+    """Capabilities whose keywords occur in a binary stream, read and lowercased chunk by chunk"""
+    pattern, keywords = scanner
+    wanted = len(set(keywords.values()))
+    # Carry the end of each chunk over so keywords split across a boundary still match
+    overlap = max(map(len, keywords)) - 1
+    found = set()
+    tail = b''
+    while len(found) < wanted:
+        chunk = stream.read(CONTENT_CHUNK_SIZE)
+        if not chunk:
+            break
+        text = tail + chunk.lower()
+        for match in pattern.finditer(text):
+            found.add(keywords[match.group(1)])
+        tail = text[-overlap:] if overlap else b''
+    
+    return [capability for capability in CAPABILITY_ORDER if capability in found] or [CAP_GENERAL]
+
+NPM_NAME_CAPABILITIES = _compile_capability_keywords((
+    ('file', CAP_FILE), ('fs', CAP_FILE),
+    ('git', CAP_GIT),
+    ('db', CAP_DATABASE), ('database', CAP_DATABASE),
+    ('web', CAP_WEB), ('http', CAP_WEB),
+))
+
+PIP_NAME_CAPABILITIES = _compile_capability_keywords((
+    ('file', CAP_FILE), ('os', CAP_FILE),
+    ('git', CAP_GIT),
+    ('sql', CAP_DATABASE), ('database', CAP_DATABASE),
+    ('web', CAP_WEB), ('http', CAP_WEB), ('requests', CAP_WEB),
+))
+
+@lru_cache(maxsize=1024)
+def _npm_name_capabilities(package_name: str) -> Tuple[str, ...]:
+    """Capabilities suggested by an npm package name"""
+    return tuple(_match_capabilities(NPM_NAME_CAPABILITIES, package_name.lower()))
+
+@lru_cache(maxsize=1024)
+def _pip_name_capabilities(package_name: str) -> Tuple[str, ...]:
+    """Capabilities suggested by a pip package name"""
+    return tuple(_match_capabilities(PIP_NAME_CAPABILITIES, package_name.lower()))
+
+FILE_CONTENT_CAPABILITIES = _compile_capability_keywords((
+    ('file', CAP_FILE), ('filesystem', CAP_FILE),
+    ('git', CAP_GIT),
+    ('database', CAP_DATABASE), ('sql', CAP_DATABASE),
+    ('http', CAP_WEB), ('web', CAP_WEB),
+), binary=True)
+
+HELP_TEXT_CAPABILITIES = _compile_capability_keywords((
+    ('file', CAP_FILE),
+    ('git', CAP_GIT),
+    ('database', CAP_DATABASE), ('db', CAP_DATABASE),
+    ('web', CAP_WEB), ('http', CAP_WEB),
+), binary=True)
+
+# Package keywords (exact) or description words (substring) implying each capability
+PACKAGE_CAPABILITY_KEYWORDS = (
+    (CAP_FILE, frozenset(('file', 'filesystem', 'fs'))),
+    (CAP_GIT, frozenset(('git', 'version-control', 'vcs'))),
+    (CAP_DATABASE, frozenset(('database', 'db', 'sql'))),
+    (CAP_WEB, frozenset(('web', 'http', 'api', 'rest'))),
+    (CAP_CODE_ANALYSIS, frozenset(('lint', 'analyze', 'ast', 'parse'))),
+    (CAP_TESTING, frozenset(('test', 'spec', 'jest', 'mocha'))),
+)
+
+@lru_cache(maxsize=256)
+def _package_capabilities(keywords: Tuple[str, ...], description: str) -> Tuple[str, ...]:
+    """Capabilities implied by a package's keywords and lowercased description"""
+    capabilities = []
+    for capability, capability_keywords in PACKAGE_CAPABILITY_KEYWORDS:
+        if (not capability_keywords.isdisjoint(keywords) or
+            any(keyword in description for keyword in capability_keywords)):
+            capabilities.append(capability)
+    
+    return tuple(capabilities) or (CAP_GENERAL,)
+
+def _read_json(path: Path) -> Any:
+    """Read a JSON file, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _write_json_atomic(path: Path, data: Any):
+    """Write JSON to a temp file and rename it over path, so readers never see a partial file"""
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    _write_json(tmp_path, data)
+    os.replace(tmp_path, path)
+
+def _read_json_versioned(path: Path, version: int) -> Optional[Any]:
+    """Payload of a {"v": version, "data": ...} file, or None if missing, unreadable or stale"""
+    try:
+        with open(path, 'r') as f:
+            content = json.load(f)
+        if content.get("v") == version:
+            return content["data"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    return None
+
+# __slots__ for the dataclasses below where dataclass() can generate them (3.10+);
+# a hand-written __slots__ would clash with their field defaults
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class MCPTool:
     """Represents an MCP tool with its capabilities"""
     name: str
@@ -29,15 +394,41 @@ class MCPTool:
     status: str  # 'available', 'configured', 'error', 'disabled'
     auto_discovered: bool = True
     integration_config: Dict[str, Any] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of the fields, for JSON output (asdict would deep-copy every list and dict)"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'version': self.version,
+            'source': self.source,
+            'capabilities': self.capabilities,
+            'config_path': self.config_path,
+            'executable_path': self.executable_path,
+            'command': self.command,
+            'status': self.status,
+            'auto_discovered': self.auto_discovered,
+            'integration_config': self.integration_config
+        }
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class MCPWorkflow:
     """Represents a workflow combining multiple MCP tools"""
     name: str
     description: str
-    tools: List[str]
+    tools: Sequence[str]
     steps: List[Dict[str, Any]]
     auto_generated: bool = True
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of the fields, for JSON output"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'tools': self.tools,
+            'steps': self.steps,
+            'auto_generated': self.auto_generated
+        }
 
 class EnhancedMCPOrchestrator:
     """Enhanced MCP Orchestrator with automatic discovery and integration"""
@@ -56,6 +447,26 @@ class EnhancedMCPOrchestrator:
         # Setup logging
         self._setup_logging()
         
+        # Discovered tools, as listed and reported by the CLI
+        self.tools_file = self.mcp_dir / "tools" / "discovered-tools.json"
+        
+        # Per-source watched-path mtimes and raw tools from the last scan
+        self._manifest_file = self.mcp_dir / "tools" / ".scan-manifest.json"
+        
+        # File-content capabilities as path -> [mtime_ns, size, capabilities]: those
+        # cached by the last run, and those looked up in this one (persisted on save)
+        self._capability_cache_file = self.mcp_dir / "tools" / "cap-cache.json"
+        self._file_capabilities_cached = self._load_capability_cache()
+        self._file_capabilities_used: Dict[str, List[Any]] = {}
+        
+        # Tool and workflow files are written in the background; writes are
+        # awaited with _wait_for_writes (threads start on first use)
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        self._pending_writes: List[Future] = []
+        
+        # Package manager executables resolved on PATH (None when absent)
+        self._executables: Dict[str, Optional[str]] = {}
+        
         # Tool storage
         self.discovered_tools: Dict[str, MCPTool] = {}
         self.workflows: Dict[str, MCPWorkflow] = {}
@@ -68,6 +479,8 @@ class EnhancedMCPOrchestrator:
             'mcp', 'model-context-protocol', 'claude-mcp', 'mcp-server',
             'anthropic-mcp', 'context-protocol', 'mcp-client'
         ]
+        # All patterns in one case-insensitive scan, instead of a lower() and a check per pattern
+        self._mcp_re = re.compile('|'.join(map(re.escape, self.mcp_patterns)), re.IGNORECASE)
     
     def _setup_logging(self):
         """Setup logging for MCP orchestrator"""
@@ -88,18 +501,22 @@ class EnhancedMCPOrchestrator:
         """Load MCP configuration"""
         config_path = self.agent_os_dir / "config" / "enhanced-config.yml"
         if config_path.exists():
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                return config.get('mcp_integration', {})
+            config = _load_yaml_cached(config_path)
+            return config.get('mcp_integration', {})
         return {
             'enabled': True,
             'auto_discovery': True,
             'auto_configure': True,
-            'create_workflows': True
+            'create_workflows': True,
+            'follow_symlinks': False
         }
     
-    def auto_discover_and_integrate(self) -> Dict[str, Any]:
-        """Automatically discover and integrate all MCP tools"""
+    def auto_discover_and_integrate(self, full_scan: bool = False) -> Dict[str, Any]:
+        """Automatically discover and integrate all MCP tools
+        
+        Sources whose watched paths are unchanged since the last scan reuse the
+        tools recorded then; full_scan rescans everything.
+        """
         self.logger.info("🔍 Starting automatic MCP tool discovery and integration...")
         
         if not self.config.get('auto_discovery', True):
@@ -108,22 +525,33 @@ class EnhancedMCPOrchestrator:
         
         # Comprehensive discovery
         all_tools = {}
+        manifest = {} if full_scan else self._load_scan_manifest()
+        new_manifest = {}
         
         # 1. Claude Desktop MCP tools
         self.logger.info("📱 Discovering Claude Desktop MCP tools...")
-        claude_tools = self._discover_claude_desktop_tools()
+        claude_tools = self._discover_incremental(
+            "claude-desktop", self._claude_desktop_config_paths(),
+            self._discover_claude_desktop_tools, manifest, new_manifest
+        )
         all_tools.update(claude_tools)
         self.logger.info(f"   Found {len(claude_tools)} Claude Desktop tools")
         
         # 2. VS Code MCP extensions
         self.logger.info("🔧 Discovering VS Code MCP extensions...")
-        vscode_tools = self._discover_vscode_mcp_tools()
+        vscode_tools = self._discover_incremental(
+            "vscode", self._vscode_extensions_dirs(),
+            self._discover_vscode_mcp_tools, manifest, new_manifest
+        )
         all_tools.update(vscode_tools)
         self.logger.info(f"   Found {len(vscode_tools)} VS Code MCP tools")
         
         # 3. System-wide MCP tools
         self.logger.info("💻 Discovering system-wide MCP tools...")
-        system_tools = self._discover_system_mcp_tools()
+        system_tools = self._discover_incremental(
+            "system", self._system_tool_dirs(),
+            self._discover_system_mcp_tools, manifest, new_manifest
+        )
         all_tools.update(system_tools)
         self.logger.info(f"   Found {len(system_tools)} system MCP tools")
         
@@ -139,6 +567,11 @@ class EnhancedMCPOrchestrator:
         all_tools.update(directory_tools)
         self.logger.info(f"   Found {len(directory_tools)} directory-based tools")
         
+        # Package managers and the recursive directory walk have no cheap change check
+        # and are always rescanned; the manifest records the others before configuration
+        self._save_scan_manifest(new_manifest)
+        self._save_capability_cache()
+        
         # Auto-configure discovered tools
         if self.config.get('auto_configure', True):
             self.logger.info("⚙️ Auto-configuring discovered tools...")
@@ -154,8 +587,9 @@ class EnhancedMCPOrchestrator:
             self.logger.info("🔄 Creating default workflows...")
             self._create_default_workflows(configured_tools)
         
-        # Generate integration report
+        # Generate integration report while the files are written
         report = self._generate_integration_report(configured_tools)
+        self._wait_for_writes()
         
         self.logger.info(f"✅ Successfully discovered and integrated {len(configured_tools)} MCP tools")
         return {
@@ -164,23 +598,116 @@ class EnhancedMCPOrchestrator:
             'total_discovered': len(configured_tools)
         }
     
-    def _discover_claude_desktop_tools(self) -> Dict[str, MCPTool]:
-        """Discover MCP tools from Claude Desktop configuration"""
-        tools = {}
+    def _load_scan_manifest(self) -> Dict[str, Any]:
+        """Load the per-source manifest of the last scan, or {} if missing or stale"""
+        sources = _read_json_versioned(self._manifest_file, SCAN_MANIFEST_VERSION)
+        return sources if isinstance(sources, dict) else {}
+    
+    def _save_scan_manifest(self, sources: Dict[str, Any]) -> None:
+        """Write the scan manifest atomically"""
+        try:
+            _write_json_atomic(self._manifest_file, {"v": SCAN_MANIFEST_VERSION, "data": sources})
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.debug(f"Could not save scan manifest: {e}")
+    
+    def _load_capability_cache(self) -> Dict[str, List[Any]]:
+        """Load file-content capabilities from the last run, keyed by path"""
+        entries = _read_json_versioned(self._capability_cache_file, CAPABILITY_CACHE_VERSION)
+        if not isinstance(entries, dict):
+            return {}
         
-        # Common Claude Desktop config locations
-        config_paths = [
-            Path.home() / "Library" / "Application Support" / "Claude" / "claude_desktop_config.json",  # macOS
-            Path.home() / "AppData" / "Roaming" / "Claude" / "claude_desktop_config.json",  # Windows
+        for entry in entries.values():
+            if isinstance(entry, list) and len(entry) == 3 and isinstance(entry[2], list):
+                entry[2] = _intern_capabilities(entry[2])
+        return entries
+    
+    def _save_capability_cache(self) -> None:
+        """Persist the file-content capabilities used in this run, if they changed"""
+        if self._file_capabilities_used == self._file_capabilities_cached:
+            return
+        try:
+            _write_json_atomic(self._capability_cache_file,
+                               {"v": CAPABILITY_CACHE_VERSION, "data": self._file_capabilities_used})
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.debug(f"Could not save capability cache: {e}")
+    
+    def _discover_incremental(self, source: str, watched_paths: List[Path], discover,
+                              manifest: Dict[str, Any], new_manifest: Dict[str, Any]) -> Dict[str, MCPTool]:
+        """Reuse a source's tools from the manifest while its watched paths are unchanged"""
+        # Taken before discovery, so a change made during the scan triggers a rescan next time
+        signature = _mtime_signature(watched_paths)
+        
+        tools = None
+        entry = manifest.get(source)
+        if entry and entry.get("signature") == signature:
+            try:
+                tools = {tool_id: MCPTool(**data) for tool_id, data in entry["tools"].items()}
+                for tool in tools.values():
+                    tool.capabilities = _intern_capabilities(tool.capabilities)
+                self.logger.debug(f"Reusing {len(tools)} {source} tools; nothing changed since last scan")
+            except (TypeError, KeyError, AttributeError):
+                tools = None
+        
+        if tools is None:
+            tools = discover()
+        
+        # Snapshot now: auto-configuration later replaces status and integration_config
+        new_manifest[source] = {
+            "signature": signature,
+            "tools": {tool_id: tool.to_dict() for tool_id, tool in tools.items()}
+        }
+        return tools
+    
+    def _claude_desktop_config_paths(self) -> List[Path]:
+        """Claude Desktop config locations for the running platform"""
+        if sys.platform == 'darwin':
+            return [Path.home() / "Library" / "Application Support" / "Claude" / "claude_desktop_config.json"]
+        if sys.platform == 'win32':
+            return [Path.home() / "AppData" / "Roaming" / "Claude" / "claude_desktop_config.json"]
+        return [
             Path.home() / ".config" / "claude-desktop" / "claude_desktop_config.json",  # Linux
             Path.home() / ".claude" / "claude_desktop_config.json",  # Alternative Linux
         ]
+    
+    def _vscode_extensions_dirs(self) -> List[Path]:
+        """VS Code extensions directories for the running platform"""
+        # User extensions live under the home directory on every platform
+        extensions_dirs = [
+            Path.home() / ".vscode" / "extensions",
+            Path.home() / ".vscode-insiders" / "extensions",
+        ]
+        if sys.platform == 'win32':
+            extensions_dirs.append(
+                Path.home() / "AppData" / "Local" / "Programs" / "Microsoft VS Code" / "resources" / "app" / "extensions"
+            )
+        return extensions_dirs
+    
+    def _system_tool_dirs(self) -> List[Path]:
+        """Common system paths followed by the PATH directories"""
+        system_paths = [
+            Path("/usr/local/bin"),
+            Path("/usr/bin"),
+            Path("/opt"),
+            Path.home() / ".local" / "bin",
+            Path.home() / "bin",
+        ]
+        
+        # Add PATH directories
+        path_env = os.environ.get('PATH', '')
+        for path_str in path_env.split(os.pathsep):
+            if path_str:
+                system_paths.append(Path(path_str))
+        
+        return system_paths
+    
+    def _discover_claude_desktop_tools(self) -> Dict[str, MCPTool]:
+        """Discover MCP tools from Claude Desktop configuration"""
+        tools = {}
         
-        for config_path in config_paths:
+        for config_path in self._claude_desktop_config_paths():
             if config_path.exists():
                 try:
-                    with open(config_path, 'r') as f:
-                        config = json.load(f)
+                    config = _read_json_cached(str(config_path), config_path.stat().st_mtime_ns)
                     
                     mcp_servers = config.get('mcpServers', {})
                     for server_name, server_config in mcp_servers.items():
@@ -207,96 +734,107 @@ class EnhancedMCPOrchestrator:
         """Discover MCP tools from VS Code extensions"""
         tools = {}
         
-        # VS Code extensions directory
-        vscode_extensions_dirs = [
-            Path.home() / ".vscode" / "extensions",
-            Path.home() / ".vscode-insiders" / "extensions",
-            Path.home() / "AppData" / "Local" / "Programs" / "Microsoft VS Code" / "resources" / "app" / "extensions",  # Windows
-        ]
-        
-        for extensions_dir in vscode_extensions_dirs:
+        # Listing is cheap; the per-extension stat, read and parse run on a thread pool
+        extension_dirs = []
+        for extensions_dir in self._vscode_extensions_dirs():
             if extensions_dir.exists():
-                for extension_dir in extensions_dir.iterdir():
-                    if extension_dir.is_dir():
-                        # Check for MCP-related extensions
-                        package_json = extension_dir / "package.json"
-                        if package_json.exists():
-                            try:
-                                with open(package_json, 'r') as f:
-                                    package_data = json.load(f)
-                                
-                                # Check if extension is MCP-related
-                                name = package_data.get('name', '')
-                                description = package_data.get('description', '')
-                                keywords = package_data.get('keywords', [])
-                                
-                                if any(pattern in name.lower() or 
-                                      pattern in description.lower() or
-                                      any(pattern in keyword.lower() for keyword in keywords)
-                                      for pattern in self.mcp_patterns):
-                                    
-                                    tool = MCPTool(
-                                        name=name,
-                                        description=description,
-                                        version=package_data.get('version', 'unknown'),
-                                        source="vscode",
-                                        capabilities=self._extract_capabilities_from_package(package_data),
-                                        config_path=str(package_json),
-                                        executable_path=str(extension_dir),
-                                        command=self._build_vscode_command(extension_dir, package_data),
-                                        status="available",
-                                        integration_config=package_data
-                                    )
-                                    tools[f"vscode-{name}"] = tool
-                                    
-                            except Exception as e:
-                                self.logger.debug(f"Error reading VS Code extension {extension_dir}: {e}")
+                extension_dirs.extend(extension_dir for extension_dir in extensions_dir.iterdir()
+                                      if extension_dir.is_dir())
+        
+        if len(extension_dirs) > 1:
+            with ThreadPoolExecutor(max_workers=min(IO_WORKERS, len(extension_dirs))) as executor:
+                results = list(executor.map(self._parse_vscode_extension, extension_dirs))
+        else:
+            results = [self._parse_vscode_extension(extension_dir) for extension_dir in extension_dirs]
+        
+        for result in results:
+            if result is not None:
+                tool_id, tool = result
+                tools[tool_id] = tool
         
         return tools
     
+    def _parse_vscode_extension(self, extension_dir: Path) -> Optional[Tuple[str, MCPTool]]:
+        """Build the tool for one VS Code extension directory, or None if it is not MCP-related"""
+        # Check for MCP-related extensions
+        package_json = extension_dir / "package.json"
+        if not package_json.exists():
+            return None
+        
+        try:
+            package_data = _read_json_cached(str(package_json), package_json.stat().st_mtime_ns)
+            
+            # Check if extension is MCP-related
+            name = package_data.get('name', '')
+            description = package_data.get('description', '')
+            keywords = package_data.get('keywords', [])
+            
+            if self._mcp_re.search(f"{name}\n{description}\n{' '.join(keywords)}"):
+                
+                tool = MCPTool(
+                    name=name,
+                    description=description,
+                    version=package_data.get('version', 'unknown'),
+                    source="vscode",
+                    capabilities=self._extract_capabilities_from_package(package_data),
+                    config_path=str(package_json),
+                    executable_path=str(extension_dir),
+                    command=self._build_vscode_command(extension_dir, package_data),
+                    status="available",
+                    integration_config=package_data
+                )
+                return f"vscode-{name}", tool
+                
+        except Exception as e:
+            self.logger.debug(f"Error reading VS Code extension {extension_dir}: {e}")
+        
+        return None
+    
     def _discover_system_mcp_tools(self) -> Dict[str, MCPTool]:
         """Discover system-wide MCP tools"""
         tools = {}
         
-        # Common system paths
-        system_paths = [
-            Path("/usr/local/bin"),
-            Path("/usr/bin"),
-            Path("/opt"),
-            Path.home() / ".local" / "bin",
-            Path.home() / "bin",
-        ]
-        
-        # Add PATH directories
-        path_env = os.environ.get('PATH', '')
-        for path_str in path_env.split(os.pathsep):
-            if path_str:
-                system_paths.append(Path(path_str))
-        
-        for system_path in system_paths:
-            if system_path.exists() and system_path.is_dir():
-                try:
-                    for item in system_path.iterdir():
-                        if item.is_file() and os.access(item, os.X_OK):
-                            # Check if executable is MCP-related
-                            if any(pattern in item.name.lower() for pattern in self.mcp_patterns):
-                                tool = MCPTool(
-                                    name=item.name,
-                                    description=f"System MCP tool: {item.name}",
-                                    version=self._get_tool_version(item),
-                                    source="system",
-                                    capabilities=self._detect_tool_capabilities(item),
-                                    config_path="",
-                                    executable_path=str(item),
-                                    command=[str(item)],
-                                    status="available"
-                                )
-                                tools[f"system-{item.name}"] = tool
-                                
-                except PermissionError:
-                    self.logger.debug(f"Permission denied accessing {system_path}")
-                except Exception as e:
-                    self.logger.debug(f"Error scanning {system_path}: {e}")
+        # PATH often repeats directories, or names one through a symlink; scan each once
+        seen = set()
+        for system_path in self._system_tool_dirs():
+            real_path = os.path.realpath(system_path)
+            if real_path in seen:
+                continue
+            seen.add(real_path)
+            
+            try:
+                with os.scandir(system_path) as entries:
+                    for entry in entries:
+                        # Check if executable is MCP-related before paying for a stat
+                        if not self._mcp_re.search(entry.name):
+                            continue
+                        # A name found earlier shadows this one, as it would on PATH
+                        tool_id = f"system-{entry.name}"
+                        if tool_id in tools or not entry.is_file():
+                            continue
+                        if not entry.stat().st_mode & 0o111:
+                            continue
+                        
+                        item = Path(entry.path)
+                        tool = MCPTool(
+                            name=item.name,
+                            description=f"System MCP tool: {item.name}",
+                            version=self._get_tool_version(item),
+                            source="system",
+                            capabilities=self._detect_tool_capabilities(item),
+                            config_path="",
+                            executable_path=str(item),
+                            command=[str(item)],
+                            status="available"
+                        )
+                        tools[tool_id] = tool
+                        
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            except PermissionError:
+                self.logger.debug(f"Permission denied accessing {system_path}")
+            except Exception as e:
+                self.logger.debug(f"Error scanning {system_path}: {e}")
         
         return tools
     
@@ -304,31 +842,46 @@ class EnhancedMCPOrchestrator:
         """Discover MCP tools installed via package managers"""
         tools = {}
         
-        # NPM packages
-        npm_tools = self._discover_npm_mcp_tools()
-        tools.update(npm_tools)
-        
-        # Python packages
-        pip_tools = self._discover_pip_mcp_tools()
-        tools.update(pip_tools)
+        # npm and pip each spend seconds in their own process; query them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # NPM packages
+            npm_future = executor.submit(self._discover_npm_mcp_tools)
+            # Python packages
+            pip_future = executor.submit(self._discover_pip_mcp_tools)
+            
+            tools.update(npm_future.result())
+            tools.update(pip_future.result())
         
         return tools
     
+    def _which(self, name: str) -> Optional[str]:
+        """Resolve an executable on PATH once per orchestrator"""
+        if name not in self._executables:
+            self._executables[name] = shutil.which(name)
+        return self._executables[name]
+    
     def _discover_npm_mcp_tools(self) -> Dict[str, MCPTool]:
         """Discover MCP tools installed via NPM"""
+        import subprocess
+        
         tools = {}
         
+        npm = self._which('npm')
+        if not npm:
+            self.logger.debug("NPM not found, skipping NPM MCP tool discovery")
+            return tools
+        
         try:
-            # Check global npm packages
-            result = subprocess.run(['npm', 'list', '-g', '--json'], 
-                                  capture_output=True, text=True, timeout=30)
+            # Check global npm packages; only top-level ones, not their dependency trees
+            result = subprocess.run([npm, 'list', '-g', '--depth=0', '--json'], 
+                                  capture_output=True, text=True, timeout=PACKAGE_LIST_TIMEOUT)
             
             if result.returncode == 0:
                 npm_data = json.loads(result.stdout)
                 dependencies = npm_data.get('dependencies', {})
                 
                 for package_name, package_info in dependencies.items():
-                    if any(pattern in package_name.lower() for pattern in self.mcp_patterns):
+                    if self._mcp_re.search(package_name):
                         tool = MCPTool(
                             name=package_name,
                             description=f"NPM MCP package: {package_name}",
@@ -351,19 +904,26 @@ class EnhancedMCPOrchestrator:
     
     def _discover_pip_mcp_tools(self) -> Dict[str, MCPTool]:
         """Discover MCP tools installed via pip"""
+        import subprocess
+        
         tools = {}
         
+        pip = self._which('pip')
+        if not pip:
+            self.logger.debug("pip not found, skipping pip MCP tool discovery")
+            return tools
+        
         try:
             # Check installed Python packages
-            result = subprocess.run(['pip', 'list', '--format=json'], 
-                                  capture_output=True, text=True, timeout=30)
+            result = subprocess.run([pip, 'list', '--format=json'], 
+                                  capture_output=True, text=True, timeout=PACKAGE_LIST_TIMEOUT)
             
             if result.returncode == 0:
                 packages = json.loads(result.stdout)
                 
                 for package in packages:
                     package_name = package['name']
-                    if any(pattern in package_name.lower() for pattern in self.mcp_patterns):
+                    if self._mcp_re.search(package_name):
                         tool = MCPTool(
                             name=package_name,
                             description=f"Python MCP package: {package_name}",
@@ -398,26 +958,39 @@ class EnhancedMCPOrchestrator:
             self.project_root / ".mcp",
         ]
         
+        # Shared across search directories, which may be symlinks to one another
+        visited: Set[Tuple[int, int]] = set()
+        follow_symlinks = bool(self.config.get('follow_symlinks', False))
+        # Tools are keyed by file stem; the first file found for a stem is kept
+        items_by_id: Dict[str, Path] = {}
         for search_dir in search_dirs:
             if search_dir.exists() and search_dir.is_dir():
-                for item in search_dir.rglob('*'):
-                    if item.is_file():
-                        # Check for MCP tool indicators
-                        if (item.suffix in ['.py', '.js', '.ts', '.sh'] and
-                            any(pattern in item.name.lower() for pattern in self.mcp_patterns)):
-                            
-                            tool = MCPTool(
-                                name=item.stem,
-                                description=f"Directory MCP tool: {item.name}",
-                                version="unknown",
-                                source="directory",
-                                capabilities=self._analyze_file_capabilities(item),
-                                config_path="",
-                                executable_path=str(item),
-                                command=self._build_file_command(item),
-                                status="available"
-                            )
-                            tools[f"dir-{item.stem}"] = tool
+                # Check for MCP tool indicators
+                for item in _scandir_mcp(search_dir, self._mcp_re, SCRIPT_SUFFIXES, visited,
+                                         follow_symlinks):
+                    items_by_id.setdefault(f"dir-{item.stem}", item)
+        items = list(items_by_id.values())
+        
+        # File reads dominate capability analysis; overlap them, keeping walk order
+        if len(items) > 1:
+            with ThreadPoolExecutor(max_workers=min(IO_WORKERS, len(items))) as executor:
+                capabilities = list(executor.map(self._analyze_file_capabilities, items))
+        else:
+            capabilities = [self._analyze_file_capabilities(item) for item in items]
+        
+        for (tool_id, item), item_capabilities in zip(items_by_id.items(), capabilities):
+            tool = MCPTool(
+                name=item.stem,
+                description=f"Directory MCP tool: {item.name}",
+                version="unknown",
+                source="directory",
+                capabilities=item_capabilities,
+                config_path="",
+                executable_path=str(item),
+                command=self._build_file_command(item),
+                status="available"
+            )
+            tools[tool_id] = tool
         
         return tools
     
@@ -425,10 +998,17 @@ class EnhancedMCPOrchestrator:
         """Automatically configure discovered tools for Agent OS integration"""
         configured_tools = {}
         
-        for tool_id, tool in tools.items():
+        # Availability probes are subprocess-bound; run them concurrently, in tool order
+        if len(tools) > 1:
+            with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(tools))) as executor:
+                available = list(executor.map(self._test_tool_availability, tools.values()))
+        else:
+            available = [self._test_tool_availability(tool) for tool in tools.values()]
+        
+        for (tool_id, tool), is_available in zip(tools.items(), available):
             try:
                 # Test tool availability
-                if self._test_tool_availability(tool):
+                if is_available:
                     tool.status = "configured"
                     
                     # Generate Agent OS integration config
@@ -449,25 +1029,28 @@ class EnhancedMCPOrchestrator:
     
     def _test_tool_availability(self, tool: MCPTool) -> bool:
         """Test if a tool is available and working"""
+        import subprocess
+        
         try:
+            # Config-declared tools: the config proves installation, so only check the executable
+            if tool.source in CONFIG_DECLARED_SOURCES:
+                return bool(tool.executable_path) and (
+                    Path(tool.executable_path).exists() or shutil.which(tool.executable_path) is not None
+                )
+            
             if tool.command:
-                # Try to run the tool with a help or version flag
-                test_commands = [
-                    tool.command + ['--help'],
-                    tool.command + ['--version'],
-                    tool.command + ['-h'],
-                    tool.command + ['-v']
-                ]
-                
-                for test_cmd in test_commands:
-                    try:
-                        result = subprocess.run(test_cmd, capture_output=True, 
-                                              text=True, timeout=10)
-                        if result.returncode == 0:
-                            return True
-                    except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
-                        continue
-                        
+                # One --help probe; many servers print usage and exit non-zero, which still counts
+                try:
+                    result = subprocess.run(tool.command + ['--help'], capture_output=True,
+                                            stdin=subprocess.DEVNULL, timeout=PROBE_TIMEOUT)
+                    if (result.returncode == 0 or
+                        b'usage' in result.stdout.lower() or
+                        b'usage' in result.stderr.lower() or
+                        len(result.stdout) + len(result.stderr) > 16):
+                        return True
+                except (subprocess.TimeoutExpired, OSError):
+                    pass
+                    
             # If executable path exists, consider it available
             if tool.executable_path and Path(tool.executable_path).exists():
                 return True
@@ -495,28 +1078,31 @@ class EnhancedMCPOrchestrator:
         # Categorize tools by capabilities
         tool_categories = self._categorize_tools_by_capabilities(tools)
         
-        # Create common workflows
-        if 'file_operations' in tool_categories and 'code_analysis' in tool_categories:
+        # Create common workflows; steps share the immutable category tuples
+        file_tools = tool_categories.get(CAP_FILE)
+        analysis_tools = tool_categories.get(CAP_CODE_ANALYSIS)
+        if file_tools and analysis_tools:
             workflows['code_review'] = MCPWorkflow(
                 name="code_review",
                 description="Comprehensive code review using file operations and analysis tools",
-                tools=tool_categories['file_operations'] + tool_categories['code_analysis'],
+                tools=file_tools + analysis_tools,
                 steps=[
-                    {"action": "read_files", "tools": tool_categories['file_operations']},
-                    {"action": "analyze_code", "tools": tool_categories['code_analysis']},
-                    {"action": "generate_report", "tools": tool_categories['file_operations']}
+                    {"action": "read_files", "tools": file_tools},
+                    {"action": "analyze_code", "tools": analysis_tools},
+                    {"action": "generate_report", "tools": file_tools}
                 ]
             )
         
-        if 'git_operations' in tool_categories:
+        git_tools = tool_categories.get(CAP_GIT)
+        if git_tools:
             workflows['git_workflow'] = MCPWorkflow(
                 name="git_workflow",
                 description="Enhanced git workflow with MCP tools",
-                tools=tool_categories['git_operations'],
+                tools=git_tools,
                 steps=[
-                    {"action": "check_status", "tools": tool_categories['git_operations']},
-                    {"action": "create_branch", "tools": tool_categories['git_operations']},
-                    {"action": "commit_changes", "tools": tool_categories['git_operations']}
+                    {"action": "check_status", "tools": git_tools},
+                    {"action": "create_branch", "tools": git_tools},
+                    {"action": "commit_changes", "tools": git_tools}
                 ]
             )
         
@@ -526,29 +1112,51 @@ class EnhancedMCPOrchestrator:
         
         self.workflows.update(workflows)
     
-    def _save_discovered_tools(self, tools: Dict[str, MCPTool]) -> None:
-        """Save discovered tools to file"""
-        tools_file = self.mcp_dir / "tools" / "discovered-tools.json"
+    def _save_discovered_tools(self, tools: Dict[str, MCPTool]) -> Future:
+        """Save discovered tools to file in the background"""
+        tools_file = self.tools_file
         
-        # Convert tools to serializable format
-        tools_data = {}
-        for tool_id, tool in tools.items():
-            tools_data[tool_id] = asdict(tool)
+        def write():
+            # Tools are serialized directly; no intermediate dict of dicts
+            _write_json(tools_file, tools)
+            self.logger.info(f"Saved {len(tools)} discovered tools to {tools_file}")
         
-        with open(tools_file, 'w') as f:
-            json.dump(tools_data, f, indent=2, default=str)
+        return self._submit_write(write)
+    
+    def _load_tools_file(self) -> Optional[Dict[str, Any]]:
+        """Saved discovered tools as plain dicts, or None before the first discovery"""
+        try:
+            tools = _read_json(self.tools_file)
+        except FileNotFoundError:
+            return None
         
-        self.logger.info(f"Saved {len(tools)} discovered tools to {tools_file}")
+        for tool_data in tools.values():
+            if isinstance(tool_data, dict) and isinstance(tool_data.get('capabilities'), list):
+                tool_data['capabilities'] = _intern_capabilities(tool_data['capabilities'])
+        return tools
     
-    def _save_workflow(self, name: str, workflow: MCPWorkflow) -> None:
-        """Save a workflow to file"""
+    def _save_workflow(self, name: str, workflow: MCPWorkflow) -> Future:
+        """Save a workflow to file in the background"""
         workflow_file = self.mcp_dir / "workflows" / f"{name}.json"
         
-        with open(workflow_file, 'w') as f:
-            json.dump(asdict(workflow), f, indent=2)
+        return self._submit_write(_write_json, workflow_file, workflow)
+    
+    def _submit_write(self, fn, *args) -> Future:
+        """Queue a file write on the I/O thread"""
+        future = self._io_pool.submit(fn, *args)
+        self._pending_writes.append(future)
+        return future
+    
+    def _wait_for_writes(self) -> None:
+        """Block until queued writes finish, re-raising the first failure"""
+        pending, self._pending_writes = self._pending_writes, []
+        for future in pending:
+            future.result()
     
     def _generate_integration_report(self, tools: Dict[str, MCPTool]) -> Dict[str, Any]:
         """Generate integration report"""
+        from datetime import datetime
+        
         report = {
             'total_tools': len(tools),
             'by_source': {},
@@ -557,23 +1165,17 @@ class EnhancedMCPOrchestrator:
             'integration_timestamp': datetime.now().isoformat()
         }
         
-        # Count by source
-        for tool in tools.values():
-            source = tool.source
-            report['by_source'][source] = report['by_source'].get(source, 0) + 1
-        
-        # Count by status
-        for tool in tools.values():
-            status = tool.status
-            report['by_status'][status] = report['by_status'].get(status, 0) + 1
-        
-        # Capabilities summary
-        all_capabilities = []
+        # Sources, statuses and capabilities counted in one pass over the tools
+        source_counts = Counter()
+        status_counts = Counter()
+        capability_counts = Counter()
         for tool in tools.values():
-            all_capabilities.extend(tool.capabilities)
+            source_counts[tool.source] += 1
+            status_counts[tool.status] += 1
+            capability_counts.update(tool.capabilities)
         
-        from collections import Counter
-        capability_counts = Counter(all_capabilities)
+        report['by_source'] = dict(source_counts)
+        report['by_status'] = dict(status_counts)
         report['capabilities_summary'] = dict(capability_counts.most_common(10))
         
         return report
@@ -581,32 +1183,25 @@ class EnhancedMCPOrchestrator:
     # Helper methods for capability detection and configuration
     def _extract_capabilities_from_config(self, config: Dict) -> List[str]:
         """Extract capabilities from tool configuration"""
-        capabilities = []
-        
         # Analyze command and arguments
         command = config.get('command', '')
         args = config.get('args', [])
         
-        if 'file' in command.lower() or any('file' in arg.lower() for arg in args):
-            capabilities.append('file_operations')
-        if 'git' in command.lower() or any('git' in arg.lower() for arg in args):
-            capabilities.append('git_operations')
-        if 'database' in command.lower() or any('db' in arg.lower() for arg in args):
-            capabilities.append('database_operations')
-        if 'web' in command.lower() or any('http' in arg.lower() for arg in args):
-            capabilities.append('web_operations')
-        
-        return capabilities or ['general']
+        try:
+            return list(_config_capabilities(command, tuple(args)))
+        except TypeError:  # Unhashable values; skip the cache
+            return list(_config_capabilities.__wrapped__(command, args))
     
     def _build_command_from_config(self, config: Dict) -> List[str]:
         """Build command list from configuration"""
         command = config.get('command', '')
         args = config.get('args', [])
         
+        # Copy list commands: the config may be a cached parse shared between calls
         if isinstance(command, str):
             cmd_list = [command]
         else:
-            cmd_list = command
+            cmd_list = list(command)
         
         if args:
             cmd_list.extend(args)
@@ -615,26 +1210,11 @@ class EnhancedMCPOrchestrator:
     
     def _extract_capabilities_from_package(self, package_data: Dict) -> List[str]:
         """Extract capabilities from package.json data"""
-        capabilities = []
-        
-        keywords = package_data.get('keywords', [])
+        # Only string keywords can equal a capability keyword; others would also break hashing
+        keywords = tuple(keyword for keyword in package_data.get('keywords', []) if isinstance(keyword, str))
         description = package_data.get('description', '').lower()
         
-        capability_keywords = {
-            'file_operations': ['file', 'filesystem', 'fs'],
-            'git_operations': ['git', 'version-control', 'vcs'],
-            'database_operations': ['database', 'db', 'sql'],
-            'web_operations': ['web', 'http', 'api', 'rest'],
-            'code_analysis': ['lint', 'analyze', 'ast', 'parse'],
-            'testing': ['test', 'spec', 'jest', 'mocha']
-        }
-        
-        for capability, keywords_list in capability_keywords.items():
-            if (any(keyword in keywords for keyword in keywords_list) or
-                any(keyword in description for keyword in keywords_list)):
-                capabilities.append(capability)
-        
-        return capabilities or ['general']
+        return list(_package_capabilities(keywords, description))
     
     def _build_vscode_command(self, extension_dir: Path, package_data: Dict) -> List[str]:
         """Build command for VS Code extension"""
@@ -649,6 +1229,8 @@ class EnhancedMCPOrchestrator:
     
     def _get_tool_version(self, executable: Path) -> str:
         """Get version of a tool"""
+        import subprocess
+        
         try:
             result = subprocess.run([str(executable), '--version'], 
                                   capture_output=True, text=True, timeout=5)
@@ -660,124 +1242,66 @@ class EnhancedMCPOrchestrator:
     
     def _detect_tool_capabilities(self, executable: Path) -> List[str]:
         """Detect capabilities of a tool by analyzing its help output"""
-        capabilities = []
-        
+        # The same binary is often reached through several paths or sources; parse its help once
         try:
-            result = subprocess.run([str(executable), '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                help_text = result.stdout.lower()
-                
-                if 'file' in help_text:
-                    capabilities.append('file_operations')
-                if 'git' in help_text:
-                    capabilities.append('git_operations')
-                if 'database' in help_text or 'db' in help_text:
-                    capabilities.append('database_operations')
-                if 'web' in help_text or 'http' in help_text:
-                    capabilities.append('web_operations')
-                    
-        except:
-            pass
+            real_path = os.path.realpath(executable)
+            st = os.stat(real_path)
+        except OSError:
+            return [CAP_GENERAL]
         
-        return capabilities or ['general']
+        return list(_help_capabilities(real_path, executable.name, st.st_size, st.st_mtime_ns))
     
     def _detect_npm_capabilities(self, package_name: str) -> List[str]:
         """Detect capabilities of NPM package"""
         # Simple heuristic based on package name
-        capabilities = []
-        name_lower = package_name.lower()
-        
-        if 'file' in name_lower or 'fs' in name_lower:
-            capabilities.append('file_operations')
-        if 'git' in name_lower:
-            capabilities.append('git_operations')
-        if 'db' in name_lower or 'database' in name_lower:
-            capabilities.append('database_operations')
-        if 'web' in name_lower or 'http' in name_lower:
-            capabilities.append('web_operations')
-        
-        return capabilities or ['general']
+        return list(_npm_name_capabilities(package_name))
     
     def _detect_pip_capabilities(self, package_name: str) -> List[str]:
         """Detect capabilities of pip package"""
         # Simple heuristic based on package name
-        capabilities = []
-        name_lower = package_name.lower()
-        
-        if 'file' in name_lower or 'os' in name_lower:
-            capabilities.append('file_operations')
-        if 'git' in name_lower:
-            capabilities.append('git_operations')
-        if 'sql' in name_lower or 'database' in name_lower:
-            capabilities.append('database_operations')
-        if 'web' in name_lower or 'http' in name_lower or 'requests' in name_lower:
-            capabilities.append('web_operations')
-        
-        return capabilities or ['general']
+        return list(_pip_name_capabilities(package_name))
     
     def _analyze_file_capabilities(self, file_path: Path) -> List[str]:
         """Analyze file to detect capabilities"""
-        capabilities = []
-        
+        # Reuse the result while the file's mtime and size are unchanged, across runs too
+        key = str(file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read().lower()
-            
-            if 'file' in content or 'filesystem' in content:
-                capabilities.append('file_operations')
-            if 'git' in content:
-                capabilities.append('git_operations')
-            if 'database' in content or 'sql' in content:
-                capabilities.append('database_operations')
-            if 'http' in content or 'web' in content:
-                capabilities.append('web_operations')
-                
-        except:
-            pass
+            st = os.stat(file_path)
+        except OSError:
+            return [CAP_GENERAL]
         
-        return capabilities or ['general']
+        entry = self._file_capabilities_used.get(key) or self._file_capabilities_cached.get(key)
+        if not (isinstance(entry, list) and len(entry) == 3 and entry[:2] == [st.st_mtime_ns, st.st_size]):
+            try:
+                with open(file_path, 'rb') as f:
+                    capabilities = _match_capabilities_stream(FILE_CONTENT_CAPABILITIES, f)
+            except OSError:
+                return [CAP_GENERAL]
+            entry = [st.st_mtime_ns, st.st_size, capabilities]
+        
+        self._file_capabilities_used[key] = entry
+        return list(entry[2])
     
     def _build_file_command(self, file_path: Path) -> List[str]:
         """Build command to execute a file"""
-        if file_path.suffix == '.py':
-            return ['python3', str(file_path)]
-        elif file_path.suffix in ['.js', '.ts']:
-            return ['node', str(file_path)]
-        elif file_path.suffix == '.sh':
-            return ['bash', str(file_path)]
-        else:
-            return [str(file_path)]
+        path = str(file_path)
+        return [*_SUFFIX_RUNNER.get(file_path.suffix, ()), path]
     
     def _generate_usage_examples(self, tool: MCPTool) -> List[str]:
         """Generate usage examples for a tool"""
-        examples = []
-        
-        for capability in tool.capabilities:
-            if capability == 'file_operations':
-                examples.append(f"Use {tool.name} to read, write, or manipulate files")
-            elif capability == 'git_operations':
-                examples.append(f"Use {tool.name} for git operations like commit, push, branch")
-            elif capability == 'database_operations':
-                examples.append(f"Use {tool.name} for database queries and operations")
-            elif capability == 'web_operations':
-                examples.append(f"Use {tool.name} for web requests and API calls")
-            else:
-                examples.append(f"Use {tool.name} for {capability}")
-        
-        return examples
-    
-    def _categorize_tools_by_capabilities(self, tools: Dict[str, MCPTool]) -> Dict[str, List[str]]:
-        """Categorize tools by their capabilities"""
-        categories = {}
+        name = tool.name
+        return [_EXAMPLE_TEMPLATES.get(capability, _DEFAULT_EXAMPLE_TEMPLATE).format(name=name, capability=capability)
+                for capability in tool.capabilities]
+    
+    def _categorize_tools_by_capabilities(self, tools: Dict[str, MCPTool]) -> Dict[str, Tuple[str, ...]]:
+        """Categorize tools by their capabilities, as tool id tuples that callers can share"""
+        categories = defaultdict(list)
         
         for tool_id, tool in tools.items():
             for capability in tool.capabilities:
-                if capability not in categories:
-                    categories[capability] = []
                 categories[capability].append(tool_id)
         
-        return categories
+        return {capability: tuple(tool_ids) for capability, tool_ids in categories.items()}
 
 def main():
     """CLI interface for enhanced MCP orchestrator"""
@@ -786,6 +1310,7 @@ def main():
     parser = argparse.ArgumentParser(description="Enhanced Agent OS MCP Orchestrator")
     parser.add_argument("--project-root", default=".", help="Project root directory")
     parser.add_argument("--auto-discover", action="store_true", help="Auto-discover and integrate MCP tools")
+    parser.add_argument("--full-scan", action="store_true", help="Rescan every source, ignoring the last scan's manifest")
     parser.add_argument("--list-tools", action="store_true", help="List discovered tools")
     parser.add_argument("--report", action="store_true", help="Generate integration report")
     
@@ -794,7 +1319,7 @@ def main():
     orchestrator = EnhancedMCPOrchestrator(args.project_root)
     
     if args.auto_discover:
-        result = orchestrator.auto_discover_and_integrate()
+        result = orchestrator.auto_discover_and_integrate(full_scan=args.full_scan)
         print(f"✅ Discovered and integrated {result['total_discovered']} MCP tools")
         
         if result['report']:
@@ -802,39 +1327,33 @@ def main():
             print(f"   By Source: {result['report']['by_source']}")
             print(f"   By Status: {result['report']['by_status']}")
     
+    # Both listing and report read the saved tools; load them once
+    tools_data = orchestrator._load_tools_file() if args.list_tools or args.report else None
+    
     if args.list_tools:
-        tools_file = orchestrator.mcp_dir / "tools" / "discovered-tools.json"
-        if tools_file.exists():
-            with open(tools_file, 'r') as f:
-                tools = json.load(f)
-            
-            print(f"\n🛠️  Discovered MCP Tools ({len(tools)} total):")
-            for tool_id, tool_data in tools.items():
-                print(f"   • {tool_data['name']} ({tool_data['source']}) - {tool_data['status']}")
+        if tools_data is not None:
+            # One write for the whole listing rather than a print per tool
+            lines = [f"\n🛠️  Discovered MCP Tools ({len(tools_data)} total):"]
+            lines.extend(f"   • {tool_data['name']} ({tool_data['source']}) - {tool_data['status']}"
+                         for tool_data in tools_data.values())
+            sys.stdout.write('\n'.join(lines) + '\n')
         else:
             print("No tools discovered yet. Run --auto-discover first.")
     
     if args.report:
-        tools_file = orchestrator.mcp_dir / "tools" / "discovered-tools.json"
-        if tools_file.exists():
-            with open(tools_file, 'r') as f:
-                tools_data = json.load(f)
-            
-            # Generate summary report
-            by_source = {}
-            by_status = {}
+        if tools_data is not None:
+            # Generate summary report; sources and statuses counted in one pass
+            by_source = Counter()
+            by_status = Counter()
             
             for tool_data in tools_data.values():
-                source = tool_data['source']
-                status = tool_data['status']
-                
-                by_source[source] = by_source.get(source, 0) + 1
-                by_status[status] = by_status.get(status, 0) + 1
+                by_source[tool_data['source']] += 1
+                by_status[tool_data['status']] += 1
             
             print(f"\n📊 MCP Tools Integration Report:")
             print(f"   Total Tools: {len(tools_data)}")
-            print(f"   By Source: {by_source}")
-            print(f"   By Status: {by_status}")
+            print(f"   By Source: {dict(by_source)}")
+            print(f"   By Status: {dict(by_status)}")
         else:
             print("No integration report available. Run --auto-discover first.")
 
@@ -5,15 +5,136 @@ Discovers, manages, and orchestrates MCP tools for enhanced development workflow
 """
 
 import os
+import re
 import json
+import time
+import heapq
+import hashlib
 import yaml
 import asyncio
 import logging
+import threading
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, asdict, is_dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+# Substrings marking a file as MCP-related, matched against lowercased bytes
+MCP_INDICATORS = (
+    b'mcp', b'model context protocol', b'claude-mcp',
+    b'mcp-server', b'mcp-client', b'anthropic'
+)
+
+# Common MCP capability patterns found in tool sources
+CONTENT_CAPABILITY_PATTERNS = {
+    'file_operations': ['read_file', 'write_file', 'list_files'],
+    'web_scraping': ['requests', 'beautifulsoup', 'selenium'],
+    'database': ['sqlite', 'postgresql', 'mysql', 'mongodb'],
+    'api_integration': ['rest', 'graphql', 'webhook'],
+    'code_analysis': ['ast', 'parser', 'linter'],
+    'git_operations': ['git', 'github', 'gitlab'],
+    'terminal': ['subprocess', 'shell', 'command'],
+    'image_processing': ['pillow', 'opencv', 'imageio'],
+    'data_processing': ['pandas', 'numpy', 'csv']
+}
+
+# Every indicator and capability pattern, mapped to its capability (None for an indicator)
+_TOOL_FILE_KEYWORDS: Dict[bytes, Optional[str]] = dict.fromkeys(MCP_INDICATORS)
+_TOOL_FILE_KEYWORDS.update(
+    (pattern.encode(), capability)
+    for capability, patterns in CONTENT_CAPABILITY_PATTERNS.items()
+    for pattern in patterns
+)
+
+# One alternation for all keywords; the lookahead tries it at every position so keywords
+# inside longer ones ("mcp" in "claude-mcp") are still seen. Keywords that are prefixes
+# of one another map to the same capability, so longest-first order loses nothing.
+_TOOL_FILE_KEYWORD_RE = re.compile(b'(?=(' + b'|'.join(
+    re.escape(keyword) for keyword in sorted(_TOOL_FILE_KEYWORDS, key=len, reverse=True)) + b'))')
+
+# Suffixes of files that may be MCP tools
+TOOL_FILE_SUFFIXES = ('.py', '.js', '.ts', '.sh')
+
+# Files marking a directory as an MCP tool, in order of precedence
+TOOL_CONFIG_FILES = ("package.json", "setup.py", "pyproject.toml", "mcp-config.json", "claude-mcp.json")
+
+# Directories that never hold a tool of their own
+SKIPPED_DIR_NAMES = frozenset(('.git', 'node_modules', '__pycache__'))
+
+# Bytes read at a time when scanning candidate tool files
+SCAN_CHUNK_SIZE = 64 * 1024
+
+# Trailing bytes carried into the next chunk so matches spanning a boundary are found
+_SCAN_OVERLAP = max(map(len, _TOOL_FILE_KEYWORDS)) - 1
+
+# "${step.field}" references from a step's params to an earlier step's results
+_STEP_REFERENCE_RE = re.compile(r'\$\{(\w+)\.(\w+)\}')
+
+# Uncached candidate bytes in one directory above which files are scanned in worker
+# processes; below it, starting the pool costs more than the scan
+PROCESS_SCAN_MIN_BYTES = 4 * 1024 * 1024
+SCAN_WORKERS = os.cpu_count() or 1
+
+# Files under cache/ holding action results (and their temp files while written)
+_ACTION_CACHE_FILE_RE = re.compile(r'[0-9a-f]{32}(\.json|\.\d+\.\d+\.tmp)')
+
+# Bump when tool analysis changes so cached discovery results are discarded
+DISCOVERY_CACHE_VERSION = 1
+
+def _json_default(obj: Any) -> Any:
+    """Serialize dataclasses by their fields (no deep copy) and anything else as a string"""
+    return vars(obj) if is_dataclass(obj) else str(obj)
+
+def _write_json(path: Path, data: Any):
+    """Write data (dataclasses included) as indented JSON, using orjson when available"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=_json_default)
+
+def _read_json(path: Path) -> Any:
+    """Read a JSON file, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# libyaml's C loader and dumper when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Suffixes of the private tool and workflow files, by mcp_integration.disk_format
+DISK_SUFFIXES = {'json': '.json', 'yaml': '.yml'}
+
+def _write_data(path: Path, data: Any):
+    """Write data as YAML or JSON, chosen by the file suffix"""
+    if path.suffix != '.yml':
+        _write_json(path, data)
+        return
+    
+    if isinstance(data, list):
+        data = [asdict(item) if is_dataclass(item) else item for item in data]
+    elif is_dataclass(data):
+        data = asdict(data)
+    with open(path, 'w') as f:
+        yaml.dump(data, f, Dumper=_YAML_DUMPER, sort_keys=False)
+
+def _read_data(path: Path) -> Any:
+    """Read a YAML or JSON file, chosen by the file suffix"""
+    if path.suffix != '.yml':
+        return _read_json(path)
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
 
 @dataclass
 class MCPTool:
@@ -39,6 +160,126 @@ class MCPWorkflow:
     success_rate: float = 0.0
     avg_execution_time: float = 0.0
 
+def _step_references(value: Any) -> Set[str]:
+    """Names of the steps referenced anywhere in a step's (possibly nested) params"""
+    if isinstance(value, str):
+        return {name for name, _ in _STEP_REFERENCE_RE.findall(value)}
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return set()
+    
+    references = set()
+    for item in value:
+        references |= _step_references(item)
+    return references
+
+def _scan_tool_file(file_path: str) -> Optional[List[str]]:
+    """Capabilities of an MCP tool file, or None if it shows no MCP indicator
+    
+    The file is read in chunks and lowercased as bytes, so memory stays bounded by
+    the chunk size; reading stops once every indicator and capability question is settled.
+    """
+    is_mcp = False
+    found = set()
+    tail = b''
+    
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(SCAN_CHUNK_SIZE)
+            if not chunk:
+                break
+            
+            text = tail + chunk.lower()
+            for match in _TOOL_FILE_KEYWORD_RE.finditer(text):
+                capability = _TOOL_FILE_KEYWORDS[match.group(1)]
+                if capability is None:
+                    is_mcp = True
+                else:
+                    found.add(capability)
+            
+            if is_mcp and len(found) == len(CONTENT_CAPABILITY_PATTERNS):
+                break
+            tail = text[-_SCAN_OVERLAP:]
+    
+    if not is_mcp:
+        return None
+    return [capability for capability in CONTENT_CAPABILITY_PATTERNS if capability in found]
+
+def _try_scan_tool_file(file_path: str) -> Tuple[Optional[List[str]], Optional[str]]:
+    """(capabilities, None) for a scanned file, or (None, error) if it could not be read"""
+    try:
+        return _scan_tool_file(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+@lru_cache(maxsize=1024)
+def _template_parts(template: str) -> Tuple[Any, ...]:
+    """A param template split into literal strings and (step, field) references"""
+    parts = []
+    position = 0
+    for match in _STEP_REFERENCE_RE.finditer(template):
+        if match.start() > position:
+            parts.append(template[position:match.start()])
+        parts.append((match.group(1), match.group(2)))
+        position = match.end()
+    if position < len(template):
+        parts.append(template[position:])
+    return tuple(parts)
+
+def _expand_params(value: Any, step_results: Dict[str, Dict[str, Any]]) -> Any:
+    """Params with "${step.field}" references replaced by earlier step results
+    
+    A string that is exactly one reference takes the field's value as is (a list of
+    files stays a list); otherwise fields are interpolated as text. References to
+    steps or fields without a result are left in place.
+    """
+    if isinstance(value, dict):
+        return {key: _expand_params(item, step_results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand_params(item, step_results) for item in value]
+    if not isinstance(value, str) or '${' not in value:
+        return value
+    
+    expanded = []
+    for part in _template_parts(value):
+        if isinstance(part, tuple):
+            step_name, field = part
+            result = step_results.get(step_name)
+            if result is not None and field in result:
+                expanded.append(result[field])
+            else:
+                expanded.append(f"${{{step_name}.{field}}}")
+        else:
+            expanded.append(part)
+    
+    if len(expanded) == 1:
+        return expanded[0]
+    return ''.join(map(str, expanded))
+
+def _workflow_layers(step_names: List[str], steps: List[Dict[str, Any]]) -> List[List[int]]:
+    """Group step indexes into layers whose steps depend only on earlier layers
+    
+    Layers are built with Kahn's algorithm and keep workflow order within a layer.
+    A dependency cycle is broken by running its first remaining step on its own,
+    as the steps ran before they could be parallelized.
+    """
+    indexes = {name: i for i, name in enumerate(step_names)}
+    dependencies = [
+        {indexes[name] for name in _step_references(step.get('params', {})) if name in indexes} - {i}
+        for i, step in enumerate(steps)
+    ]
+    
+    layers = []
+    done = set()
+    remaining = list(range(len(steps)))
+    while remaining:
+        layer = [i for i in remaining if dependencies[i] <= done] or remaining[:1]
+        layers.append(layer)
+        done.update(layer)
+        remaining = [i for i in remaining if i not in done]
+    return layers
+
 class MCPOrchestrator:
     """Orchestrates MCP tools for Agent OS"""
     
@@ -52,6 +293,7 @@ class MCPOrchestrator:
         (self.mcp_dir / "tools").mkdir(exist_ok=True)
         (self.mcp_dir / "workflows").mkdir(exist_ok=True)
         (self.mcp_dir / "configs").mkdir(exist_ok=True)
+        (self.mcp_dir / "cache").mkdir(exist_ok=True)
         
         # Setup logging
         self._setup_logging()
@@ -63,6 +305,35 @@ class MCPOrchestrator:
         # Load configuration
         self.config = self._load_config()
         
+        # Tools and workflows are written in one format; files in the other are still read
+        self._disk_suffix = DISK_SUFFIXES.get(self.config.get('disk_format', 'json'), '.json')
+        
+        # Analysis results as path -> [mtime_ns, size, tool dict or None]: those from the
+        # last discovery, and those looked up in this one (persisted after discovery)
+        self._discovery_cache_file = self.mcp_dir / "tools" / "discovery-cache.json"
+        self._discovery_cache = self._load_discovery_cache()
+        self._discovery_cache_used: Dict[str, List[Any]] = {}
+        
+        # Results of steps marked "cache": true as key -> (time stored, result), least
+        # recently used first; also kept under cache/ for later runs
+        self._action_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._action_cache_ttl = self.config.get('action_cache_ttl', 300)
+        self._action_cache_size = self.config.get('action_cache_size', 256)
+        self._action_cache_lock = threading.Lock()
+        self._prune_action_cache_files()
+        
+        # Worker processes for CPU-bound content scans, started on first need per discovery
+        self._scan_pool: Optional[ProcessPoolExecutor] = None
+        self._scan_pool_lock = threading.Lock()
+        
+        # Caps the files and directory listings discovery holds open at once across its
+        # scanning threads; each holder opens one at a time, so slots never nest
+        self._fd_sem = threading.BoundedSemaphore(self._max_open_files())
+        
+        # Lowercased tool fields for recommendations, rebuilt when the tool set changes
+        self._recommend_index: Optional[Dict[str, Any]] = None
+        self._recommend_index_key: Tuple[int, ...] = ()
+        
         # Initialize
         self._load_tools()
         self._load_workflows()
@@ -82,6 +353,19 @@ class MCPOrchestrator:
         )
         self.logger = logging.getLogger("MCPOrchestrator")
     
+    def _max_open_files(self) -> int:
+        """The configured max_open_files; at least 1, since discovery would wait forever on 0"""
+        value = self.config.get('max_open_files', 128)
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            self.logger.warning("Invalid max_open_files %r, using 128", value)
+            return 128
+        if limit < 1:
+            self.logger.warning("max_open_files must be at least 1, not %s; using 1", limit)
+            return 1
+        return limit
+    
     def _load_config(self) -> Dict:
         """Load MCP configuration"""
         config_path = self.agent_os_dir / "config" / "enhanced-config.yml"
@@ -92,11 +376,49 @@ class MCPOrchestrator:
         return {}
     
     def discover_mcp_tools(self) -> List[MCPTool]:
-        """Discover available MCP tools in the system"""
+        """Discover available MCP tools in the system
+        
+        Locations are scanned concurrently on a thread pool of this call's own, without
+        an event loop, so it also works from code with a loop running (where it blocks
+        that loop until done; async callers can await discover_mcp_tools_async instead).
+        """
+        self.logger.info("Discovering MCP tools...")
+        
+        search_paths = self._discovery_search_paths()
+        config_paths = self._claude_desktop_config_paths()
+        try:
+            with ThreadPoolExecutor() as executor:
+                scans = [executor.submit(self._scan_search_path, search_path) for search_path in search_paths]
+                configs = list(executor.map(self._read_claude_desktop_config, config_paths))
+                discovered_tools = [tool for scan in scans for tool in scan.result()]
+        finally:
+            self._shutdown_scan_pool()
+        discovered_tools.extend(self._claude_desktop_tools(config_paths, configs))
+        
+        return self._finish_discovery(discovered_tools)
+    
+    async def discover_mcp_tools_async(self) -> List[MCPTool]:
+        """Discover available MCP tools, scanning all locations concurrently"""
         self.logger.info("Discovering MCP tools...")
         
         discovered_tools = []
         
+        # Each location is scanned on the default executor, taking max_open_files slots
+        # for what it opens; results are gathered in search order
+        loop = asyncio.get_running_loop()
+        scans = [loop.run_in_executor(None, self._scan_search_path, search_path)
+                 for search_path in self._discovery_search_paths()]
+        scans.append(self._check_claude_desktop_config())
+        try:
+            for tools in await asyncio.gather(*scans):
+                discovered_tools.extend(tools)
+        finally:
+            self._shutdown_scan_pool()
+        
+        return self._finish_discovery(discovered_tools)
+    
+    def _discovery_search_paths(self) -> List[Path]:
+        """Directories searched for MCP tools"""
         # Common MCP tool locations
         search_paths = [
             Path.home() / ".mcp" / "tools",
@@ -112,84 +434,203 @@ class MCPOrchestrator:
         # Add custom search paths from config
         custom_paths = self.config.get('tool_search_paths', [])
         search_paths.extend([Path(p) for p in custom_paths])
-        
-        for search_path in search_paths:
-            if search_path.exists():
-                discovered_tools.extend(self._scan_directory_for_tools(search_path))
-        
-        # Check Claude Desktop configuration
-        claude_config = self._check_claude_desktop_config()
-        if claude_config:
-            discovered_tools.extend(claude_config)
-        
-        # Save discovered tools
+        return search_paths
+    
+    def _scan_search_path(self, search_path: Path) -> List[MCPTool]:
+        """Tools in a search location, if it exists"""
+        # The existence check runs on a worker too; stale network mounts can block on it
+        if search_path.exists():
+            return self._scan_directory_for_tools(search_path)
+        return []
+    
+    def _finish_discovery(self, discovered_tools: List[MCPTool]) -> List[MCPTool]:
+        """Save the discovered tools and the analysis cache"""
         self._save_discovered_tools(discovered_tools)
+        self._save_discovery_cache()
         
-        self.logger.info(f"Discovered {len(discovered_tools)} MCP tools")
+        self.logger.info("Discovered %s MCP tools", len(discovered_tools))
         return discovered_tools
     
     def _scan_directory_for_tools(self, directory: Path) -> List[MCPTool]:
         """Scan a directory for MCP tools"""
         tools = []
         
+        # Files without a cached analysis are scanned together once the listing is done;
+        # their slots keep tools in listing order
+        pending: List[Tuple[int, Path, os.stat_result]] = []
+        # Subdirectories are analyzed once the listing is closed, so it holds one slot only
+        subdirs: List[Tuple[int, Path]] = []
+        
         try:
-            for item in directory.iterdir():
-                if item.is_file() and item.suffix in ['.py', '.js', '.ts', '.sh']:
-                    tool = self._analyze_potential_tool(item)
-                    if tool:
-                        tools.append(tool)
-                elif item.is_dir():
-                    # Check for package.json, setup.py, etc.
-                    tool = self._analyze_tool_directory(item)
-                    if tool:
-                        tools.append(tool)
+            # scandir answers the type checks from the directory listing itself
+            with self._fd_sem, os.scandir(directory) as entries:
+                for entry in entries:
+                    # Names are tested first; most entries are settled without a type check
+                    name = entry.name
+                    if name.endswith(TOOL_FILE_SUFFIXES) and entry.is_file():
+                        file_path = Path(entry.path)
+                        try:
+                            st = entry.stat()
+                        except OSError as e:
+                            self._log_analysis_error(file_path, e)
+                            continue
+                        cached = self._cached_discovery(entry.path, st)
+                        if cached is not None:
+                            tools.append(MCPTool(**cached[2]) if cached[2] else None)
+                        else:
+                            pending.append((len(tools), file_path, st))
+                            tools.append(None)
+                    elif name not in SKIPPED_DIR_NAMES and entry.is_dir():
+                        subdirs.append((len(tools), Path(entry.path)))
+                        tools.append(None)
         except PermissionError:
-            self.logger.warning(f"Permission denied accessing {directory}")
+            self.logger.warning("Permission denied accessing %s", directory)
         except Exception as e:
-            self.logger.error(f"Error scanning {directory}: {e}")
+            self.logger.error("Error scanning %s: %s", directory, e)
         
-        return tools
+        for slot, dir_path in subdirs:
+            # Check for package.json, setup.py, etc.
+            tools[slot] = self._analyze_tool_directory(dir_path)
+        
+        scans = self._scan_tool_files([file_path for _, file_path, _ in pending],
+                                      sum(st.st_size for _, _, st in pending))
+        for (slot, file_path, st), (capabilities, error) in zip(pending, scans):
+            if error is not None:
+                self._log_analysis_error(file_path, error)
+            else:
+                tools[slot] = self._tool_from_scan(file_path, st, capabilities)
+        
+        return [tool for tool in tools if tool]
+    
+    def _scan_tool_files(self, file_paths: List[Path], total_size: int) -> List[Tuple[Optional[List[str]], Optional[str]]]:
+        """Scan files for MCP indicators and capabilities, in worker processes when there is enough to scan"""
+        paths = [str(file_path) for file_path in file_paths]
+        if len(paths) > 1 and total_size >= PROCESS_SCAN_MIN_BYTES:
+            try:
+                pool = self._get_scan_pool()
+                # Paths, not contents, are sent to the workers, in batches per round trip
+                chunksize = max(1, len(paths) // (SCAN_WORKERS * 4))
+                return list(pool.map(_try_scan_tool_file, paths, chunksize=chunksize))
+            except Exception as e:
+                self.logger.debug("Scanning in worker processes failed, scanning inline: %s", e)
+        
+        # Workers open one file at a time each; inline scans take a slot per file
+        results = []
+        for path in paths:
+            with self._fd_sem:
+                results.append(_try_scan_tool_file(path))
+        return results
+    
+    def _get_scan_pool(self) -> ProcessPoolExecutor:
+        """The discovery's worker process pool, started on first use"""
+        with self._scan_pool_lock:
+            if self._scan_pool is None:
+                self._scan_pool = ProcessPoolExecutor(max_workers=SCAN_WORKERS)
+            return self._scan_pool
+    
+    def _shutdown_scan_pool(self):
+        """Stop the worker processes once discovery is over"""
+        with self._scan_pool_lock:
+            if self._scan_pool is not None:
+                self._scan_pool.shutdown()
+                self._scan_pool = None
+    
+    def _log_analysis_error(self, file_path: Path, error: Any):
+        """Log a candidate file that could not be analyzed"""
+        # Runs per candidate file; skip even the call when debug output is off
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Error analyzing %s: %s", file_path, error)
     
     def _analyze_potential_tool(self, file_path: Path) -> Optional[MCPTool]:
         """Analyze a file to determine if it's an MCP tool"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            st = os.stat(file_path)
+            entry = self._cached_discovery(str(file_path), st)
+            if entry is not None:
+                return MCPTool(**entry[2]) if entry[2] else None
             
-            # Look for MCP-related keywords
-            mcp_indicators = [
-                'mcp', 'model context protocol', 'claude-mcp',
-                'mcp-server', 'mcp-client', 'anthropic'
-            ]
-            
-            content_lower = content.lower()
-            if any(indicator in content_lower for indicator in mcp_indicators):
-                return MCPTool(
-                    name=file_path.stem,
-                    description=f"MCP tool: {file_path.name}",
-                    version="unknown",
-                    capabilities=self._extract_capabilities_from_content(content),
-                    config_path="",
-                    executable_path=str(file_path),
-                    status="available"
-                )
+            with self._fd_sem:
+                capabilities = _scan_tool_file(str(file_path))
+            return self._tool_from_scan(file_path, st, capabilities)
         except Exception as e:
-            self.logger.debug(f"Error analyzing {file_path}: {e}")
+            self._log_analysis_error(file_path, e)
         
         return None
     
+    def _tool_from_scan(self, file_path: Path, st: os.stat_result, capabilities: Optional[List[str]]) -> Optional[MCPTool]:
+        """The tool for a scanned file (None if it is not one), remembered for later discoveries"""
+        tool = None
+        if capabilities is not None:
+            tool = MCPTool(
+                name=file_path.stem,
+                description=f"MCP tool: {file_path.name}",
+                version="unknown",
+                capabilities=capabilities,
+                config_path="",
+                executable_path=str(file_path),
+                status="available"
+            )
+        self._remember_discovery(str(file_path), st, tool)
+        return tool
+    
+    def _cached_discovery(self, key: str, st: os.stat_result) -> Optional[List[Any]]:
+        """The cached analysis of a path, if its mtime and size are unchanged"""
+        entry = self._discovery_cache_used.get(key) or self._discovery_cache.get(key)
+        if isinstance(entry, list) and len(entry) == 3 and entry[:2] == [st.st_mtime_ns, st.st_size]:
+            self._discovery_cache_used[key] = entry
+            return entry
+        return None
+    
+    def _remember_discovery(self, key: str, st: os.stat_result, tool: Optional[MCPTool]):
+        """Record the analysis of a path for later discoveries"""
+        self._discovery_cache_used[key] = [st.st_mtime_ns, st.st_size, asdict(tool) if tool else None]
+    
+    def _load_discovery_cache(self) -> Dict[str, List[Any]]:
+        """Load analysis results from the last discovery, keyed by path"""
+        try:
+            with open(self._discovery_cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        if isinstance(cache, dict) and cache.get("v") == DISCOVERY_CACHE_VERSION and isinstance(cache.get("data"), dict):
+            return cache["data"]
+        return {}
+    
+    def _save_discovery_cache(self):
+        """Persist the analysis results used in this discovery; paths not seen again drop out"""
+        if self._discovery_cache_used == self._discovery_cache:
+            return
+        
+        tmp_file = self._discovery_cache_file.with_suffix(".json.tmp")
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({"v": DISCOVERY_CACHE_VERSION, "data": self._discovery_cache_used}, f, default=str)
+            os.replace(tmp_file, self._discovery_cache_file)
+            self._discovery_cache = self._discovery_cache_used
+            self._discovery_cache_used = {}
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.debug("Could not save discovery cache: %s", e)
+    
     def _analyze_tool_directory(self, dir_path: Path) -> Optional[MCPTool]:
         """Analyze a directory to determine if it contains an MCP tool"""
-        # Check for common MCP tool files
-        mcp_files = [
-            "package.json", "setup.py", "pyproject.toml",
-            "mcp-config.json", "claude-mcp.json"
-        ]
+        # One listing answers for all the common MCP tool files instead of a stat each;
+        # it stops early at package.json, which takes precedence anyway
+        found = set()
+        try:
+            with self._fd_sem, os.scandir(dir_path) as entries:
+                for entry in entries:
+                    # Broken links are skipped, as an existence check would
+                    if entry.name in TOOL_CONFIG_FILES and (entry.is_file() or entry.is_dir()):
+                        found.add(entry.name)
+                        if entry.name == TOOL_CONFIG_FILES[0]:
+                            break
+        except OSError:
+            return None
         
-        for mcp_file in mcp_files:
-            config_file = dir_path / mcp_file
-            if config_file.exists():
-                return self._parse_tool_config(config_file, dir_path)
+        for mcp_file in TOOL_CONFIG_FILES:
+            if mcp_file in found:
+                return self._parse_tool_config(dir_path / mcp_file, dir_path)
         
         return None
     
@@ -197,15 +638,21 @@ class MCPOrchestrator:
         """Parse tool configuration file"""
         try:
             if config_file.name == "package.json":
-                with open(config_file, 'r') as f:
-                    data = json.load(f)
+                st = os.stat(config_file)
+                entry = self._cached_discovery(str(config_file), st)
+                if entry is not None:
+                    return MCPTool(**entry[2]) if entry[2] else None
+                
+                with self._fd_sem:
+                    data = _read_json(config_file)
                 
                 # Check if it's an MCP tool
                 keywords = data.get('keywords', [])
                 description = data.get('description', '')
                 
+                tool = None
                 if any('mcp' in str(k).lower() for k in keywords) or 'mcp' in description.lower():
-                    return MCPTool(
+                    tool = MCPTool(
                         name=data.get('name', tool_dir.name),
                         description=description,
                         version=data.get('version', 'unknown'),
@@ -214,6 +661,8 @@ class MCPOrchestrator:
                         executable_path=str(tool_dir / data.get('main', 'index.js')),
                         status="available"
                     )
+                self._remember_discovery(str(config_file), st, tool)
+                return tool
             
             elif config_file.name in ["setup.py", "pyproject.toml"]:
                 # Python MCP tools
@@ -228,27 +677,36 @@ class MCPOrchestrator:
                 )
         
         except Exception as e:
-            self.logger.error(f"Error parsing {config_file}: {e}")
+            self.logger.error("Error parsing %s: %s", config_file, e)
         
         return None
     
-    def _check_claude_desktop_config(self) -> List[MCPTool]:
+    async def _check_claude_desktop_config(self) -> List[MCPTool]:
         """Check Claude Desktop configuration for MCP tools"""
-        tools = []
+        config_paths = self._claude_desktop_config_paths()
         
-        # Common Claude Desktop config locations
-        config_paths = [
+        # All candidates are read at once, so a slow home directory stalls the probe only once
+        loop = asyncio.get_running_loop()
+        configs = await asyncio.gather(*(
+            loop.run_in_executor(None, self._read_claude_desktop_config, config_path)
+            for config_path in config_paths
+        ))
+        return self._claude_desktop_tools(config_paths, configs)
+    
+    def _claude_desktop_config_paths(self) -> List[Path]:
+        """Common Claude Desktop config locations"""
+        return [
             Path.home() / ".config" / "claude-desktop" / "claude_desktop_config.json",
             Path.home() / "Library" / "Application Support" / "Claude" / "claude_desktop_config.json",
             Path.home() / "AppData" / "Roaming" / "Claude" / "claude_desktop_config.json"
         ]
-        
-        for config_path in config_paths:
-            if config_path.exists():
+    
+    def _claude_desktop_tools(self, config_paths: List[Path], configs: List[Optional[Dict[str, Any]]]) -> List[MCPTool]:
+        """Tools for the MCP servers in the Claude Desktop configs read from config_paths"""
+        tools = []
+        for config_path, config in zip(config_paths, configs):
+            if config is not None:
                 try:
-                    with open(config_path, 'r') as f:
-                        config = json.load(f)
-                    
                     mcp_servers = config.get('mcpServers', {})
                     for server_name, server_config in mcp_servers.items():
                         tool = MCPTool(
@@ -263,33 +721,20 @@ class MCPOrchestrator:
                         tools.append(tool)
                         
                 except Exception as e:
-                    self.logger.error(f"Error reading Claude Desktop config {config_path}: {e}")
+                    self.logger.error("Error reading Claude Desktop config %s: %s", config_path, e)
         
         return tools
     
-    def _extract_capabilities_from_content(self, content: str) -> List[str]:
-        """Extract capabilities from file content"""
-        capabilities = []
-        
-        # Common MCP capability patterns
-        capability_patterns = {
-            'file_operations': ['read_file', 'write_file', 'list_files'],
-            'web_scraping': ['requests', 'beautifulsoup', 'selenium'],
-            'database': ['sqlite', 'postgresql', 'mysql', 'mongodb'],
-            'api_integration': ['rest', 'graphql', 'webhook'],
-            'code_analysis': ['ast', 'parser', 'linter'],
-            'git_operations': ['git', 'github', 'gitlab'],
-            'terminal': ['subprocess', 'shell', 'command'],
-            'image_processing': ['pillow', 'opencv', 'imageio'],
-            'data_processing': ['pandas', 'numpy', 'csv']
-        }
-        
-        content_lower = content.lower()
-        for capability, patterns in capability_patterns.items():
-            if any(pattern in content_lower for pattern in patterns):
-                capabilities.append(capability)
-        
-        return capabilities
+    def _read_claude_desktop_config(self, config_path: Path) -> Optional[Dict[str, Any]]:
+        """A Claude Desktop config file's contents, or None if it is missing or unreadable"""
+        if not config_path.exists():
+            return None
+        try:
+            with self._fd_sem:
+                return _read_json(config_path)
+        except Exception as e:
+            self.logger.error("Error reading Claude Desktop config %s: %s", config_path, e)
+            return None
     
     def _extract_capabilities_from_package_json(self, data: Dict) -> List[str]:
         """Extract capabilities from package.json"""
@@ -324,12 +769,13 @@ class MCPOrchestrator:
         
         # Analyze command and arguments
         command = config.get('command', '')
-        args = config.get('args', [])
+        # Arguments are stringified once; the NUL separator keeps keywords from spanning two
+        args = '\0'.join(str(arg) for arg in config.get('args', []))
         
-        if 'filesystem' in command or any('file' in str(arg) for arg in args):
+        if 'filesystem' in command or 'file' in args:
             capabilities.append('file_operations')
         
-        if 'web' in command or any('http' in str(arg) for arg in args):
+        if 'web' in command or 'http' in args:
             capabilities.append('web_scraping')
         
         if 'git' in command:
@@ -342,52 +788,66 @@ class MCPOrchestrator:
     
     def _save_discovered_tools(self, tools: List[MCPTool]):
         """Save discovered tools to file"""
-        tools_file = self.mcp_dir / "tools" / "discovered-tools.json"
-        
-        tools_data = [asdict(tool) for tool in tools]
+        tools_file = self.mcp_dir / "tools" / f"discovered-tools{self._disk_suffix}"
         
-        with open(tools_file, 'w') as f:
-            json.dump(tools_data, f, indent=2, default=str)
+        # JSON tools are serialized directly; no asdict copy of each one
+        _write_data(tools_file, tools)
+        self._remove_other_formats(tools_file)
         
-        self.logger.info(f"Saved {len(tools)} discovered tools to {tools_file}")
+        self.logger.info("Saved %s discovered tools to %s", len(tools), tools_file)
     
     def _load_tools(self):
         """Load previously discovered tools"""
-        tools_file = self.mcp_dir / "tools" / "discovered-tools.json"
+        # Fall back to a file saved in the other format, before disk_format changed
+        suffixes = [self._disk_suffix] + [suffix for suffix in DISK_SUFFIXES.values() if suffix != self._disk_suffix]
+        candidates = [self.mcp_dir / "tools" / f"discovered-tools{suffix}" for suffix in suffixes]
+        tools_file = next((candidate for candidate in candidates if candidate.exists()), None)
         
-        if tools_file.exists():
+        if tools_file is not None:
             try:
-                with open(tools_file, 'r') as f:
-                    tools_data = json.load(f)
+                tools_data = _read_data(tools_file)
                 
                 for tool_data in tools_data:
-                    # Convert datetime strings back to datetime objects
-                    if tool_data.get('last_used'):
+                    # Convert datetime strings back to datetime objects; YAML already did
+                    if isinstance(tool_data.get('last_used'), str):
                         tool_data['last_used'] = datetime.fromisoformat(tool_data['last_used'])
                     
                     tool = MCPTool(**tool_data)
                     self.available_tools[tool.name] = tool
                     
             except Exception as e:
-                self.logger.error(f"Error loading tools: {e}")
+                self.logger.error("Error loading tools: %s", e)
+    
+    def _remove_other_formats(self, path: Path):
+        """Delete copies of a just-written file in the other disk formats, so they cannot go stale"""
+        for suffix in DISK_SUFFIXES.values():
+            if suffix != path.suffix:
+                path.with_suffix(suffix).unlink(missing_ok=True)
     
     def _load_workflows(self):
         """Load predefined workflows"""
         workflows_dir = self.mcp_dir / "workflows"
         
-        for workflow_file in workflows_dir.glob("*.json"):
+        for workflow_file in workflows_dir.iterdir():
+            # Workflows created in this process are already held; files are named after them
+            if workflow_file.suffix not in DISK_SUFFIXES.values() or workflow_file.stem in self.workflows:
+                continue
             try:
-                with open(workflow_file, 'r') as f:
-                    workflow_data = json.load(f)
+                workflow_data = _read_data(workflow_file)
                 
                 workflow = MCPWorkflow(**workflow_data)
                 self.workflows[workflow.name] = workflow
                 
             except Exception as e:
-                self.logger.error(f"Error loading workflow {workflow_file}: {e}")
+                self.logger.error("Error loading workflow %s: %s", workflow_file, e)
     
-    def create_workflow(self, name: str, description: str, tools: List[str], steps: List[Dict[str, Any]]) -> MCPWorkflow:
-        """Create a new MCP workflow"""
+    def create_workflow(self, name: str, description: str, tools: List[str], steps: List[Dict[str, Any]],
+                        overwrite: bool = True) -> MCPWorkflow:
+        """Create a new MCP workflow; without overwrite, an existing saved one is kept as is"""
+        workflow_file = self.mcp_dir / "workflows" / f"{name}{self._disk_suffix}"
+        if not overwrite and name in self.workflows and workflow_file.exists():
+            return self.workflows[name]
+        
         workflow = MCPWorkflow(
             name=name,
             description=description,
@@ -398,11 +858,10 @@ class MCPOrchestrator:
         self.workflows[name] = workflow
         
         # Save workflow
-        workflow_file = self.mcp_dir / "workflows" / f"{name}.json"
-        with open(workflow_file, 'w') as f:
-            json.dump(asdict(workflow), f, indent=2)
+        _write_data(workflow_file, workflow)
+        self._remove_other_formats(workflow_file)
         
-        self.logger.info(f"Created workflow: {name}")
+        self.logger.info("Created workflow: %s", name)
         return workflow
     
     async def execute_workflow(self, workflow_name: str, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -411,45 +870,76 @@ class MCPOrchestrator:
             raise ValueError(f"Workflow '{workflow_name}' not found")
         
         workflow = self.workflows[workflow_name]
-        self.logger.info(f"Executing workflow: {workflow_name}")
+        self.logger.info("Executing workflow: %s", workflow_name)
         
         start_time = datetime.now()
-        results = {}
+        step_results: Dict[int, Dict[str, Any]] = {}
+        step_names = [step.get('name', f'step_{i}') for i, step in enumerate(workflow.steps)]
+        named_results: Dict[str, Dict[str, Any]] = {}
         
-        try:
-            for i, step in enumerate(workflow.steps):
-                step_name = step.get('name', f'step_{i}')
-                tool_name = step.get('tool')
-                action = step.get('action')
-                params = step.get('params', {})
-                
-                self.logger.info(f"Executing step: {step_name} with tool: {tool_name}")
+        # Steps not referencing one another run together, up to max_concurrent_tools at once
+        semaphore = asyncio.Semaphore(self.config.get('max_concurrent_tools', 5))
+        
+        async def run_step(i: int) -> Dict[str, Any]:
+            step = workflow.steps[i]
+            tool_name = step.get('tool')
+            async with semaphore:
+                self.logger.info("Executing step: %s with tool: %s", step_names[i], tool_name)
                 
-                # Execute tool action
-                step_result = await self._execute_tool_action(tool_name, action, params, context)
-                results[step_name] = step_result
+                # Execute tool action with references to earlier steps filled in
+                params = _expand_params(step.get('params', {}), named_results)
+                return await self._execute_tool_action(tool_name, step.get('action'),
+                                                       params, context,
+                                                       use_cache=step.get('cache', False))
+        
+        try:
+            for layer in _workflow_layers(step_names, workflow.steps):
+                layer_results = await asyncio.gather(*(run_step(i) for i in layer))
                 
-                # Update context with step results
-                context.update(step_result)
+                # Update context with step results once the layer is done, in workflow order
+                for i, step_result in zip(layer, layer_results):
+                    step_results[i] = step_result
+                    named_results[step_names[i]] = step_result
+                    context.update(step_result)
+            
+            results = {step_names[i]: step_results[i] for i in range(len(step_names))}
             
             # Update workflow metrics
             execution_time = (datetime.now() - start_time).total_seconds()
             workflow.avg_execution_time = (workflow.avg_execution_time + execution_time) / 2
             workflow.success_rate = min(workflow.success_rate + 0.1, 1.0)
             
-            self.logger.info(f"Workflow '{workflow_name}' completed successfully")
+            self.logger.info("Workflow '%s' completed successfully", workflow_name)
             return results
             
         except Exception as e:
-            self.logger.error(f"Workflow '{workflow_name}' failed: {e}")
+            self.logger.error("Workflow '%s' failed: %s", workflow_name, e)
             workflow.success_rate = max(workflow.success_rate - 0.1, 0.0)
             raise
     
-    async def _execute_tool_action(self, tool_name: str, action: str, params: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a specific action with an MCP tool"""
+    async def _execute_tool_action(self, tool_name: str, action: str, params: Dict[str, Any], context: Dict[str, Any],
+                                   use_cache: bool = False) -> Dict[str, Any]:
+        """Execute a specific action with an MCP tool
+        
+        With use_cache (a step's "cache": true), results are reused for identical
+        (tool, action, params) calls for action_cache_ttl seconds, across runs too. It is
+        off by default, since actions that read state, such as a git status, go stale.
+        """
         if tool_name not in self.available_tools:
             raise ValueError(f"Tool '{tool_name}' not available")
         
+        loop = asyncio.get_running_loop()
+        use_cache = use_cache and self._action_cache_ttl > 0
+        if use_cache:
+            key = hashlib.blake2b(
+                json.dumps([tool_name, action, params], sort_keys=True, default=str).encode(),
+                digest_size=16
+            ).hexdigest()
+            cached = await loop.run_in_executor(None, self._cached_action_result, key)
+            if cached is not None:
+                self.logger.debug("Reusing cached result of %s action %s", tool_name, action)
+                return cached
+        
         tool = self.available_tools[tool_name]
         
         # Update tool usage
@@ -466,41 +956,169 @@ class MCPOrchestrator:
             'params': params
         }
         
+        if use_cache:
+            await loop.run_in_executor(None, self._store_action_result, key, result)
         return result
     
+    def _action_cache_file(self, key: str) -> Path:
+        """Where the result for an action key is kept between runs"""
+        return self.mcp_dir / "cache" / f"{key}.json"
+    
+    def _cached_action_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """A copy of the cached result for an action key, if younger than the TTL"""
+        with self._action_cache_lock:
+            entry = self._action_cache.get(key)
+            if entry is not None:
+                self._action_cache.move_to_end(key)
+        
+        cache_file = self._action_cache_file(key)
+        if entry is None:
+            try:
+                with open(cache_file, 'r') as f:
+                    stored = json.load(f)
+                entry = (stored['time'], stored['result'])
+            except (OSError, ValueError, KeyError, TypeError):
+                return None
+            self._remember_action_result(key, entry)
+        
+        stored_at, result = entry
+        if time.time() - stored_at > self._action_cache_ttl:
+            # Expired entries are dropped, on disk too, rather than left to pile up
+            with self._action_cache_lock:
+                self._action_cache.pop(key, None)
+            self._remove_cache_file(str(cache_file))
+            return None
+        # Callers merge results into their context; keep the cached copy intact
+        return dict(result)
+    
+    def _remember_action_result(self, key: str, entry: Tuple[float, Dict[str, Any]]):
+        """Keep an action result in memory, evicting the least recently used past action_cache_size
+        
+        Evicted results are deleted under cache/ too, so the files stay bounded as well.
+        """
+        evicted = []
+        with self._action_cache_lock:
+            self._action_cache[key] = entry
+            self._action_cache.move_to_end(key)
+            while len(self._action_cache) > max(self._action_cache_size, 0):
+                evicted.append(self._action_cache.popitem(last=False)[0])
+        for evicted_key in evicted:
+            self._remove_cache_file(str(self._action_cache_file(evicted_key)))
+    
+    def _store_action_result(self, key: str, result: Dict[str, Any]):
+        """Cache an action result in memory and under cache/ for later runs"""
+        entry = (time.time(), dict(result))
+        self._remember_action_result(key, entry)
+        
+        cache_file = self._action_cache_file(key)
+        # Identical steps in one layer may store the same key at once; give each its own temp file
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({'time': entry[0], 'result': entry[1]}, f, default=str)
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.debug("Could not persist action result: %s", e)
+    
+    def _prune_action_cache_files(self):
+        """Delete cached action results under cache/ that have expired, beyond the newest
+        action_cache_size, and temp files left by interrupted writes"""
+        now = time.time()
+        kept = []
+        try:
+            with os.scandir(self.mcp_dir / "cache") as entries:
+                for entry in entries:
+                    if not _ACTION_CACHE_FILE_RE.fullmatch(entry.name):
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if entry.name.endswith('.json') and now - mtime <= self._action_cache_ttl:
+                        kept.append((mtime, entry.path))
+                    elif entry.name.endswith('.json') or now - mtime > 60:
+                        # Temp files get a minute, in case another process is writing one
+                        self._remove_cache_file(entry.path)
+        except OSError as e:
+            self.logger.debug("Could not prune action cache: %s", e)
+            return
+        
+        if len(kept) > self._action_cache_size:
+            kept.sort()
+            for _, path in kept[:len(kept) - max(self._action_cache_size, 0)]:
+                self._remove_cache_file(path)
+    
+    def _remove_cache_file(self, path: str):
+        """Delete a cache file, if it is still there"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
     def get_tools_by_capability(self, capability: str) -> List[MCPTool]:
         """Get tools that have a specific capability"""
         return [tool for tool in self.available_tools.values() if capability in tool.capabilities]
     
-    def recommend_tools_for_task(self, task_description: str) -> List[Tuple[MCPTool, float]]:
+    def _get_recommend_index(self) -> Dict[str, Any]:
+        """Capability phrases -> tool positions, plus lowercased names and descriptions
+        
+        Tools are replaced rather than edited in place (only usage fields change, and those
+        are read live), so the index is rebuilt only when the set of tool objects changes.
+        """
+        tools = list(self.available_tools.values())
+        key = tuple(map(id, tools))
+        if self._recommend_index is None or key != self._recommend_index_key:
+            capability_index: Dict[str, List[int]] = {}
+            for position, tool in enumerate(tools):
+                for capability in tool.capabilities:
+                    capability_index.setdefault(capability.replace('_', ' '), []).append(position)
+            
+            self._recommend_index = {
+                'tools': tools,
+                'capabilities': capability_index,
+                'names': [tool.name.lower() for tool in tools],
+                'descriptions': [tool.description.lower() for tool in tools],
+            }
+            self._recommend_index_key = key
+        return self._recommend_index
+    
+    def recommend_tools_for_task(self, task_description: str, limit: Optional[int] = None) -> List[Tuple[MCPTool, float]]:
         """Recommend tools for a given task based on capabilities and description"""
-        recommendations = []
+        index = self._get_recommend_index()
+        tools = index['tools']
+        scores = [0.0] * len(tools)
         
         task_lower = task_description.lower()
         
-        for tool in self.available_tools.values():
-            score = 0.0
-            
-            # Score based on capabilities
-            for capability in tool.capabilities:
-                if capability.replace('_', ' ') in task_lower:
-                    score += 0.3
-            
-            # Score based on tool name and description
-            if tool.name.lower() in task_lower:
-                score += 0.4
-            
-            if any(word in tool.description.lower() for word in task_lower.split()):
-                score += 0.2
-            
-            # Score based on usage history
+        # Score based on capabilities; each phrase is tested once for all tools sharing it
+        for phrase, positions in index['capabilities'].items():
+            if phrase in task_lower:
+                for position in positions:
+                    scores[position] += 0.3
+        
+        # Score based on tool name and description
+        for position, name in enumerate(index['names']):
+            if name in task_lower:
+                scores[position] += 0.4
+        
+        words = set(task_lower.split())
+        if words:
+            # One search per description finds any task word
+            words_re = re.compile('|'.join(map(re.escape, words)))
+            for position, description in enumerate(index['descriptions']):
+                if words_re.search(description):
+                    scores[position] += 0.2
+        
+        # Score based on usage history
+        for position, tool in enumerate(tools):
             if tool.usage_count > 0:
-                score += 0.1
-            
-            if score > 0:
-                recommendations.append((tool, score))
+                scores[position] += 0.1
         
-        # Sort by score descending
+        recommendations = [(tool, score) for tool, score in zip(tools, scores) if score > 0]
+        
+        # Sort by score descending; with a limit only the top entries are ordered
+        if limit is not None:
+            return heapq.nlargest(limit, recommendations, key=lambda x: x[1])
         recommendations.sort(key=lambda x: x[1], reverse=True)
         
         return recommendations
@@ -552,7 +1170,8 @@ class MCPOrchestrator:
                     "action": "analyze",
                     "params": {"files": "${scan_files.files}"}
                 }
-            ]
+            ],
+            overwrite=False
         )
         
         # Git Workflow
@@ -573,7 +1192,8 @@ class MCPOrchestrator:
                     "action": "current_branch",
                     "params": {}
                 }
-            ]
+            ],
+            overwrite=False
         )
         
         # Database Schema Analysis
@@ -594,7 +1214,8 @@ class MCPOrchestrator:
                     "action": "analyze_schema",
                     "params": {"files": "${find_schema_files.files}"}
                 }
-            ]
+            ],
+            overwrite=False
         )
 
 def main():
@@ -629,9 +1250,9 @@ def main():
         print(orchestrator.generate_mcp_integration_report())
     
     if args.recommend:
-        recommendations = orchestrator.recommend_tools_for_task(args.recommend)
+        recommendations = orchestrator.recommend_tools_for_task(args.recommend, limit=5)
         print(f"Recommended tools for '{args.recommend}':")
-        for tool, score in recommendations[:5]:
+        for tool, score in recommendations:
             print(f"- {tool.name} (score: {score:.2f}): {tool.description}")
 
 if __name__ == "__main__":
@@ -5,14 +5,161 @@ Automatically detects project tech stacks and generates appropriate standards
 """
 
 import os
+import re
+import sys
 import json
-import yaml
+import hashlib
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, is_dataclass
 
-@dataclass
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+# Component categories, interned so comparisons against them are usually identity checks
+CATEGORY_LANGUAGE = sys.intern("language")
+CATEGORY_FRAMEWORK = sys.intern("framework")
+CATEGORY_DATABASE = sys.intern("database")
+CATEGORY_TOOL = sys.intern("tool")
+CATEGORY_RUNTIME = sys.intern("runtime")
+COMPONENT_CATEGORIES = (CATEGORY_LANGUAGE, CATEGORY_FRAMEWORK, CATEGORY_DATABASE, CATEGORY_TOOL, CATEGORY_RUNTIME)
+
+# Components are created per detection; __slots__ drops their per-instance __dict__
+# where dataclasses support it (Python 3.10+)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Pattern categories whose tools also count as build tools
+BUILD_TOOL_CATEGORIES = ("container_files", "cicd_files")
+
+# Where the project name ends in a requirements.txt line (version, extras, markers, URL)
+_REQUIREMENT_NAME_END_RE = re.compile(r'[<>=!~;@\[\s]')
+
+# Threads reading package files, or writing standards files, when there are several
+FILE_IO_WORKERS = 8
+
+# Bump when detection changes, so results saved by older versions are not reused
+DETECTION_CACHE_VERSION = 2
+
+# Generated language standards; {title} and {language} in the JavaScript one name the
+# language, TypeScript if the project uses it
+_JS_STANDARDS = """# {title} Code Style
+
+## Language Standards
+- Use {language} for all new code
+- Use ES6+ features and modern syntax
+- Prefer const/let over var
+- Use arrow functions for callbacks
+
+## Formatting
+- Use 2 spaces for indentation
+- Use semicolons
+- Use single quotes for strings
+- Max line length: 100 characters
+
+"""
+
+_REACT_STANDARDS = """## React Standards
+- Use functional components with hooks
+- Use TypeScript for prop types
+- Follow React naming conventions
+- Use JSX for component rendering
+
+"""
+
+_PYTHON_STANDARDS = """# Python Code Style
+
+## Language Standards
+- Follow PEP 8 style guide
+- Use Python 3.8+ features
+- Use type hints for function signatures
+- Use f-strings for string formatting
+
+## Formatting
+- Use 4 spaces for indentation
+- Max line length: 88 characters (Black formatter)
+- Use double quotes for strings
+- Use trailing commas in multi-line structures
+
+"""
+
+_DJANGO_STANDARDS = """## Django Standards
+- Follow Django naming conventions
+- Use Django's built-in features over custom solutions
+- Organize apps by functionality
+- Use Django's migration system
+
+"""
+
+_FLASK_STANDARDS = """## Flask Standards
+- Use Flask blueprints for organization
+- Use Flask-SQLAlchemy for database operations
+- Follow Flask application factory pattern
+- Use environment variables for configuration
+
+"""
+
+_RUBY_STANDARDS = """# Ruby Code Style
+
+## Language Standards
+- Follow Ruby community style guide
+- Use Ruby 3.0+ features
+- Prefer symbols over strings for keys
+- Use snake_case for variables and methods
+
+## Formatting
+- Use 2 spaces for indentation
+- Max line length: 120 characters
+- Use single quotes for strings
+- Use trailing commas in multi-line structures
+
+"""
+
+_RAILS_STANDARDS = """## Rails Standards
+- Follow Rails conventions and patterns
+- Use Rails generators appropriately
+- Organize code using Rails directory structure
+- Use Rails migrations for database changes
+
+"""
+
+def _ensure_dir(path: Path):
+    """Create a directory (and its parents) unless it already exists
+    
+    A stat settles the usual case of an existing directory; mkdir would still fail
+    with EEXIST and then stat it anyway.
+    """
+    try:
+        os.stat(path)
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+def _json_default(obj):
+    """Serialize dataclasses by their fields, without asdict()'s deep copies"""
+    if is_dataclass(obj):
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _write_json(path: Path, data):
+    """Write data (dataclasses included) as indented JSON, using orjson when available"""
+    if orjson is not None:
+        # orjson serializes dataclasses natively
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=_json_default)
+
+def _read_json(path: Path):
+    """Read a JSON file, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+@dataclass(**_DATACLASS_OPTIONS)
 class TechStackComponent:
     """Represents a detected technology component"""
     name: str
@@ -22,7 +169,7 @@ class TechStackComponent:
     evidence_files: List[str]
     package_manager: Optional[str] = None
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class DetectedTechStack:
     """Complete detected tech stack for a project"""
     primary_language: Optional[str]
@@ -35,251 +182,292 @@ class DetectedTechStack:
     build_tools: List[str]
     confidence_score: float
 
+def _tech_stack_from_dict(data: Dict) -> DetectedTechStack:
+    """Rebuild a saved DetectedTechStack, components included"""
+    data = dict(data)
+    for field in ("languages", "frameworks", "databases", "tools", "runtimes"):
+        data[field] = [
+            TechStackComponent(**{**component, "category": sys.intern(component["category"])})
+            for component in data.get(field, [])
+        ]
+    return DetectedTechStack(**data)
+
+def _normalize_package_name(name: str) -> str:
+    """A package name in PEP 503 form, so runs of -, _ and . compare equal"""
+    return re.sub(r'[-_.]+', '-', name.strip().lower())
+
+def _requirement_names(content: str) -> Set[str]:
+    """Names of the packages a requirements.txt requires, ignoring comments and pip options"""
+    names = set()
+    for line in content.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line and not line.startswith('-'):
+            names.add(_normalize_package_name(_REQUIREMENT_NAME_END_RE.split(line, 1)[0]))
+    names.discard('')
+    return names
+
+# Detection patterns for various technologies, by category and file name; names
+# ending in "/" are directories
+DETECTION_PATTERNS = {
+    # Package managers and their associated technologies
+    "package_files": {
+        "package.json": {
+            "language": "javascript",
+            "package_manager": "npm",
+            "confidence": 0.9,
+            "frameworks": {
+                "react": ["react"],
+                "vue": ["vue"],
+                "angular": ["@angular/core"],
+                "express": ["express"],
+                "next": ["next"],
+                "nuxt": ["nuxt"],
+                "svelte": ["svelte"]
+            }
+        },
+        "requirements.txt": {
+            "language": "python",
+            "package_manager": "pip",
+            "confidence": 0.9,
+            "frameworks": {
+                "django": ["django"],
+                "flask": ["flask"],
+                "fastapi": ["fastapi"],
+                "pandas": ["pandas"],
+                "numpy": ["numpy"],
+                "tensorflow": ["tensorflow"],
+                "pytorch": ["torch"]
+            }
+        },
+        "Pipfile": {
+            "language": "python",
+            "package_manager": "pipenv",
+            "confidence": 0.9
+        },
+        "pyproject.toml": {
+            "language": "python",
+            "package_manager": "poetry",
+            "confidence": 0.9
+        },
+        "Gemfile": {
+            "language": "ruby",
+            "package_manager": "bundler",
+            "confidence": 0.9,
+            "frameworks": {
+                "rails": ["rails"],
+                "sinatra": ["sinatra"]
+            }
+        },
+        "pom.xml": {
+            "language": "java",
+            "package_manager": "maven",
+            "confidence": 0.9,
+            "frameworks": {
+                "spring": ["spring-boot", "spring-core"],
+                "hibernate": ["hibernate"]
+            }
+        },
+        "build.gradle": {
+            "language": "java",
+            "package_manager": "gradle",
+            "confidence": 0.9
+        },
+        "Cargo.toml": {
+            "language": "rust",
+            "package_manager": "cargo",
+            "confidence": 0.9
+        },
+        "go.mod": {
+            "language": "go",
+            "package_manager": "go modules",
+            "confidence": 0.9
+        },
+        "composer.json": {
+            "language": "php",
+            "package_manager": "composer",
+            "confidence": 0.9,
+            "frameworks": {
+                "laravel": ["laravel/framework"],
+                "symfony": ["symfony/symfony"]
+            }
+        }
+    },
+    
+    # Configuration files
+    "config_files": {
+        "tsconfig.json": {"language": "typescript", "confidence": 0.8},
+        "webpack.config.js": {"tool": "webpack", "confidence": 0.7},
+        "vite.config.js": {"tool": "vite", "confidence": 0.8},
+        "rollup.config.js": {"tool": "rollup", "confidence": 0.7},
+        "babel.config.js": {"tool": "babel", "confidence": 0.6},
+        "tailwind.config.js": {"framework": "tailwindcss", "confidence": 0.7},
+        "next.config.js": {"framework": "nextjs", "confidence": 0.9},
+        "nuxt.config.js": {"framework": "nuxtjs", "confidence": 0.9},
+        "vue.config.js": {"framework": "vue", "confidence": 0.8},
+        "angular.json": {"framework": "angular", "confidence": 0.9},
+        "svelte.config.js": {"framework": "svelte", "confidence": 0.9},
+        "gatsby-config.js": {"framework": "gatsby", "confidence": 0.9},
+        "astro.config.mjs": {"framework": "astro", "confidence": 0.9}
+    },
+    
+    # Database files
+    "database_files": {
+        "schema.rb": {"database": "rails_db", "confidence": 0.8},
+        "migrations/": {"database": "sql_migrations", "confidence": 0.7},
+        "prisma/schema.prisma": {"database": "prisma", "confidence": 0.9},
+        "knexfile.js": {"database": "knex", "confidence": 0.8},
+        "sequelize-cli": {"database": "sequelize", "confidence": 0.8}
+    },
+    
+    # Docker and containerization
+    "container_files": {
+        "Dockerfile": {"tool": "docker", "confidence": 0.8},
+        "docker-compose.yml": {"tool": "docker-compose", "confidence": 0.8},
+        "docker-compose.yaml": {"tool": "docker-compose", "confidence": 0.8},
+        "kubernetes/": {"tool": "kubernetes", "confidence": 0.7}
+    },
+    
+    # CI/CD files
+    "cicd_files": {
+        ".github/workflows/": {"tool": "github-actions", "confidence": 0.8},
+        ".gitlab-ci.yml": {"tool": "gitlab-ci", "confidence": 0.8},
+        "Jenkinsfile": {"tool": "jenkins", "confidence": 0.8},
+        ".travis.yml": {"tool": "travis-ci", "confidence": 0.8}
+    }
+}
+
+def _flatten_detection_patterns(detection_patterns: Dict) -> Dict[str, List[Tuple[int, str, str, Dict]]]:
+    """Patterns of every category by top-level name, as (order, category, filename, pattern)"""
+    flat_patterns = {}
+    order = 0
+    for category, patterns in detection_patterns.items():
+        for filename, pattern in patterns.items():
+            name = filename.rstrip("/").split("/", 1)[0]
+            flat_patterns.setdefault(name, []).append((order, category, filename, pattern))
+            order += 1
+    return flat_patterns
+
+def _detection_key_names(detection_patterns: Dict) -> Tuple[str, ...]:
+    """Names under the project root whose stats make up the detection key ("" is the root)"""
+    names = {""}
+    for category, patterns in detection_patterns.items():
+        for filename in patterns:
+            name = filename.rstrip("/")
+            if category == "package_files" or "/" in name:
+                names.add(name.split("/", 1)[0])
+    return tuple(sorted(names))
+
+# Built once per process from the patterns above
+_FLAT_PATTERNS = _flatten_detection_patterns(DETECTION_PATTERNS)
+_DETECTION_KEY_NAMES = _detection_key_names(DETECTION_PATTERNS)
+
 class TechStackDetector:
     """Detects technology stacks in projects"""
     
-    def __init__(self, project_root: str = "."):
+    def __init__(self, project_root: str = ".", verbose: bool = False):
         self.project_root = Path(project_root)
         self.agent_os_dir = self.project_root / ".agent-os"
         self.tech_stack_dir = self.agent_os_dir / "tech-stack"
         
         # Create directories
-        self.tech_stack_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(self.tech_stack_dir)
+        
+        # Setup logging; as a library the detector leaves handlers to the application
+        if verbose:
+            self._setup_logging()
+        else:
+            self.logger = logging.getLogger("TechStackDetector")
         
-        # Setup logging
-        self._setup_logging()
+        # Detection patterns; DETECTION_PATTERNS is shared, so customize by assigning a
+        # new dict (e.g. a copy.deepcopy of it) rather than changing it in place
+        self.detection_patterns = DETECTION_PATTERNS
+        # (patterns, flattened patterns, detection key names) built for custom patterns
+        self._derived_patterns: Optional[Tuple[Dict, Dict, Tuple[str, ...]]] = None
         
-        # Detection patterns
-        self.detection_patterns = self._load_detection_patterns()
+        # Saved results are reused while the detection key they were saved with still matches
+        self.results_file = self.tech_stack_dir / "detected-stack.json"
+        self.detection_key_file = self.tech_stack_dir / "detection-key.json"
         
     def _setup_logging(self):
-        """Setup logging for tech stack detector"""
-        log_dir = self.agent_os_dir / "logs"
-        log_dir.mkdir(exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_dir / "tech-stack-detector.log"),
-                logging.StreamHandler()
-            ]
-        )
+        """Setup logging for tech stack detector, on its own logger rather than the root one"""
         self.logger = logging.getLogger("TechStackDetector")
-    
-    def _load_detection_patterns(self) -> Dict:
-        """Load detection patterns for various technologies"""
-        return {
-            # Package managers and their associated technologies
-            "package_files": {
-                "package.json": {
-                    "language": "javascript",
-                    "package_manager": "npm",
-                    "confidence": 0.9,
-                    "frameworks": {
-                        "react": ["react"],
-                        "vue": ["vue"],
-                        "angular": ["@angular/core"],
-                        "express": ["express"],
-                        "next": ["next"],
-                        "nuxt": ["nuxt"],
-                        "svelte": ["svelte"]
-                    }
-                },
-                "requirements.txt": {
-                    "language": "python",
-                    "package_manager": "pip",
-                    "confidence": 0.9,
-                    "frameworks": {
-                        "django": ["django"],
-                        "flask": ["flask"],
-                        "fastapi": ["fastapi"],
-                        "pandas": ["pandas"],
-                        "numpy": ["numpy"],
-                        "tensorflow": ["tensorflow"],
-                        "pytorch": ["torch"]
-                    }
-                },
-                "Pipfile": {
-                    "language": "python",
-                    "package_manager": "pipenv",
-                    "confidence": 0.9
-                },
-                "pyproject.toml": {
-                    "language": "python",
-                    "package_manager": "poetry",
-                    "confidence": 0.9
-                },
-                "Gemfile": {
-                    "language": "ruby",
-                    "package_manager": "bundler",
-                    "confidence": 0.9,
-                    "frameworks": {
-                        "rails": ["rails"],
-                        "sinatra": ["sinatra"]
-                    }
-                },
-                "pom.xml": {
-                    "language": "java",
-                    "package_manager": "maven",
-                    "confidence": 0.9,
-                    "frameworks": {
-                        "spring": ["spring-boot", "spring-core"],
-                        "hibernate": ["hibernate"]
-                    }
-                },
-                "build.gradle": {
-                    "language": "java",
-                    "package_manager": "gradle",
-                    "confidence": 0.9
-                },
-                "Cargo.toml": {
-                    "language": "rust",
-                    "package_manager": "cargo",
-                    "confidence": 0.9
-                },
-                "go.mod": {
-                    "language": "go",
-                    "package_manager": "go modules",
-                    "confidence": 0.9
-                },
-                "composer.json": {
-                    "language": "php",
-                    "package_manager": "composer",
-                    "confidence": 0.9,
-                    "frameworks": {
-                        "laravel": ["laravel/framework"],
-                        "symfony": ["symfony/symfony"]
-                    }
-                }
-            },
-            
-            # Configuration files
-            "config_files": {
-                "tsconfig.json": {"language": "typescript", "confidence": 0.8},
-                "webpack.config.js": {"tool": "webpack", "confidence": 0.7},
-                "vite.config.js": {"tool": "vite", "confidence": 0.8},
-                "rollup.config.js": {"tool": "rollup", "confidence": 0.7},
-                "babel.config.js": {"tool": "babel", "confidence": 0.6},
-                "tailwind.config.js": {"framework": "tailwindcss", "confidence": 0.7},
-                "next.config.js": {"framework": "nextjs", "confidence": 0.9},
-                "nuxt.config.js": {"framework": "nuxtjs", "confidence": 0.9},
-                "vue.config.js": {"framework": "vue", "confidence": 0.8},
-                "angular.json": {"framework": "angular", "confidence": 0.9},
-                "svelte.config.js": {"framework": "svelte", "confidence": 0.9},
-                "gatsby-config.js": {"framework": "gatsby", "confidence": 0.9},
-                "astro.config.mjs": {"framework": "astro", "confidence": 0.9}
-            },
-            
-            # Database files
-            "database_files": {
-                "schema.rb": {"database": "rails_db", "confidence": 0.8},
-                "migrations/": {"database": "sql_migrations", "confidence": 0.7},
-                "prisma/schema.prisma": {"database": "prisma", "confidence": 0.9},
-                "knexfile.js": {"database": "knex", "confidence": 0.8},
-                "sequelize-cli": {"database": "sequelize", "confidence": 0.8}
-            },
-            
-            # Docker and containerization
-            "container_files": {
-                "Dockerfile": {"tool": "docker", "confidence": 0.8},
-                "docker-compose.yml": {"tool": "docker-compose", "confidence": 0.8},
-                "docker-compose.yaml": {"tool": "docker-compose", "confidence": 0.8},
-                "kubernetes/": {"tool": "kubernetes", "confidence": 0.7}
-            },
-            
-            # CI/CD files
-            "cicd_files": {
-                ".github/workflows/": {"tool": "github-actions", "confidence": 0.8},
-                ".gitlab-ci.yml": {"tool": "gitlab-ci", "confidence": 0.8},
-                "Jenkinsfile": {"tool": "jenkins", "confidence": 0.8},
-                ".travis.yml": {"tool": "travis-ci", "confidence": 0.8}
-            }
-        }
+        if self.logger.handlers:
+            return
+        
+        log_dir = self.agent_os_dir / "logs"
+        _ensure_dir(log_dir)
+        
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        for handler in (logging.FileHandler(log_dir / "tech-stack-detector.log"), logging.StreamHandler()):
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+        self.logger.setLevel(logging.INFO)
     
     def detect_tech_stack(self) -> DetectedTechStack:
         """Detect the complete tech stack of the project"""
         self.logger.info(f"Detecting tech stack for project: {self.project_root}")
         
+        detection_key = self._detection_key()
+        tech_stack = self._load_cached_detection(detection_key)
+        if tech_stack is not None:
+            self.logger.info(f"Project unchanged, reusing saved detection. Primary language: {tech_stack.primary_language}")
+            return tech_stack
+        
         detected_components = []
         package_managers = set()
         build_tools = set()
         
-        # Scan for package files
-        for filename, pattern in self.detection_patterns["package_files"].items():
-            file_path = self.project_root / filename
-            if file_path.exists():
-                components = self._analyze_package_file(file_path, pattern)
-                detected_components.extend(components)
+        # One listing of the project root, matched against every pattern's top-level name
+        entries = self._list_project_root()
+        root = os.fspath(self.project_root)
+        flat_patterns, _ = self._pattern_lookups()
+        hits = []
+        for name in flat_patterns.keys() & entries.keys():
+            for order, category, filename, pattern in flat_patterns[name]:
+                path = self._find_pattern_path(filename, entries, root)
+                if path is not None:
+                    hits.append((order, category, filename, pattern, path))
+        
+        # Components are added in pattern order, as the categories were scanned before
+        hits.sort(key=lambda hit: hit[0])
+        package_components = iter(self._analyze_package_files(
+            [(path, pattern) for _, category, _, pattern, path in hits if category == "package_files"]
+        ))
+        for _, category, filename, pattern, path in hits:
+            if category == "package_files":
+                detected_components.extend(next(package_components))
                 if pattern.get("package_manager"):
                     package_managers.add(pattern["package_manager"])
-        
-        # Scan for config files
-        for filename, pattern in self.detection_patterns["config_files"].items():
-            file_path = self.project_root / filename
-            if file_path.exists():
-                component = self._create_component_from_pattern(filename, pattern, [str(file_path)])
-                if component:
-                    detected_components.append(component)
-        
-        # Scan for database files
-        for filename, pattern in self.detection_patterns["database_files"].items():
-            if filename.endswith("/"):
-                # Directory pattern
-                dir_path = self.project_root / filename.rstrip("/")
-                if dir_path.exists() and dir_path.is_dir():
-                    component = self._create_component_from_pattern(filename, pattern, [str(dir_path)])
-                    if component:
-                        detected_components.append(component)
             else:
-                # File pattern
-                file_path = self.project_root / filename
-                if file_path.exists():
-                    component = self._create_component_from_pattern(filename, pattern, [str(file_path)])
-                    if component:
-                        detected_components.append(component)
-        
-        # Scan for container files
-        for filename, pattern in self.detection_patterns["container_files"].items():
-            file_path = self.project_root / filename
-            if file_path.exists():
-                component = self._create_component_from_pattern(filename, pattern, [str(file_path)])
+                component = self._create_component_from_pattern(filename, pattern, [path])
                 if component:
                     detected_components.append(component)
-                    build_tools.add(pattern.get("tool", ""))
-        
-        # Scan for CI/CD files
-        for filename, pattern in self.detection_patterns["cicd_files"].items():
-            if filename.endswith("/"):
-                dir_path = self.project_root / filename.rstrip("/")
-                if dir_path.exists() and dir_path.is_dir():
-                    component = self._create_component_from_pattern(filename, pattern, [str(dir_path)])
-                    if component:
-                        detected_components.append(component)
+                    if category in BUILD_TOOL_CATEGORIES:
                         build_tools.add(pattern.get("tool", ""))
-            else:
-                file_path = self.project_root / filename
-                if file_path.exists():
-                    component = self._create_component_from_pattern(filename, pattern, [str(file_path)])
-                    if component:
-                        detected_components.append(component)
-                        build_tools.add(pattern.get("tool", ""))
-        
-        # Categorize components
-        languages = [c for c in detected_components if c.category == "language"]
-        frameworks = [c for c in detected_components if c.category == "framework"]
-        databases = [c for c in detected_components if c.category == "database"]
-        tools = [c for c in detected_components if c.category == "tool"]
-        runtimes = [c for c in detected_components if c.category == "runtime"]
         
-        # Determine primary language
-        primary_language = None
-        if languages:
-            primary_language = max(languages, key=lambda x: x.confidence).name
+        # Categorize components, picking the primary language (the first most confident)
+        # and totalling confidence in the same pass
+        buckets = {category: [] for category in COMPONENT_CATEGORIES}
+        primary = None
+        total_confidence = 0.0
+        for c in detected_components:
+            total_confidence += c.confidence
+            bucket = buckets.get(c.category)
+            if bucket is not None:
+                bucket.append(c)
+                if c.category == CATEGORY_LANGUAGE and (primary is None or c.confidence > primary.confidence):
+                    primary = c
+        
+        languages = buckets[CATEGORY_LANGUAGE]
+        frameworks = buckets[CATEGORY_FRAMEWORK]
+        databases = buckets[CATEGORY_DATABASE]
+        tools = buckets[CATEGORY_TOOL]
+        runtimes = buckets[CATEGORY_RUNTIME]
+        primary_language = primary.name if primary is not None else None
         
         # Calculate overall confidence
         if detected_components:
-            confidence_score = sum(c.confidence for c in detected_components) / len(detected_components)
+            confidence_score = total_confidence / len(detected_components)
         else:
             confidence_score = 0.0
         
@@ -297,25 +485,126 @@ class TechStackDetector:
         
         # Save detection results
         self._save_detection_results(tech_stack)
+        self._save_detection_key(detection_key)
         
         self.logger.info(f"Tech stack detection complete. Primary language: {primary_language}")
         return tech_stack
     
+    def _pattern_lookups(self) -> Tuple[Dict[str, List[Tuple[int, str, str, Dict]]], Tuple[str, ...]]:
+        """The flattened patterns and detection key names for self.detection_patterns
+        
+        The module's prebuilt ones serve the default patterns; custom patterns get
+        their own, rebuilt whenever a different dict is assigned.
+        """
+        if self.detection_patterns is DETECTION_PATTERNS:
+            return _FLAT_PATTERNS, _DETECTION_KEY_NAMES
+        if self._derived_patterns is None or self._derived_patterns[0] is not self.detection_patterns:
+            self._derived_patterns = (
+                self.detection_patterns,
+                _flatten_detection_patterns(self.detection_patterns),
+                _detection_key_names(self.detection_patterns)
+            )
+        return self._derived_patterns[1], self._derived_patterns[2]
+    
+    def _detection_key(self) -> str:
+        """Digest of what detection reads: the root listing, package files and nested pattern directories
+        
+        Entries added to or removed from the root change its mtime; package files are
+        parsed, so their own mtimes and sizes count, as do the directories holding
+        nested patterns such as prisma/schema.prisma.
+        """
+        root = os.fspath(self.project_root)
+        key = hashlib.blake2b(f"{DETECTION_CACHE_VERSION}\0{root}".encode(), digest_size=16)
+        if self.detection_patterns is not DETECTION_PATTERNS:
+            # Results detected with other patterns must not be reused
+            key.update(json.dumps(self.detection_patterns, sort_keys=True, default=str).encode())
+        _, key_names = self._pattern_lookups()
+        for name in key_names:
+            try:
+                st = os.stat(os.path.join(root, name))
+                key.update(f"\0{name}\0{st.st_mtime_ns}\0{st.st_size}".encode())
+            except OSError:
+                key.update(f"\0{name}\0-".encode())
+        return key.hexdigest()
+    
+    def _load_cached_detection(self, detection_key: str) -> Optional[DetectedTechStack]:
+        """The saved detection results, if they were saved under the same detection key"""
+        try:
+            if _read_json(self.detection_key_file).get("key") != detection_key:
+                return None
+            return _tech_stack_from_dict(_read_json(self.results_file))
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+    
+    def _save_detection_key(self, detection_key: str):
+        """Record the detection key the saved results belong to"""
+        try:
+            _write_json(self.detection_key_file, {"key": detection_key})
+        except OSError as e:
+            self.logger.warning(f"Could not save detection key: {e}")
+    
+    def _list_project_root(self) -> Dict[str, os.DirEntry]:
+        """Entries directly under the project root, by name"""
+        try:
+            with os.scandir(self.project_root) as entries:
+                return {entry.name: entry for entry in entries}
+        except OSError as e:
+            self.logger.error(f"Error listing {self.project_root}: {e}")
+            return {}
+    
+    def _find_pattern_path(self, filename: str, entries: Dict[str, os.DirEntry], root: str) -> Optional[str]:
+        """Path of a pattern's file (or directory, for names ending in "/") if the project has it
+        
+        Paths are joined as strings under root, the project root as a string; for the
+        current directory they are relative, as pathlib would give them.
+        """
+        is_dir_pattern = filename.endswith("/")
+        name = filename.rstrip("/")
+        first, sep, rest = name.partition("/")
+        
+        entry = entries.get(first)
+        if entry is None:
+            return None
+        
+        if sep:
+            # Nested patterns need their parent in the listing, then a single stat
+            if not entry.is_dir():
+                return None
+            nested = os.path.join(entry.path, rest)
+            found = os.path.isdir(nested) if is_dir_pattern else os.path.isfile(nested)
+        else:
+            # The listing's file types answer without another stat
+            found = entry.is_dir() if is_dir_pattern else entry.is_file()
+        
+        if not found:
+            return None
+        return name if root == "." else os.path.join(root, name)
+    
+    def _analyze_package_files(self, package_files: List[Tuple[str, Dict]]) -> List[List[TechStackComponent]]:
+        """Components of each (path, pattern) package file, in order; several files are read in parallel"""
+        if len(package_files) < 2:
+            return [self._analyze_package_file(Path(path), pattern) for path, pattern in package_files]
+        
+        # Reads and parses overlap their disk waits; results come back in submission order
+        with ThreadPoolExecutor(max_workers=min(FILE_IO_WORKERS, len(package_files))) as executor:
+            return list(executor.map(lambda hit: self._analyze_package_file(Path(hit[0]), hit[1]), package_files))
+    
     def _analyze_package_file(self, file_path: Path, pattern: Dict) -> List[TechStackComponent]:
         """Analyze a package file to detect technologies"""
         components = []
         
         try:
             if file_path.name == "package.json":
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
+                # Parsed whole by orjson's C parser when available; only engines and the
+                # dependency maps are used
+                data = _read_json(file_path)
                     
                 # Add language component
                 if pattern.get("language"):
                     lang_component = TechStackComponent(
                         name=pattern["language"],
                         version=data.get("engines", {}).get("node"),
-                        category="language",
+                        category=CATEGORY_LANGUAGE,
                         confidence=pattern["confidence"],
                         evidence_files=[str(file_path)],
                         package_manager=pattern.get("package_manager")
@@ -333,7 +622,7 @@ class TechStackDetector:
                             framework_component = TechStackComponent(
                                 name=framework,
                                 version=all_deps[package],
-                                category="framework",
+                                category=CATEGORY_FRAMEWORK,
                                 confidence=0.8,
                                 evidence_files=[str(file_path)],
                                 package_manager=pattern.get("package_manager")
@@ -347,30 +636,31 @@ class TechStackDetector:
                     lang_component = TechStackComponent(
                         name=pattern["language"],
                         version=None,
-                        category="language",
+                        category=CATEGORY_LANGUAGE,
                         confidence=pattern["confidence"],
                         evidence_files=[str(file_path)],
                         package_manager=pattern.get("package_manager")
                     )
                     components.append(lang_component)
                 
-                # Read file content to detect frameworks
-                with open(file_path, 'r') as f:
-                    content = f.read().lower()
+                # Requirements are compared by whole name, so flask-login is not taken for
+                # flask; Pipfile patterns list no frameworks
+                frameworks = pattern.get("frameworks", {})
+                if frameworks and file_path.name == "requirements.txt":
+                    with open(file_path, 'r') as f:
+                        names = _requirement_names(f.read())
                     
-                for framework, packages in pattern.get("frameworks", {}).items():
-                    for package in packages:
-                        if package in content:
+                    for framework, packages in frameworks.items():
+                        if not names.isdisjoint(map(_normalize_package_name, packages)):
                             framework_component = TechStackComponent(
                                 name=framework,
                                 version=None,
-                                category="framework",
+                                category=CATEGORY_FRAMEWORK,
                                 confidence=0.7,
                                 evidence_files=[str(file_path)],
                                 package_manager=pattern.get("package_manager")
                             )
                             components.append(framework_component)
-                            break
             
             # Add similar logic for other package file types...
             
@@ -381,7 +671,7 @@ class TechStackDetector:
     
     def _create_component_from_pattern(self, filename: str, pattern: Dict, evidence_files: List[str]) -> Optional[TechStackComponent]:
         """Create a tech stack component from a detection pattern"""
-        for key in ["language", "framework", "database", "tool", "runtime"]:
+        for key in COMPONENT_CATEGORIES:
             if key in pattern:
                 return TechStackComponent(
                     name=pattern[key],
@@ -394,10 +684,9 @@ class TechStackDetector:
     
     def _save_detection_results(self, tech_stack: DetectedTechStack):
         """Save detection results to file"""
-        results_file = self.tech_stack_dir / "detected-stack.json"
+        results_file = self.results_file
         
-        with open(results_file, 'w') as f:
-            json.dump(asdict(tech_stack), f, indent=2)
+        _write_json(results_file, tech_stack)
         
         self.logger.info(f"Detection results saved to {results_file}")
     
@@ -409,9 +698,12 @@ class TechStackDetector:
         tech_stack_content = self._generate_tech_stack_md(tech_stack)
         standards["tech-stack.md"] = tech_stack_content
         
-        # Generate language-specific standards
+        # Generate language-specific standards, looking detected names up in sets built once
         if tech_stack.primary_language:
-            lang_standards = self._generate_language_standards(tech_stack.primary_language, tech_stack)
+            language_names = {lang.name for lang in tech_stack.languages}
+            framework_names = {fw.name for fw in tech_stack.frameworks}
+            lang_standards = self._generate_language_standards(tech_stack.primary_language,
+                                                               language_names, framework_names)
             standards.update(lang_standards)
         
         # Generate framework-specific standards
@@ -423,7 +715,7 @@ class TechStackDetector:
     
     def _generate_tech_stack_md(self, tech_stack: DetectedTechStack) -> str:
         """Generate tech-stack.md content based on detected stack"""
-        content = f"""# Tech Stack
+        parts = [f"""# Tech Stack
 
 ## Context
 
@@ -433,152 +725,73 @@ Auto-detected tech stack for this project (confidence: {tech_stack.confidence_sc
 - **Language**: {tech_stack.primary_language or 'Not detected'}
 
 ## Languages
-"""
+"""]
         
         for lang in tech_stack.languages:
             version_str = f" {lang.version}" if lang.version else ""
-            content += f"- **{lang.name.title()}**{version_str} (confidence: {lang.confidence:.1f})\n"
+            parts.append(f"- **{lang.name.title()}**{version_str} (confidence: {lang.confidence:.1f})\n")
         
-        content += "\n## Frameworks\n"
+        parts.append("\n## Frameworks\n")
         for framework in tech_stack.frameworks:
             version_str = f" {framework.version}" if framework.version else ""
-            content += f"- **{framework.name.title()}**{version_str} (confidence: {framework.confidence:.1f})\n"
+            parts.append(f"- **{framework.name.title()}**{version_str} (confidence: {framework.confidence:.1f})\n")
         
-        content += "\n## Databases\n"
+        parts.append("\n## Databases\n")
         for db in tech_stack.databases:
-            content += f"- **{db.name.title()}** (confidence: {db.confidence:.1f})\n"
+            parts.append(f"- **{db.name.title()}** (confidence: {db.confidence:.1f})\n")
         
-        content += "\n## Tools\n"
+        parts.append("\n## Tools\n")
         for tool in tech_stack.tools:
-            content += f"- **{tool.name.title()}** (confidence: {tool.confidence:.1f})\n"
+            parts.append(f"- **{tool.name.title()}** (confidence: {tool.confidence:.1f})\n")
         
-        content += "\n## Package Managers\n"
+        parts.append("\n## Package Managers\n")
         for pm in tech_stack.package_managers:
-            content += f"- {pm}\n"
+            parts.append(f"- {pm}\n")
         
-        content += "\n## Build Tools\n"
+        parts.append("\n## Build Tools\n")
         for bt in tech_stack.build_tools:
             if bt:  # Filter out empty strings
-                content += f"- {bt}\n"
+                parts.append(f"- {bt}\n")
         
-        return content
+        return "".join(parts)
     
-    def _generate_language_standards(self, language: str, tech_stack: DetectedTechStack) -> Dict[str, str]:
+    def _generate_language_standards(self, language: str, language_names: Set[str],
+                                     framework_names: Set[str]) -> Dict[str, str]:
         """Generate language-specific standards"""
         standards = {}
         
         if language == "javascript" or language == "typescript":
-            standards["code-style/javascript-style.md"] = self._generate_js_standards(tech_stack)
+            standards["code-style/javascript-style.md"] = self._generate_js_standards(language_names, framework_names)
         elif language == "python":
-            standards["code-style/python-style.md"] = self._generate_python_standards(tech_stack)
+            standards["code-style/python-style.md"] = self._generate_python_standards(framework_names)
         elif language == "ruby":
-            standards["code-style/ruby-style.md"] = self._generate_ruby_standards(tech_stack)
+            standards["code-style/ruby-style.md"] = self._generate_ruby_standards(framework_names)
         # Add more languages as needed
         
         return standards
     
-    def _generate_js_standards(self, tech_stack: DetectedTechStack) -> str:
+    def _generate_js_standards(self, language_names: Set[str], framework_names: Set[str]) -> str:
         """Generate JavaScript/TypeScript standards"""
-        has_typescript = any(lang.name == "typescript" for lang in tech_stack.languages)
-        has_react = any(fw.name == "react" for fw in tech_stack.frameworks)
-        
-        content = f"""# JavaScript{'/ TypeScript' if has_typescript else ''} Code Style
-
-## Language Standards
-- Use {'TypeScript' if has_typescript else 'JavaScript'} for all new code
-- Use ES6+ features and modern syntax
-- Prefer const/let over var
-- Use arrow functions for callbacks
-
-## Formatting
-- Use 2 spaces for indentation
-- Use semicolons
-- Use single quotes for strings
-- Max line length: 100 characters
-
-"""
-        
-        if has_react:
-            content += """## React Standards
-- Use functional components with hooks
-- Use TypeScript for prop types
-- Follow React naming conventions
-- Use JSX for component rendering
-
-"""
-        
-        return content
+        has_typescript = "typescript" in language_names
+        return "".join([
+            _JS_STANDARDS.format(
+                title="JavaScript/ TypeScript" if has_typescript else "JavaScript",
+                language="TypeScript" if has_typescript else "JavaScript"
+            ),
+            _REACT_STANDARDS if "react" in framework_names else ""
+        ])
     
-    def _generate_python_standards(self, tech_stack: DetectedTechStack) -> str:
+    def _generate_python_standards(self, framework_names: Set[str]) -> str:
         """Generate Python standards"""
-        has_django = any(fw.name == "django" for fw in tech_stack.frameworks)
-        has_flask = any(fw.name == "flask" for fw in tech_stack.frameworks)
-        
-        content = """# Python Code Style
-
-## Language Standards
-- Follow PEP 8 style guide
-- Use Python 3.8+ features
-- Use type hints for function signatures
-- Use f-strings for string formatting
-
-## Formatting
-- Use 4 spaces for indentation
-- Max line length: 88 characters (Black formatter)
-- Use double quotes for strings
-- Use trailing commas in multi-line structures
-
-"""
-        
-        if has_django:
-            content += """## Django Standards
-- Follow Django naming conventions
-- Use Django's built-in features over custom solutions
-- Organize apps by functionality
-- Use Django's migration system
-
-"""
-        elif has_flask:
-            content += """## Flask Standards
-- Use Flask blueprints for organization
-- Use Flask-SQLAlchemy for database operations
-- Follow Flask application factory pattern
-- Use environment variables for configuration
-
-"""
-        
-        return content
+        if "django" in framework_names:
+            return _PYTHON_STANDARDS + _DJANGO_STANDARDS
+        if "flask" in framework_names:
+            return _PYTHON_STANDARDS + _FLASK_STANDARDS
+        return _PYTHON_STANDARDS
     
-    def _generate_ruby_standards(self, tech_stack: DetectedTechStack) -> str:
+    def _generate_ruby_standards(self, framework_names: Set[str]) -> str:
         """Generate Ruby standards"""
-        has_rails = any(fw.name == "rails" for fw in tech_stack.frameworks)
-        
-        content = """# Ruby Code Style
-
-## Language Standards
-- Follow Ruby community style guide
-- Use Ruby 3.0+ features
-- Prefer symbols over strings for keys
-- Use snake_case for variables and methods
-
-## Formatting
-- Use 2 spaces for indentation
-- Max line length: 120 characters
-- Use single quotes for strings
-- Use trailing commas in multi-line structures
-
-"""
-        
-        if has_rails:
-            content += """## Rails Standards
-- Follow Rails conventions and patterns
-- Use Rails generators appropriately
-- Organize code using Rails directory structure
-- Use Rails migrations for database changes
-
-"""
-        
-        return content
+        return _RUBY_STANDARDS + (_RAILS_STANDARDS if "rails" in framework_names else "")
     
     def _generate_framework_standards(self, framework: TechStackComponent, tech_stack: DetectedTechStack) -> Dict[str, str]:
         """Generate framework-specific standards"""
@@ -601,7 +814,7 @@ def main():
     
     args = parser.parse_args()
     
-    detector = TechStackDetector(args.project_root)
+    detector = TechStackDetector(args.project_root, verbose=True)
     
     if args.detect:
         tech_stack = detector.detect_tech_stack()
@@ -614,21 +827,22 @@ def main():
         # Load existing detection results
         results_file = Path(args.project_root) / ".agent-os" / "tech-stack" / "detected-stack.json"
         if results_file.exists():
-            with open(results_file, 'r') as f:
-                data = json.load(f)
-                # Convert back to DetectedTechStack object
-                tech_stack = DetectedTechStack(**data)
-                
+            # Convert back to DetectedTechStack object
+            tech_stack = _tech_stack_from_dict(_read_json(results_file))
+            
             standards = detector.generate_standards_from_stack(tech_stack)
             
             output_dir = Path(args.output_dir) if args.output_dir else Path(args.project_root) / ".agent-os" / "standards"
-            output_dir.mkdir(parents=True, exist_ok=True)
+            output_files = [(output_dir / filename, content) for filename, content in standards.items()]
+            
+            # Each directory is created once, then the files are written in parallel
+            for parent in sorted({output_file.parent for output_file, _ in output_files}):
+                parent.mkdir(parents=True, exist_ok=True)
+            
+            with ThreadPoolExecutor(max_workers=min(FILE_IO_WORKERS, len(output_files))) as executor:
+                list(executor.map(lambda item: item[0].write_text(item[1]), output_files))
             
-            for filename, content in standards.items():
-                output_file = output_dir / filename
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_file, 'w') as f:
-                    f.write(content)
+            for output_file, _ in output_files:
                 print(f"✅ Generated: {output_file}")
         else:
             print("❌ No detection results found. Run --detect first.")